@@ -1 +1,2 @@
 from .netbox import NetBox
+from .federation import FederatedNetBox
@@ -0,0 +1,167 @@
+import netbox.exceptions as exceptions
+from netbox import models
+from netbox.cache import cache_path
+
+
+class Pending(object):
+    """Object which is created when the batch is flushed
+
+    Can be used as id in other calls of the same batch, e.g. as device_id of create_interface.
+    pending['id'] returns the pending object itself until the batch is flushed, so code written
+    for the created object keeps working.
+    """
+
+    def __init__(self, path, fields):
+        self.path = path
+        self.fields = fields
+        self.result = None
+        self.cancelled = False
+
+    @property
+    def id(self):
+        """Id of the created object, None before the flush"""
+        return self.result['id'] if self.result is not None else None
+
+    def __getitem__(self, key):
+        if self.result is not None:
+            return self.result[key]
+        if key == 'id':
+            return self
+        return self.fields[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        if self.result is not None:
+            return 'Pending({} {})'.format(self.path, self.id)
+        return 'Pending({} {})'.format(self.path, self.fields)
+
+
+class Batch(object):
+    """Writes queued by NetboxConnection.batch() and flushed as bulk requests
+
+    :param netbox_con: NetboxConnection
+    """
+
+    def __init__(self, netbox_con):
+        self.netbox_con = netbox_con
+        self.creates = []
+        self.updates = {}
+        self.deletes = {}
+
+    def __len__(self):
+        return len([pending for pending in self.creates if not pending.cancelled]) + len(self.updates) + len(self.deletes)
+
+    def create(self, params, body):
+        """Queue a POST, returns a Pending"""
+        pending = Pending(cache_path(params), body)
+        self.creates.append(pending)
+        return pending
+
+    def update(self, params, key, body):
+        """Queue a PATCH, merged with the queued create or PATCHes of the same object"""
+        path = cache_path(params)
+        if (path, key) in self.deletes:
+            raise ValueError('{}{} is deleted in this batch'.format(path, key))
+
+        if isinstance(key, Pending):
+            if key.cancelled:
+                raise ValueError('{!r} is deleted in this batch'.format(key))
+            key.fields.update(body)
+            return key
+
+        self.updates.setdefault((path, key), {}).update(body)
+        return True
+
+    def delete(self, params, key):
+        """Queue a DELETE, a queued create of the same object is cancelled instead"""
+        path = cache_path(params)
+        if isinstance(key, Pending):
+            key.cancelled = True
+            return True
+
+        self.updates.pop((path, key), None)
+        self.deletes[(path, key)] = True
+        return True
+
+    def flush(self):
+        """Send the queued writes, creates first, then updates and deletes
+
+        Creates run in dependency order of their endpoints, an object is only sent once the
+        pending objects it refers to exist, e.g. a region created in the same batch as its parent
+        region is sent in a second bulk request. Updates follow in dependency order and deletes
+        in reverse dependency order.
+
+        :return: dict with the number of created, updated and deleted objects
+        """
+        creates = [pending for pending in self.creates if not pending.cancelled]
+        result = {'created': len(creates), 'updated': len(self.updates), 'deleted': len(self.deletes)}
+
+        while creates:
+            ready = [pending for pending in creates if self._is_ready(pending)]
+            if not ready:
+                raise exceptions.CreateException({"detail": "Circular references between {}".format(
+                    ', '.join(sorted({pending.path for pending in creates})))})
+
+            path = min((pending.path for pending in ready), key=models.dependency_index)
+            group = [pending for pending in ready if pending.path == path]
+            created = self.netbox_con.bulk_post(path, [self._substitute(pending.fields) for pending in group])
+            for pending, obj in zip(group, created):
+                pending.result = obj
+
+            creates = [pending for pending in creates if pending.result is None]
+        self.creates = []
+
+        by_path = {}
+        for (path, key), body in self.updates.items():
+            by_path.setdefault(path, []).append(dict(self._substitute(body), id=key))
+        for path in sorted(by_path, key=models.dependency_index):
+            self.netbox_con.bulk_patch(path, by_path[path])
+        self.updates = {}
+
+        by_path = {}
+        for path, key in self.deletes:
+            by_path.setdefault(path, []).append(key)
+        for path in sorted(by_path, key=models.dependency_index, reverse=True):
+            self.netbox_con.bulk_delete(path, by_path[path])
+        self.deletes = {}
+
+        return result
+
+    @classmethod
+    def _references(cls, value):
+        """Return the pending objects a field value refers to"""
+        if isinstance(value, Pending):
+            return [value]
+        if isinstance(value, (list, tuple)):
+            return [ref for item in value for ref in cls._references(item)]
+        if isinstance(value, dict):
+            return [ref for item in value.values() for ref in cls._references(item)]
+        return []
+
+    def _is_ready(self, pending):
+        for ref in self._references(pending.fields):
+            if ref.cancelled:
+                raise exceptions.NotFoundException({"detail": "{!r} is deleted in this batch".format(ref)})
+            if ref.result is None:
+                return False
+        return True
+
+    @classmethod
+    def _substitute(cls, value):
+        """Replace pending objects with their ids"""
+        if isinstance(value, Pending):
+            if value.result is None:
+                raise exceptions.NotFoundException({"detail": "{!r} is not created".format(value)})
+            return value.id
+        if isinstance(value, list):
+            return [cls._substitute(item) for item in value]
+        if isinstance(value, tuple):
+            return tuple(cls._substitute(item) for item in value)
+        if isinstance(value, dict):
+            return {key: cls._substitute(item) for key, item in value.items()}
+        return value
@@ -0,0 +1,251 @@
+import copy
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+# Query arguments of a list request which do not filter the objects
+PAGINATION = ('limit', 'offset', 'ordering', 'brief')
+
+
+def cache_path(param):
+    """Normalize an API endpoint to the form used as cache key, e.g. dcim/devices -> /dcim/devices/"""
+    return '/{}/'.format(param.strip('/'))
+
+
+def is_filtered(url):
+    """Check if a list request url has filters, e.g. ?status=active or ?q=leaf"""
+    query = urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query, keep_blank_values=True)
+    return any(key not in PAGINATION for key, value in query)
+
+
+class ObjectCache(object):
+    """Bounded LRU cache of objects seen in API responses, keyed by endpoint and id
+
+    :param max_size: Maximum number of cached objects
+    :param max_age: Seconds after which a cached object is no longer returned
+    """
+
+    def __init__(self, max_size=10000, max_age=30):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._objects = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def get(self, param, obj_id):
+        """Return a fresh cached object or None"""
+        key = (cache_path(param), obj_id)
+        with self._lock:
+            entry = self._objects.get(key)
+            if entry is None:
+                return None
+            stored, obj = entry
+            if self.max_age is not None and time.monotonic() - stored > self.max_age:
+                del self._objects[key]
+                return None
+            self._objects.move_to_end(key)
+            return obj
+
+    def put(self, param, obj):
+        """Store a copy of an object, objects without an id are ignored"""
+        if not isinstance(obj, dict) or 'id' not in obj:
+            return
+        key = (cache_path(param), obj['id'])
+        obj = copy.deepcopy(obj)
+        with self._lock:
+            self._objects[key] = (time.monotonic(), obj)
+            self._objects.move_to_end(key)
+            while len(self._objects) > self.max_size:
+                self._objects.popitem(last=False)
+
+    def put_many(self, param, objects):
+        """Store all objects of a list response"""
+        for obj in objects:
+            self.put(param, obj)
+
+    def evict(self, param, obj_id):
+        """Remove an object from the cache"""
+        with self._lock:
+            self._objects.pop((cache_path(param), obj_id), None)
+
+    def reset_after_fork(self):
+        """Replace the lock in a forked child, it may have been held by another thread of the parent"""
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Remove all objects from the cache"""
+        with self._lock:
+            self._objects.clear()
+
+
+class ResponseCache(object):
+    """Bounded LRU cache of list responses of get(), keyed by request url
+
+    Writes through the connection keep the cached lists current: updated objects are replaced
+    in the unfiltered lists, deleted objects are removed from all lists. Filtered lists of an
+    endpoint are dropped when an object is updated, all lists when an object is created, as it
+    is unknown which filters the changed or new object matches. Objects are stored and returned
+    as copies, so changes of the caller (e.g. by prefetch()) never reach the cache.
+
+    :param max_size: Maximum number of cached responses
+    :param max_age: Seconds after which a cached response is no longer returned
+    """
+
+    def __init__(self, max_size=1000, max_age=60):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._responses)
+
+    def get(self, url):
+        """Return a copy of the objects of a fresh cached response or None"""
+        with self._lock:
+            entry = self._responses.get(url)
+            if entry is None:
+                return None
+            stored, path, objects = entry
+            if self.max_age is not None and time.monotonic() - stored > self.max_age:
+                del self._responses[url]
+                return None
+            self._responses.move_to_end(url)
+            return copy.deepcopy(objects)
+
+    def put(self, param, url, objects):
+        """Store a copy of the objects of a list response"""
+        objects = copy.deepcopy(list(objects))
+        with self._lock:
+            self._responses[url] = (time.monotonic(), cache_path(param), objects)
+            self._responses.move_to_end(url)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def update(self, param, obj):
+        """Replace an object in the unfiltered cached responses of its endpoint and drop the filtered ones"""
+        path = cache_path(param)
+        obj = copy.deepcopy(obj)
+        with self._lock:
+            for url, (stored, cached_path, objects) in list(self._responses.items()):
+                if cached_path != path:
+                    continue
+                if is_filtered(url):
+                    del self._responses[url]
+                    continue
+                for index, cached in enumerate(objects):
+                    if isinstance(cached, dict) and cached.get('id') == obj.get('id'):
+                        objects[index] = obj
+
+    def evict(self, param, obj_id):
+        """Remove an object from every cached response of its endpoint"""
+        path = cache_path(param)
+        with self._lock:
+            for stored, cached_path, objects in self._responses.values():
+                if cached_path == path:
+                    objects[:] = [cached for cached in objects
+                                  if not (isinstance(cached, dict) and cached.get('id') == obj_id)]
+
+    def dump(self):
+        """Return the cached responses as (url, endpoint, objects) tuples, least recently used first"""
+        with self._lock:
+            return [(url, path, copy.deepcopy(objects)) for url, (stored, path, objects) in self._responses.items()]
+
+    def restore(self, entries):
+        """Store responses returned by dump() as fresh entries"""
+        for url, path, objects in entries:
+            self.put(path, url, objects)
+
+    def invalidate(self, param):
+        """Drop all cached responses of an endpoint"""
+        path = cache_path(param)
+        with self._lock:
+            for url in [url for url, (stored, cached_path, objects) in self._responses.items() if cached_path == path]:
+                del self._responses[url]
+
+    def reset_after_fork(self):
+        """Replace the lock in a forked child, it may have been held by another thread of the parent"""
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Remove all responses from the cache"""
+        with self._lock:
+            self._responses.clear()
+
+
+class IdCache(object):
+    """Cache of name to id lookups of resolve_ids, keyed by endpoint, field and value
+
+    :param fields: Fields which are cached from objects written through the connection
+    :param max_age: Seconds after which a cached id is no longer returned
+    """
+
+    def __init__(self, fields=('name', 'slug', 'model', 'address', 'prefix'), max_age=60):
+        self.fields = fields
+        self.max_age = max_age
+        self._ids = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get_many(self, param, field, values):
+        """Return a dict mapping the values with a fresh cached id to the id"""
+        path = cache_path(param)
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for value in values:
+                entry = self._ids.get((path, field, value))
+                if entry is not None and (self.max_age is None or now - entry[0] <= self.max_age):
+                    found[value] = entry[1]
+        return found
+
+    def put(self, param, field, value, obj_id):
+        """Store the id of the object with a value of a field"""
+        key = (cache_path(param), field, value)
+        with self._lock:
+            previous = self._ids.get(key)
+            if previous is not None and previous[1] != obj_id:
+                self._keys.get((key[0], previous[1]), set()).discard(key)
+            self._ids[key] = (time.monotonic(), obj_id)
+            self._keys.setdefault((key[0], obj_id), set()).add(key)
+
+    def update(self, param, obj):
+        """Replace the cached values of an object, e.g. after a rename"""
+        if not isinstance(obj, dict) or 'id' not in obj:
+            return
+        self.evict(param, obj['id'])
+        for field in self.fields:
+            if isinstance(obj.get(field), (str, int)):
+                self.put(param, field, obj[field], obj['id'])
+
+    def dump(self):
+        """Return the cached ids as (endpoint, field, value, id) tuples"""
+        with self._lock:
+            return [(path, field, value, obj_id) for (path, field, value), (stored, obj_id) in self._ids.items()]
+
+    def restore(self, entries):
+        """Store ids returned by dump() as fresh entries"""
+        for path, field, value, obj_id in entries:
+            self.put(path, field, value, obj_id)
+
+    def evict(self, param, obj_id):
+        """Remove all cached values of an object"""
+        with self._lock:
+            for key in self._keys.pop((cache_path(param), obj_id), ()):
+                self._ids.pop(key, None)
+
+    def reset_after_fork(self):
+        """Replace the lock in a forked child, it may have been held by another thread of the parent"""
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Remove all ids from the cache"""
+        with self._lock:
+            self._ids.clear()
+            self._keys.clear()
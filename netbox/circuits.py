@@ -1,16 +1,24 @@
 import netbox.exceptions as exceptions
 from netbox.dcim import Dcim
+from netbox.endpoint import Endpoint
 
 
 class Circuits(object):
 
     def __init__(self, netbox_con):
         self.netbox_con = netbox_con
+        self.providers = Endpoint(netbox_con, 'providers')
+        self.circuit_types = Endpoint(netbox_con, 'circuit-types')
+        self.circuits = Endpoint(netbox_con, 'circuits')
         self.dcim = Dcim(self.netbox_con)
 
     def get_circuits(self, **kwargs):
         """Returns the circuits"""
-        return self.netbox_con.get('/circuits/circuits/', **kwargs)
+        return self.circuits.list(**kwargs)
+
+    def count_circuits(self, **kwargs):
+        """Returns the number of circuits matching the filters"""
+        return self.circuits.count(**kwargs)
 
     def create_circuit(self, circuit_provider, cid, circuit_type, status_id, **kwargs):
         """Create a new circuits
@@ -31,19 +39,7 @@ class Circuits(object):
         5: Decommissioned
 
         """
-        try:
-            provider_id = self.get_providers(name=circuit_provider)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "cirtcuit provider: {}".format(circuit_provider)}) from None
-
-        try:
-            type_id = self.get_types(name=circuit_type)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "circuit type: {}".format(circuit_type)}) from None
-
-        required_fields = {"provider": provider_id, "circuit": cid, "type": type_id,
-                           "status": status_id}
-        return self.netbox_con.post('/circuits/circuits/', required_fields, **kwargs)
+        return self.circuits.create(cid, circuit_provider, circuit_type, status=status_id, **kwargs)
 
     def delete_circuit(self, cid, provider):
         """Delete circuits
@@ -56,7 +52,7 @@ class Circuits(object):
             circuits_id = self.get_circuits(cid=cid, provider=provider)[0]['id']
         except IndexError:
             raise exceptions.NotFoundException({"detail": "Circuit with circuit: {} and provider: {}".format(cid, provider)}) from None
-        return self.netbox_con.delete('/circuits/circuits/', circuits_id)
+        return self.circuits.delete_by_id(circuits_id)
 
     def update_circuit(self, cid, **kwargs):
         """Update circuit
@@ -65,15 +61,11 @@ class Circuits(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            circuit_id = self.get_circuits(cid=cid)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "Circuit with circuit: {}".format(cid)}) from None
-        return self.netbox_con.patch('/circuits/circuits/', circuit_id, **kwargs)
+        return self.circuits.update(cid, **kwargs)
 
     def get_providers(self, **kwargs):
         """Returns circuit providers"""
-        return self.netbox_con.get('/circuits/providers/', **kwargs)
+        return self.providers.list(**kwargs)
 
     def create_provider(self, name, slug):
         """Create a new circuit provider
@@ -82,8 +74,7 @@ class Circuits(object):
         :param slug: slug name
         :return: netbox object if successful otherwise exception raised
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/circuits/providers/', required_fields)
+        return self.providers.create(name, slug)
 
     def delete_provider(self, provider_name):
         """Delete circuit provider
@@ -91,11 +82,7 @@ class Circuits(object):
         :param provider_name: circuit provider to delete
         :return: bool True if successful otherwise delete exception
         """
-        try:
-            circuits_provider_id = self.get_providers(name=provider_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "circuit provider: {}".format(provider_name)}) from None
-        return self.netbox_con.delete('/circuits/providers/', circuits_provider_id)
+        return self.providers.delete(provider_name)
 
     def update_provider(self, provider_name, **kwargs):
         """Update circuit provider
@@ -104,15 +91,11 @@ class Circuits(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            circuits_provider_id = self.get_providers(name=provider_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "circuit provider: {}".format(provider_name)}) from None
-        return self.netbox_con.patch('/circuits/providers/', circuits_provider_id, **kwargs)
+        return self.providers.update(provider_name, **kwargs)
 
     def get_types(self, **kwargs):
         """Returns the circuit types"""
-        return self.netbox_con.get('/circuits/circuit-types/', **kwargs)
+        return self.circuit_types.list(**kwargs)
 
     def create_type(self, name, slug):
         """Create a new circuit type
@@ -121,8 +104,7 @@ class Circuits(object):
         :param slug: slug name
         :return: netbox object if successful otherwise exception raised
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/circuits/circuit-types/', required_fields)
+        return self.circuit_types.create(name, slug)
 
     def delete_type(self, type_name):
         """Delete circuit type
@@ -130,11 +112,7 @@ class Circuits(object):
         :param type_name: circuit type to delete
         :return: bool True if succesful otherwise delete exception
         """
-        try:
-            circuits_type_id = self.get_types(name=type_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "circuit type: {}".format(type_name)}) from None
-        return self.netbox_con.delete('/circuits/circuit-types/', circuits_type_id)
+        return self.circuit_types.delete(type_name)
 
     def update_type(self, circuit_type_name, **kwargs):
         """Update circuit role
@@ -143,11 +121,7 @@ class Circuits(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            type_id = self.get_types(name=circuit_type_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "circuit type: {}".format(circuit_type_name)}) from None
-        return self.netbox_con.patch('/circuits/circuit-types/', type_id, **kwargs)
+        return self.circuit_types.update(circuit_type_name, **kwargs)
 
     def get_terminations(self, **kwargs):
         """Returns the circuits"""
@@ -162,12 +136,8 @@ class Circuits(object):
         :param port_speed: port speed value
         :return: netbox object if successful otherwise exception raised
         """
-        try:
-            site_id = self.dcim.get_sites(name=site)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "site: {}".format(site)}) from None
-
-        required_fields = {"circuit": circuit, "term_side": term_side, "site": site_id, "port_speed": port_speed}
+        required_fields = {"circuit": circuit, "term_side": term_side, "site": self.dcim.sites.get_id(site),
+                           "port_speed": port_speed}
         return self.netbox_con.post('/circuits/circuit-terminations/', required_fields, **kwargs)
 
     def delete_termination(self, circuit, term_side, site, port_speed):
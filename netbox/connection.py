@@ -1,43 +1,196 @@
 import requests
+import urllib3
 import json
+import gzip
+import math
+import os
+import queue
+import threading
+import time
 import urllib.parse
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from urllib3.util.request import ACCEPT_ENCODING
 from netbox import exceptions
+from netbox import models
+from netbox.batch import Batch
+from netbox.cache import IdCache, ObjectCache, ResponseCache
+from netbox.diff import changed_fields
+from netbox.ratelimit import RateLimiter
+from netbox.replicas import ReplicaSet
+from netbox.schema import Schema
 
 
 class NetboxConnection(object):
 
     def __init__(self, ssl_verify=False, use_ssl=True, host=None, auth_token=None, auth=None,
-                 port=None, api_prefix=None, extra_headers=None):
+                 port=None, api_prefix=None, extra_headers=None, compress_requests=False,
+                 compress_min_size=1024, max_url_length=4000, max_workers=4, bulk_size=500,
+                 diff_updates=False, diff_max_age=30, rate_limits=None, rate_limit_dir=None,
+                 timeout=60, connect_timeout=10, read_replicas=None, replica_retry_interval=30,
+                 read_your_writes=0, cache_max_age=0, validate_requests=False, schema_cache_dir=None):
         self.use_ssl = use_ssl
         self.host = host
         self.auth_token = auth_token
         self.port = port
         self.auth = auth
         self.api_prefix = api_prefix
+        # NetBox itself does not decode gzip request bodies, this needs a proxy in front of it which
+        # does (e.g. nginx with a decompressing module). Without one the first compressed write is
+        # rejected, resent as plain json and compression is switched off, see __rejects_gzip()
+        self.compress_requests = compress_requests
+        self.compress_min_size = compress_min_size
+        # gunicorn rejects request lines longer than 4094 bytes by default
+        self.max_url_length = max_url_length
+        self.max_workers = max_workers
+        self.bulk_size = bulk_size
+        # Read and connect timeout in seconds of every request, so a stalled server never hangs
+        # the caller. The read timeout bounds each socket read, not the whole response. Within a
+        # deadline() they are shortened to the remaining budget. None waits forever
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        # With diff_updates, patch() compares against the object the helper just fetched (or the
+        # current object) and only sends the changed fields, or nothing at all
+        self.diff_updates = diff_updates
+        self.object_cache = ObjectCache(max_age=diff_max_age)
+        # With cache_max_age, get() responses and resolve_ids() lookups are cached for that many
+        # seconds. Writes through this connection update all caches, see write_through()
+        self.response_cache = ResponseCache(max_age=cache_max_age) if cache_max_age else None
+        self.id_cache = IdCache(max_age=cache_max_age) if cache_max_age else None
+        # Functions called as listener(method, param, objects) after every write, DELETEs pass
+        # the deleted ids instead of objects. A weakref.WeakMethod is dropped once its object is gone
+        self.write_listeners = []
+        # rate_limits is a RateLimiter, which can be shared by connections, or a list of rules
+        if rate_limits is None or isinstance(rate_limits, RateLimiter):
+            self.rate_limiter = rate_limits
+        else:
+            self.rate_limiter = RateLimiter(rate_limits, lock_dir=rate_limit_dir)
+        # With validate_requests, filters and request bodies are checked against the OpenAPI schema
+        # of the server before they are sent. The schema is cached on disk per NetBox version
+        self.schema = Schema(self, cache_dir=schema_cache_dir)
+        self.validate_requests = validate_requests
+        self.transfer_totals = {'requests': 0, 'request_bytes': 0, 'request_bytes_sent': 0,
+                                'response_bytes': 0, 'response_bytes_decoded': 0}
 
         self.base_url = 'http{s}://{host}{p}{prefix}'.format(s='s' if use_ssl else '', p=':{}'.format(self.port) if self.port else '', host=self.host, prefix='/api' if api_prefix is None else api_prefix)
+        # GraphQL is served next to the REST API root, e.g. /api -> /graphql/
+        self.graphql_url = '{}/graphql/'.format(self.base_url[:-len('/api')] if self.base_url.endswith('/api') else self.base_url)
+
+        # GETs are spread over the read replicas, the host is the primary and gets all writes.
+        # Replicas are given as host, host:port or url, the api prefix of the primary is appended.
+        self.replicas = None
+        if read_replicas:
+            self.replicas = ReplicaSet([self.__replica_base_url(replica) for replica in read_replicas],
+                                       retry_interval=replica_retry_interval)
+        # After a write, reads go to the primary for read_your_writes seconds, so they are not
+        # answered by a replica which has not replicated the write yet
+        self.read_your_writes = read_your_writes
+        self._primary_until = 0
 
-        self.session = requests.Session()
-        self.session.verify = ssl_verify
+        if auth and auth_token:
+            raise exceptions.AuthException('Only one authentication method is possible. Please use auth or auth_token')
 
-        if auth:
-            self.session.auth = auth
+        # Every thread gets its own session built from these settings, see the session property
+        self.ssl_verify = ssl_verify
+        # ACCEPT_ENCODING also lists br and zstd when brotli or zstandard is installed
+        self.headers = {'Accept-Encoding': ACCEPT_ENCODING}
 
         if auth_token:
             token = 'Token {}'.format(self.auth_token)
-            self.session.headers.update({'Authorization': token})
-            self.session.headers.update({'Accept': 'application/json'})
-            self.session.headers.update({'Content-Type': 'application/json'})
-
-        if auth and auth_token:
-            raise exceptions.AuthException('Only one authentication method is possible. Please use auth or auth_token')
+            self.headers.update({'Authorization': token})
+            self.headers.update({'Accept': 'application/json'})
+            self.headers.update({'Content-Type': 'application/json'})
 
         if extra_headers:
-            self.session.headers.update(extra_headers)
-
-    def __request(self, method, params=None, key=None, body=None, url=None):
-
-        if method != 'GET':
+            self.headers.update(extra_headers)
+
+        self.__reset()
+
+    def __reset(self):
+        """(Re)create the per-thread and per-process state, called on init and in a forked child"""
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def __check_fork(self):
+        """Drop the state inherited from the parent when running in a forked child
+
+        The sessions of the parent are not closed, their sockets are still used by the parent.
+        Locks held by other threads of the parent at fork time would never be released in the child.
+        """
+        if self._pid != os.getpid():
+            self.__reset()
+            for cache in (self.object_cache, self.response_cache, self.id_cache):
+                if cache is not None:
+                    cache.reset_after_fork()
+            if self.rate_limiter is not None:
+                self.rate_limiter.reset_after_fork()
+            if self.replicas is not None:
+                self.replicas.reset_after_fork()
+            self.schema.reset_after_fork()
+
+    def __replica_base_url(self, replica):
+        """Return the API root url of a read replica"""
+        if '://' not in replica:
+            replica = 'http{s}://{host}'.format(s='s' if self.use_ssl else '', host=replica)
+        return '{}{}'.format(replica.rstrip('/'), '/api' if self.api_prefix is None else self.api_prefix)
+
+    def __rebase(self, url, base_url):
+        """Point a request url, e.g. a next link of a replica, to another API root"""
+        query = urllib.parse.urlsplit(url).query
+        return '{}{}{}'.format(base_url, self.__endpoint_path(url), '?{}'.format(query) if query else '')
+
+    def check_replicas(self):
+        """Check the status endpoint of every read replica and only use the replicas which respond
+
+        :return: dict mapping the replica url to True if healthy
+        """
+        health = {}
+        for replica in self.replicas.urls if self.replicas is not None else []:
+            try:
+                healthy = self.__send('GET', '{}/status/'.format(replica), None, {}).status_code == 200
+            except (ConnectionError, TimeoutError):
+                healthy = False
+            if healthy:
+                self.replicas.mark_up(replica)
+            else:
+                self.replicas.mark_down(replica)
+            health[replica] = healthy
+        return health
+
+    def new_session(self):
+        """Return a new requests session with the settings of this connection"""
+        session = requests.Session()
+        session.verify = self.ssl_verify
+        session.headers.update(self.headers)
+        if self.auth:
+            session.auth = self.auth
+        return session
+
+    @property
+    def session(self):
+        """The requests session of the current thread
+
+        Sessions are not shared: every thread uses its own session and connection pool, and a
+        process forked from a process using this connection creates new sessions on first use.
+        Change the headers of all future sessions through the headers attribute.
+        """
+        self.__check_fork()
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self.new_session()
+        return session
+
+    @property
+    def last_transfer(self):
+        """Byte counts of the last request made by the current thread, None before the first request"""
+        self.__check_fork()
+        return getattr(self._local, 'last_transfer', None)
+
+    def __request(self, method, params=None, key=None, body=None, url=None, read_only=False):
+
+        if method != 'GET' and not read_only:
             if not self.auth_token:
                 raise exceptions.AuthException('Authentication credentials were not provided')
 
@@ -50,20 +203,48 @@ class NetboxConnection(object):
             else:
                 url = self.base_url + str(params)
 
-        request = requests.Request(method=method, url=url, json=body)
-        prepared_request = self.session.prepare_request(request)
+        data = None
+        headers = {}
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        sent = data
+        if data is not None and self.compress_requests and len(data) >= self.compress_min_size:
+            sent = gzip.compress(data)
+            headers['Content-Encoding'] = 'gzip'
+
+        replica = None
+        if method == 'GET' and self.replicas is not None and time.monotonic() >= self._primary_until:
+            replica = self.replicas.choose()
+            if replica is not None:
+                url = self.__rebase(url, replica)
 
         try:
-            response = self.session.send(prepared_request)
-        except requests.exceptions.ConnectionError:
-            err_msg = 'Unable to connect to Netbox host: {}'.format(self.host)
-            raise ConnectionError(err_msg) from None
-        except requests.exceptions.Timeout:
-            raise TimeoutError('Connection to Netbox host timed out') from None
-        except Exception as e:
-            raise Exception(e)
-        finally:
-            self.close()
+            response = self.__send(method, url, sent, headers)
+            failed = replica is not None and response.status_code >= 500
+        except (ConnectionError, TimeoutError):
+            if replica is None:
+                raise
+            failed = True
+
+        if failed:
+            # Take the replica out of rotation and answer the read from the primary
+            self.replicas.mark_down(replica)
+            url = self.__rebase(url, self.base_url)
+            response = self.__send(method, url, sent, headers)
+
+        if method != 'GET' and not read_only and self.read_your_writes:
+            self._primary_until = time.monotonic() + self.read_your_writes
+
+        if sent is not data and self.__rejects_gzip(response):
+            # The server does not accept gzip request bodies, stop trying and resend as plain json
+            self.compress_requests = False
+            sent = data
+            del headers['Content-Encoding']
+            response = self.__send(method, url, sent, headers)
+
+        self.__account_transfer(method, url, response, data, sent)
 
         if not 200 <= response.status_code < 300:
             self.__raise_error(response.status_code, response.content)
@@ -82,11 +263,193 @@ class NetboxConnection(object):
 
         return response_data
 
-    def get(self, param, key=None, limit=0, **kwargs):
+    @staticmethod
+    def __rejects_gzip(response):
+        """Whether the response refuses a gzip request body
+
+        A server which checks Content-Encoding answers 415. NetBox ignores the header and
+        answers 400 with the JSON parse error of Django REST framework for the compressed bytes.
+        """
+        if response.status_code == 415:
+            return True
+        return response.status_code == 400 and b'parse error' in response.content.lower()
+
+    def __send(self, method, url, data, headers):
+
+        request = requests.Request(method=method, url=url, data=data, headers=headers)
+        session = self.session
+        prepared_request = session.prepare_request(request)
+        if self.rate_limiter is None:
+            limit = nullcontext()
+        else:
+            # Waiting for the rate limiter is bounded by the deadline, see deadline()
+            limit = self.rate_limiter.limit(method, self.__endpoint_path(url), timeout=self.remaining_time())
+        capped = (False, False)
+
+        try:
+            with limit:
+                # Taken after waiting for the rate limiter, the wait counts against the deadline
+                timeout, capped = self.__timeout()
+                if self.remaining_time() is None:
+                    return session.send(prepared_request, timeout=timeout)
+                response = session.send(prepared_request, timeout=timeout, stream=True)
+                return self.__read_body(response, method, url)
+        except requests.exceptions.Timeout as e:
+            if capped[0 if isinstance(e, requests.exceptions.ConnectTimeout) else 1]:
+                raise exceptions.DeadlineExceededException(
+                    {'detail': 'Deadline exceeded during {} {}'.format(method, url)}) from None
+            raise TimeoutError('Connection to Netbox host timed out') from None
+        except requests.exceptions.ConnectionError:
+            err_msg = 'Unable to connect to Netbox host: {}'.format(self.host)
+            raise ConnectionError(err_msg) from None
+        except Exception as e:
+            raise Exception(e)
+        finally:
+            self.close()
+
+    def __read_body(self, response, method, url):
+        """Read a streamed response within the deadline, the remaining budget is checked after every read
+
+        The socket timeout only bounds a single read, a server which keeps sending a few bytes
+        would otherwise keep the request running past the deadline.
+        """
+        chunks = []
+        try:
+            for chunk in self.__body_reads(response):
+                chunks.append(chunk)
+                if self.remaining_time() <= 0:
+                    raise exceptions.DeadlineExceededException(
+                        {'detail': 'Deadline exceeded while reading {} {}'.format(method, url)})
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+            # A read timeout while streaming is a ConnectionError, as for requests' iter_content()
+            if self.remaining_time() <= 0:
+                raise exceptions.DeadlineExceededException(
+                    {'detail': 'Deadline exceeded while reading {} {}'.format(method, url)}) from None
+            if isinstance(e, urllib3.exceptions.HTTPError):
+                raise requests.exceptions.ConnectionError(e) from None
+            raise
+        finally:
+            response.close()
+        response._content = b''.join(chunks)
+        return response
+
+    @staticmethod
+    def __body_reads(response):
+        """Yield the decoded body as it arrives, urllib3 1.x has no read1() and gets small fixed reads"""
+        read1 = getattr(response.raw, 'read1', None)
+        if read1 is None:
+            yield from response.iter_content(chunk_size=1024)
+            return
+        while True:
+            chunk = read1(65536, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+
+    def __timeout(self):
+        """Return the (connect, read) timeout of the next request and which of them the deadline cut short"""
+        expires = getattr(self._local, 'deadline', None)
+        if expires is None:
+            return (self.connect_timeout, self.timeout), (False, False)
+
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            raise exceptions.DeadlineExceededException({'detail': 'Deadline exceeded before the request was sent'})
+
+        timeouts = (self.connect_timeout, self.timeout)
+        capped = tuple(limit is None or remaining < limit for limit in timeouts)
+        return tuple(remaining if cap else limit for cap, limit in zip(capped, timeouts)), capped
+
+    @contextmanager
+    def deadline(self, seconds):
+        """Bound all requests made in the block, also by worker threads of run_parallel, to a time budget
+
+        Every request gets the remaining budget as connect and read timeout (or the configured
+        timeouts when they are shorter), and the response body is read in chunks with the budget
+        checked after each of them, so a server which keeps trickling bytes can not extend it.
+        A single stalled socket read still ends only at its timeout, which is at most the budget
+        left when the request was sent. When the budget runs out, the running or next request
+        raises DeadlineExceededException. Waiting for the rate limits is part of the budget, a
+        request which can not get its slot or token in time raises it without waiting.
+        Nested deadlines never extend the outer deadline.
+
+        Example:
+
+            >>> with netbox.connection.deadline(2.5):
+            ...     netbox.dcim.create_device('device1', 'leaf', 'site1', 'qfx5100')
+
+        :param seconds: Time budget of the block
+        """
+        outer = getattr(self._local, 'deadline', None)
+        expires = time.monotonic() + seconds
+        self._local.deadline = expires if outer is None else min(outer, expires)
+        try:
+            yield
+        finally:
+            self._local.deadline = outer
+
+    def remaining_time(self):
+        """Return the seconds left of the deadline of the current thread, None without a deadline"""
+        expires = getattr(self._local, 'deadline', None)
+        return None if expires is None else max(0.0, expires - time.monotonic())
+
+    def with_deadline(self, function):
+        """Wrap a function to run under the deadline of the calling thread, for use in worker threads"""
+        expires = getattr(self._local, 'deadline', None)
+        if expires is None:
+            return function
+
+        def bound(*args, **kwargs):
+            outer = getattr(self._local, 'deadline', None)
+            self._local.deadline = expires
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._local.deadline = outer
+
+        return bound
+
+    def __endpoint_path(self, url):
+        """Return the path of a request url relative to the API root, e.g. /dcim/devices/"""
+        path = urllib.parse.urlsplit(url).path
+        api_path = urllib.parse.urlsplit(self.base_url).path
+        return path[len(api_path):] if path.startswith(api_path) else path
+
+    def __account_transfer(self, method, url, response, data, sent):
+        """Record the compressed and uncompressed byte counts of a request
+
+        The wire size of the response is the number of bytes urllib3 pulled from the socket,
+        the decoded size is the length of the body after content decoding.
+        """
+        decoded = len(response.content)
+        try:
+            wire = response.raw.tell() or decoded
+        except (AttributeError, ValueError):
+            wire = decoded
+
+        self._local.last_transfer = transfer = {
+            'method': method,
+            'url': url,
+            'status_code': response.status_code,
+            'request_bytes': len(data) if data else 0,
+            'request_bytes_sent': len(sent) if sent else 0,
+            'response_bytes': wire,
+            'response_bytes_decoded': decoded,
+            'content_encoding': response.headers.get('Content-Encoding'),
+        }
+
+        with self._lock:
+            self.transfer_totals['requests'] += 1
+            for counter in ('request_bytes', 'request_bytes_sent', 'response_bytes', 'response_bytes_decoded'):
+                self.transfer_totals[counter] += transfer[counter]
+
+    def get(self, param, key=None, limit=0, prefetch=None, **kwargs):
+
+        if self.validate_requests:
+            self.schema.validate_filters(param, kwargs)
 
         if kwargs:
-            url = '{}{}?{}&limit={}'.format(self.base_url, param,
-                                            '&'.join('{}={}'.format(key, urllib.parse.quote(str(val))) for key, val in kwargs.items()), limit)
+            url = '{}{}?{}&limit={}'.format(self.base_url, param, self.encode_query(kwargs), limit)
         elif key:
             if '_choices' in param:
                 url = '{}{}{}/?limit={}'.format(self.base_url, param, key, limit)
@@ -95,21 +458,404 @@ class NetboxConnection(object):
         else:
             url = '{}{}?limit={}'.format(self.base_url, param, limit)
 
+        if self.response_cache is not None and 'status' not in param:
+            results = self.response_cache.get(url)
+            if results is not None:
+                if prefetch:
+                    self.prefetch(param, results, prefetch)
+                return results
+
         resp_data = self.__request('GET', params=param, key=key, url=url)
 
         if 'status' in param:
             return resp_data
 
+        if self.diff_updates:
+            self.object_cache.put_many(param, resp_data['results'])
+
+        if self.response_cache is not None:
+            self.response_cache.put(param, url, resp_data['results'])
+
+        if prefetch:
+            self.prefetch(param, resp_data['results'], prefetch)
+
         return resp_data['results']
 
+    def count(self, param, **kwargs):
+        """Return the number of objects matching the filters without fetching them
+
+        Only one brief row is requested, the count is read from the paginated response.
+
+        :param param: API endpoint, e.g. /dcim/devices/ or dcim/devices
+        :param kwargs: Filter arguments
+        :return: number of matching objects
+        """
+        param = '/{}/'.format(param.strip('/'))
+        if self.validate_requests:
+            self.schema.validate_filters(param, kwargs)
+        url = '{}{}?{}'.format(self.base_url, param, self.encode_query(dict(kwargs, limit=1, brief=1)))
+        return self.__request('GET', params=param, url=url)['count']
+
+    def get_document(self, param, **kwargs):
+        """Return the response of an endpoint which is not a paginated list, e.g. /status/ or /schema/
+
+        :param param: API endpoint, e.g. /schema/
+        :param kwargs: Query arguments
+        :return: decoded json response
+        """
+        url = '{}{}{}'.format(self.base_url, param, '?{}'.format(self.encode_query(kwargs)) if kwargs else '')
+        return self.__request('GET', params=param, url=url)
+
+    def exists(self, param, **kwargs):
+        """Check if any object matches the filters
+
+        :param param: API endpoint, e.g. /ipam/ip-addresses/ or ipam/ip-addresses
+        :param kwargs: Filter arguments
+        :return: bool
+        """
+        return self.count(param, **kwargs) > 0
+
+    def prefetch(self, param, objects, fields):
+        """Replace nested references with the full related objects
+
+        The distinct ids of every related endpoint are fetched once, in chunked multi-value id
+        requests, and the endpoints are fetched concurrently. Example:
+
+            >>> netbox.dcim.get_devices(prefetch=['site', 'tenant', 'primary_ip4'])
+
+        :param param: API endpoint of the objects, used to find the related model of references without url
+        :param objects: list of objects, updated in place
+        :param fields: list of reference fields to expand
+        :return: the objects
+        """
+        foreign_keys = {}
+        try:
+            foreign_keys = models.get_model(param).foreign_keys
+        except KeyError:
+            pass
+
+        wanted = {}
+        for obj in objects:
+            for field in fields:
+                path = self.__reference_path(obj.get(field), foreign_keys.get(field))
+                if path is not None:
+                    wanted.setdefault(path, set()).add(obj[field]['id'])
+
+        paths = list(wanted)
+        results = self.run_parallel([(self.get_batched, (path, 'id', sorted(wanted[path])), {}) for path in paths])
+        related = {(path, obj['id']): obj for path, result in zip(paths, results) for obj in result}
+
+        for obj in objects:
+            for field in fields:
+                path = self.__reference_path(obj.get(field), foreign_keys.get(field))
+                if path is not None:
+                    obj[field] = related.get((path, obj[field]['id']), obj[field])
+
+        return objects
+
+    def __reference_path(self, ref, model_name):
+        """Return the endpoint of a nested reference, from its url or else from the model registry"""
+        if not isinstance(ref, dict) or 'id' not in ref:
+            return None
+        if ref.get('url'):
+            return self.__endpoint_path(ref['url']).rstrip('/').rsplit('/', 1)[0] + '/'
+        if model_name is not None:
+            return models.get_model(model_name).path
+        return None
+
+    def get_batched(self, param, field, values, **kwargs):
+        """Get the objects matching any of the given values with as few requests as possible
+
+        The values are sent as a multi-value filter (field=a&field=b&...) and split into chunks
+        which keep every url below max_url_length.
+
+        :param param: API endpoint, e.g. /dcim/devices/ or dcim/devices
+        :param field: Filter field, e.g. name or id
+        :param values: Iterable with filter values
+        :param kwargs: Additional filter arguments
+        :return: list of matching objects
+        """
+        param = '/{}/'.format(param.strip('/'))
+        values = list(dict.fromkeys(values))
+        results = []
+
+        for chunk in self.chunk_values(param, field, values, **kwargs):
+            results.extend(self.iterate(param, **dict(kwargs, **{field: chunk})))
+
+        return results
+
+    def iterate(self, param, limit=0, **kwargs):
+        """Iterate over all objects of a list endpoint, following the next links page by page
+
+        :param param: API endpoint, e.g. /dcim/devices/ or dcim/devices
+        :param limit: Page size, 0 uses the MAX_PAGE_SIZE of the server
+        :param kwargs: Filter arguments
+        :return: generator of objects
+        """
+        param = '/{}/'.format(param.strip('/'))
+        if self.validate_requests:
+            self.schema.validate_filters(param, kwargs)
+        url = '{}{}?{}'.format(self.base_url, param, self.encode_query(dict(kwargs, limit=limit)))
+
+        while url:
+            resp_data = self.__request('GET', params=param, url=url)
+            if self.diff_updates:
+                self.object_cache.put_many(param, resp_data['results'])
+            yield from resp_data['results']
+            url = resp_data.get('next')
+
+    def iterate_keyset(self, param, limit=1000, **kwargs):
+        """Iterate over all objects of a list endpoint ordered by id, paging with id__gt instead of offset
+
+        Keyset pages cost the same at any depth and do not skip or repeat objects when objects are
+        created or deleted during the scan.
+
+        :param param: API endpoint, e.g. /ipam/ip-addresses/ or ipam/ip-addresses
+        :param limit: Page size
+        :param kwargs: Filter arguments
+        :return: generator of objects
+        """
+        param = '/{}/'.format(param.strip('/'))
+        for page in self.__keyset_pages(param, limit, None, None, kwargs):
+            yield from page
+
+    def scan_keyset(self, param, shards=None, limit=1000, **kwargs):
+        """Scan a list endpoint with concurrent keyset scans over ranges of ids
+
+        The id range between the lowest and highest matching id is split into shards, which are
+        scanned concurrently. Objects are yielded as pages arrive, so not in id order.
+
+        :param param: API endpoint, e.g. /ipam/ip-addresses/ or ipam/ip-addresses
+        :param shards: Number of concurrent range scans, defaults to max_workers
+        :param limit: Page size
+        :param kwargs: Filter arguments
+        :return: generator of objects
+        """
+        param = '/{}/'.format(param.strip('/'))
+        shards = shards or self.max_workers
+
+        first, last = self.run_parallel([(self.__edge_id, (param, 'id', kwargs), {}),
+                                         (self.__edge_id, (param, '-id', kwargs), {})])
+        if first is None:
+            return
+
+        if shards < 2 or last - first < limit:
+            for page in self.__keyset_pages(param, limit, None, None, kwargs):
+                yield from page
+            return
+
+        step = math.ceil((last - first + 1) / shards)
+        bounds = [(first - 1 + shard * step, min(first - 1 + (shard + 1) * step, last)) for shard in range(shards)]
+        pages = queue.Queue(maxsize=shards * 2)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def scan_range(lower, upper):
+            try:
+                for page in self.__keyset_pages(param, limit, lower, upper, kwargs):
+                    if not put(page):
+                        return
+            except BaseException as e:
+                put(e)
+            finally:
+                put(done)
+
+        scan = self.with_deadline(scan_range)
+        with ThreadPoolExecutor(max_workers=len(bounds)) as executor:
+            for lower, upper in bounds:
+                executor.submit(scan, lower, upper)
+
+            try:
+                running = len(bounds)
+                while running:
+                    item = pages.get()
+                    if item is done:
+                        running -= 1
+                    elif isinstance(item, BaseException):
+                        raise item
+                    else:
+                        yield from item
+            finally:
+                stop.set()
+
+    def __keyset_pages(self, param, limit, lower, upper, filters):
+        """Yield pages of objects with lower < id <= upper, None means unbounded"""
+        while True:
+            query = dict(filters, ordering='id', limit=limit)
+            if lower is not None:
+                query['id__gt'] = lower
+            if upper is not None:
+                query['id__lte'] = upper
+
+            url = '{}{}?{}'.format(self.base_url, param, self.encode_query(query))
+            resp_data = self.__request('GET', params=param, url=url)
+            results = resp_data['results']
+
+            if self.diff_updates:
+                self.object_cache.put_many(param, results)
+            if results:
+                yield results
+            if not results or not resp_data.get('next'):
+                return
+            lower = results[-1]['id']
+
+    def __edge_id(self, param, ordering, filters):
+        """Return the lowest or highest id matching the filters, or None"""
+        url = '{}{}?{}'.format(self.base_url, param, self.encode_query(dict(filters, ordering=ordering, limit=1, brief=1)))
+        results = self.__request('GET', params=param, url=url)['results']
+        return results[0]['id'] if results else None
+
+    def resolve_ids(self, param, names, field='name', **kwargs):
+        """Resolve many names to object IDs with as few requests as possible
+
+        Example:
+
+            >>> netbox.connection.resolve_ids('dcim/sites', names=['site1', 'site2'])
+            {'site1': 1, 'site2': 2}
+
+        :param param: API endpoint, e.g. dcim/sites
+        :param names: Iterable with the names to resolve
+        :param field: Field the names are matched on, e.g. name, slug or model
+        :param kwargs: Additional filter arguments, e.g. site=... for devices
+        :return: dict mapping every name that was found to its id
+        """
+        if self.id_cache is None or kwargs:
+            return {obj[field]: obj['id'] for obj in self.get_batched(param, field, names, **kwargs)}
+
+        names = list(names)
+        ids = self.id_cache.get_many(param, field, names)
+        missing = [name for name in names if name not in ids]
+        if missing:
+            for obj in self.get_batched(param, field, missing):
+                self.id_cache.put(param, field, obj[field], obj['id'])
+                ids[obj[field]] = obj['id']
+        return ids
+
+    def chunk_values(self, param, field, values, **kwargs):
+        """Split filter values into chunks which keep the request url below max_url_length"""
+        base_length = len('{}{}?{}&limit=0'.format(self.base_url, param, self.encode_query(kwargs)))
+        chunk = []
+        length = base_length
+
+        for value in values:
+            value_length = len(self.encode_query({field: value})) + 1
+            if chunk and length + value_length > self.max_url_length:
+                yield chunk
+                chunk = []
+                length = base_length
+            chunk.append(value)
+            length += value_length
+
+        if chunk:
+            yield chunk
+
+    def run_parallel(self, calls):
+        """Run independent calls concurrently
+
+        :param calls: list of (function, args, kwargs) tuples
+        :return: list with the results in the order of the calls, the first exception is raised
+        """
+        if len(calls) < 2 or self.max_workers < 2:
+            return [function(*args, **kwargs) for function, args, kwargs in calls]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(calls))) as executor:
+            futures = [executor.submit(self.with_deadline(function), *args, **kwargs)
+                       for function, args, kwargs in calls]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def encode_query(kwargs):
+        """Encode filter arguments, list values are sent as repeated keys (name=a&name=b)"""
+        query = []
+        for key, val in kwargs.items():
+            values = val if isinstance(val, (list, tuple, set, frozenset)) else [val]
+            query.extend('{}={}'.format(key, urllib.parse.quote(str(item))) for item in values)
+        return '&'.join(query)
+
+    def graphql(self, query, variables=None):
+        """Post a GraphQL query and return the data member of the response
+
+        :param query: GraphQL query document
+        :param variables: Optional dict with query variables
+        :return: dict with the query result
+        """
+        body = {'query': query}
+        if variables:
+            body['variables'] = variables
+
+        resp_data = self.__request('POST', url=self.graphql_url, body=body, read_only=True)
+
+        if resp_data.get('errors'):
+            raise exceptions.GraphqlException(resp_data['errors'])
+
+        return resp_data['data']
+
     def put(self, params):
 
         return self.__request('PUT', params)
 
+    @contextmanager
+    def batch(self):
+        """Queue the writes of the current thread and send them as bulk requests at the end of the block
+
+        Inside the block post (create_*), patch (update_*_by_id) and delete (delete_*_by_id)
+        calls are queued and return at once, reads are sent as usual. PATCHes of the same object
+        are merged into one, a create followed by a delete of the same object cancels out. Creates
+        return a Pending, which can be used as id in later calls of the same batch. When the
+        block raises an exception nothing is sent. A nested batch joins the outer batch.
+
+        Example:
+
+            >>> with netbox.connection.batch():
+            ...     device = netbox.dcim.create_device('device1', 'leaf', 'site1', 'qfx5100')
+            ...     for index in range(48):
+            ...         netbox.dcim.create_interface('xe-0/0/{}'.format(index), '10gbase-x-sfpp', device['id'])
+
+        :return: Batch
+        """
+        outer = getattr(self._local, 'batch', None)
+        if outer is not None:
+            yield outer
+            return
+
+        batch = self._local.batch = Batch(self)
+        try:
+            yield batch
+        finally:
+            self._local.batch = None
+        batch.flush()
+
     def patch(self, params, key, **kwargs):
 
         body_data = {key: value for (key, value) in kwargs.items()}
+
+        if self.validate_requests:
+            self.schema.validate_fields(params, [body_data], partial=True)
+
+        batch = getattr(self._local, 'batch', None)
+        if batch is not None:
+            return batch.update(params, key, body_data)
+
+        if self.diff_updates:
+            current = self.object_cache.get(params, key)
+            if current is None:
+                current = self.__request('GET', params=params, key=key)
+
+            body_data = changed_fields(current, body_data)
+            if not body_data:
+                return current
+
         resp_data = self.__request('PATCH', params=params, key=key, body=body_data)
+        self.write_through('PATCH', params, [resp_data])
 
         return resp_data
 
@@ -119,20 +865,126 @@ class NetboxConnection(object):
 
         if kwargs:
             body_data.update({key: value for (key, value) in kwargs.items()})
+
+        if self.validate_requests:
+            self.schema.validate_fields(params, [body_data])
+
+        batch = getattr(self._local, 'batch', None)
+        if batch is not None:
+            return batch.create(params, body_data)
+
         resp_data = self.__request('POST', params=params, body=body_data)
+        self.write_through('POST', params, [resp_data])
 
         return resp_data
 
     def delete(self, params, del_id):
 
+        batch = getattr(self._local, 'batch', None)
+        if batch is not None:
+            return batch.delete(params, del_id)
+
         del_str = '{}{}'.format(params, del_id)
         self.__request('DELETE', del_str)
+        self.write_through('DELETE', params, [del_id])
 
         return True
 
-    def close(self):
+    def bulk_post(self, params, objects):
+        """Create many objects with bulk requests of at most bulk_size objects
+
+        :param params: API endpoint
+        :param objects: list of dicts with the fields of the new objects
+        :return: list of created netbox objects
+        """
+        if self.validate_requests:
+            self.schema.validate_fields(params, objects)
+
+        results = []
+        for index in range(0, len(objects), self.bulk_size):
+            created = self.__request('POST', params=params, body=objects[index:index + self.bulk_size])
+            self.write_through('POST', params, created)
+            results.extend(created)
+        return results
+
+    def bulk_patch(self, params, objects):
+        """Update many objects with bulk requests of at most bulk_size objects
+
+        :param params: API endpoint
+        :param objects: list of dicts with the id and the fields to update
+        :return: list of updated netbox objects
+        """
+        if self.validate_requests:
+            self.schema.validate_fields(params, objects, partial=True)
+
+        results = []
+        for index in range(0, len(objects), self.bulk_size):
+            updated = self.__request('PATCH', params=params, body=objects[index:index + self.bulk_size])
+            self.write_through('PATCH', params, updated)
+            results.extend(updated)
+        return results
+
+    def bulk_delete(self, params, del_ids):
+        """Delete many objects with bulk requests of at most bulk_size objects
+
+        :param params: API endpoint
+        :param del_ids: list of object ids
+        :return: bool True if successful otherwise raise exception
+        """
+        for index in range(0, len(del_ids), self.bulk_size):
+            chunk = del_ids[index:index + self.bulk_size]
+            self.__request('DELETE', params=params, body=[{'id': del_id} for del_id in chunk])
+            self.write_through('DELETE', params, chunk)
+        return True
 
-        self.session.close()
+    def write_through(self, method, params, objects):
+        """Apply the result of a write to the caches instead of invalidating them
+
+        Created and updated objects are taken from the response, which holds the full object.
+        Cached responses of other endpoints which embed a renamed object are not updated.
+
+        :param method: POST, PATCH or DELETE
+        :param params: API endpoint
+        :param objects: Objects returned by a POST or PATCH, or the deleted ids
+        """
+        for obj in objects:
+            if method == 'DELETE':
+                self.object_cache.evict(params, obj)
+            elif self.diff_updates:
+                self.object_cache.put(params, obj)
+
+            if self.id_cache is not None:
+                if method == 'DELETE':
+                    self.id_cache.evict(params, obj)
+                else:
+                    self.id_cache.update(params, obj)
+
+            if self.response_cache is not None:
+                if method == 'DELETE':
+                    self.response_cache.evict(params, obj)
+                elif method == 'PATCH':
+                    self.response_cache.update(params, obj)
+
+        if self.response_cache is not None and method == 'POST' and objects:
+            self.response_cache.invalidate(params)
+
+        for listener in list(self.write_listeners):
+            if isinstance(listener, weakref.WeakMethod):
+                function = listener()
+                if function is None:
+                    try:
+                        self.write_listeners.remove(listener)
+                    except ValueError:
+                        pass
+                    continue
+                listener = function
+            listener(method, params, objects)
+
+    def close(self):
+        """Close the session of the current thread, a new one is created on the next request"""
+        session = getattr(self._local, 'session', None)
+        if session is not None and self._pid == os.getpid():
+            session.close()
 
     def __raise_error(self, http_status_code, http_response):
         """Raise error with detailed information from http request."""
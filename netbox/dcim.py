@@ -1,10 +1,30 @@
 import netbox.exceptions as exceptions
+from netbox.reconcile import Reconciler
+from netbox.endpoint import Endpoint
 
 
 class Dcim(object):
 
     def __init__(self, netbox_con):
         self.netbox_con = netbox_con
+        self.regions = Endpoint(netbox_con, 'regions')
+        self.sites = Endpoint(netbox_con, 'sites')
+        self.locations = Endpoint(netbox_con, 'locations')
+        self.rack_groups = Endpoint(netbox_con, 'rack-groups')
+        self.racks = Endpoint(netbox_con, 'racks')
+        self.manufacturers = Endpoint(netbox_con, 'manufacturers')
+        self.device_types = Endpoint(netbox_con, 'device-types')
+        self.interface_templates = Endpoint(netbox_con, 'interface-templates')
+        self.device_roles = Endpoint(netbox_con, 'device-roles')
+        self.platforms = Endpoint(netbox_con, 'platforms')
+        self.devices = Endpoint(netbox_con, 'devices')
+        self.interfaces = Endpoint(netbox_con, 'interfaces')
+        self.inventory_items = Endpoint(netbox_con, 'inventory-items')
+        self.rear_ports = Endpoint(netbox_con, 'rear-ports')
+        self.front_ports = Endpoint(netbox_con, 'front-ports')
+        self.cables = Endpoint(netbox_con, 'cables')
+        self.power_panels = Endpoint(netbox_con, 'power-panels')
+        self.power_feeds = Endpoint(netbox_con, 'power-feeds')
 
     def get_choices(self, choice_id=None):
         """Return choices for all fields if choice_id is not defined
@@ -15,7 +35,7 @@ class Dcim(object):
 
     def get_regions(self, **kwargs):
         """Returns the available regions"""
-        return self.netbox_con.get('/dcim/regions/', **kwargs)
+        return self.regions.list(**kwargs)
 
     def create_region(self, name, slug, **kwargs):
         """Create a new region
@@ -25,8 +45,7 @@ class Dcim(object):
         :param kwargs: optional fields
         :return: netbox object if successful otherwise exception raised
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/dcim/regions/', required_fields, **kwargs)
+        return self.regions.create(name, slug, **kwargs)
 
     def delete_region(self, region_name):
         """Delete region
@@ -34,11 +53,7 @@ class Dcim(object):
         :param region_name: Region to delete
         :return: bool True if succesful otherwise raise exception
         """
-        try:
-            region_id = self.get_regions(name=region_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "region: {}".format(region_name)}) from None
-        return self.netbox_con.delete('/dcim/regions/', region_id)
+        return self.regions.delete(region_name)
 
     def delete_region_by_id(self, region_id):
         """Delete region
@@ -46,7 +61,7 @@ class Dcim(object):
         :param region_id: Region to delete
         :return: bool True if succesful otherwise raise delete exception
         """
-        return self.netbox_con.delete('/dcim/regions/', region_id)
+        return self.regions.delete_by_id(region_id)
 
     def update_region(self, region_name, **kwargs):
         """
@@ -55,11 +70,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            region_id = self.get_regions(name=region_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "region: {}".format(region_name)}) from None
-        return self.netbox_con.patch('/dcim/regions/', region_id, **kwargs)
+        return self.regions.update(region_name, **kwargs)
 
     def update_region_id(self, region_id, **kwargs):
         """Update Region by id
@@ -68,11 +79,15 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/regions/', region_id, **kwargs)
+        return self.regions.update_by_id(region_id, **kwargs)
 
     def get_sites(self, **kwargs):
         """Returns all available sites"""
-        return self.netbox_con.get('/dcim/sites/', **kwargs)
+        return self.sites.list(**kwargs)
+
+    def count_sites(self, **kwargs):
+        """Returns the number of sites matching the filters"""
+        return self.sites.count(**kwargs)
 
     def create_site(self, name, slug, **kwargs):
         """Create a new site
@@ -82,8 +97,25 @@ class Dcim(object):
         :param kwargs: optional fields
         :return: netbox object if successful otherwise exception raised
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/dcim/sites/', required_fields, **kwargs)
+        return self.sites.create(name, slug, **kwargs)
+
+    def upsert_site(self, name, slug, **kwargs):
+        """Create a site or update it when a site with the slug exists
+
+        :param name: Site name
+        :param slug: slug name, identifies the site
+        :param kwargs: optional fields
+        :return: netbox object
+        """
+        return self.upsert_sites([dict(kwargs, name=name, slug=slug)])[0]
+
+    def upsert_sites(self, sites):
+        """Create or update many sites, matched on slug, with one lookup and bulk requests
+
+        :param sites: list of dicts with the site fields
+        :return: list of netbox objects
+        """
+        return Reconciler(self.netbox_con).upsert('sites', sites)
 
     def delete_site(self, site_name):
         """Delete site
@@ -91,11 +123,7 @@ class Dcim(object):
         :param site_name: Site to delete
         :return: bool True if succesful otherwise delete exception
         """
-        try:
-            site_id = self.get_sites(name=site_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "site: {}".format(site_name)}) from None
-        return self.netbox_con.delete('/dcim/sites/', site_id)
+        return self.sites.delete(site_name)
 
     def delete_site_by_id(self, site_id):
         """Delete site
@@ -103,7 +131,7 @@ class Dcim(object):
         :param site_id: Site to delete
         :return: bool True if succesful otherwise raise exception
         """
-        return self.netbox_con.delete('/dcim/sites/', site_id)
+        return self.sites.delete_by_id(site_id)
 
     def update_site(self, site_name, **kwargs):
         """
@@ -112,11 +140,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            site_id = self.get_sites(name=site_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "site: {}".format(site_name)}) from None
-        return self.netbox_con.patch('/dcim/sites/', site_id, **kwargs)
+        return self.sites.update(site_name, **kwargs)
 
     def update_site_by_id(self, site_id, **kwargs):
         """Update a site by id
@@ -125,11 +149,15 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/sites/', site_id, **kwargs)
+        return self.sites.update_by_id(site_id, **kwargs)
 
     def get_racks(self, **kwargs):
         """Returns all available racks"""
-        return self.netbox_con.get('/dcim/racks/', **kwargs)
+        return self.racks.list(**kwargs)
+
+    def count_racks(self, **kwargs):
+        """Returns the number of racks matching the filters"""
+        return self.racks.count(**kwargs)
 
     def create_rack(self, name, site_name, **kwargs):
         """Create new rack
@@ -139,12 +167,7 @@ class Dcim(object):
         :param kwargs: Optional arguments
         :return: netbox object if successful otherwise create exception
         """
-        try:
-            site_id = self.get_sites(name=site_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "site: {}".format(site_name)}) from None
-        required_fields = {"name": name, "site": site_id}
-        return self.netbox_con.post('/dcim/racks/', required_fields, **kwargs)
+        return self.racks.create(name, site_name, **kwargs)
 
     def delete_rack(self, rack_name):
         """Delete rack
@@ -152,11 +175,7 @@ class Dcim(object):
         :param rack_name: Name of the rack to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            rack_id = self.get_racks(name=rack_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "rack: {}".format(rack_name)}) from None
-        return self.netbox_con.delete('/dcim/racks/', rack_id)
+        return self.racks.delete(rack_name)
 
     def delete_rack_by_id(self, rack_id):
         """Delete rack
@@ -164,7 +183,7 @@ class Dcim(object):
         :param rack_id: Rack to delete
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.delete('/dcim/racks/', rack_id)
+        return self.racks.delete_by_id(rack_id)
 
     def update_rack(self, rack_name, **kwargs):
         """
@@ -177,7 +196,7 @@ class Dcim(object):
             rack_id = self.get_racks(facility_id=rack_name)[0]['id']
         except IndexError:
             raise exceptions.NotFoundException({"detail": "rack: {}".format(rack_name)}) from None
-        return self.netbox_con.patch('/dcim/racks/', rack_id, **kwargs)
+        return self.racks.update_by_id(rack_id, **kwargs)
 
     def update_rack_by_id(self, rack_id, **kwargs):
         """
@@ -186,11 +205,11 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/racks/', rack_id, **kwargs)
+        return self.racks.update_by_id(rack_id, **kwargs)
 
     def get_rack_groups(self, **kwargs):
         """Returns all available rack groups"""
-        return self.netbox_con.get('/dcim/rack-groups/', **kwargs)
+        return self.rack_groups.list(**kwargs)
 
     def create_rack_group(self, name, slug, site_name, **kwargs):
         """Create new rack group
@@ -201,12 +220,7 @@ class Dcim(object):
         :param kwargs: Optional arguments
         :return: netbox object if successful otherwise create exception
         """
-        try:
-            site_id = self.get_sites(name=site_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "site: {}".format(site_name)}) from None
-        required_fields = {"name": name, "slug": slug, "site": site_id}
-        return self.netbox_con.post('/dcim/rack-groups/', required_fields, **kwargs)
+        return self.rack_groups.create(name, slug, site_name, **kwargs)
 
     def delete_rack_group(self, name):
         """Delete rack group
@@ -214,11 +228,7 @@ class Dcim(object):
         :param name: Name of the rack group to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            rack_group_id = self.get_rack_groups(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "rack-group: {}".format(name)}) from None
-        return self.netbox_con.delete('/dcim/rack-groups/', rack_group_id)
+        return self.rack_groups.delete(name)
 
     def delete_rack_group_by_id(self, rack_group_id):
         """Delete rack group
@@ -226,7 +236,7 @@ class Dcim(object):
         :param rack_group_id: Rack group to delete
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.delete('/dcim/rack-groups/', rack_group_id)
+        return self.rack_groups.delete_by_id(rack_group_id)
 
     def update_rack_group(self, name, **kwargs):
         """
@@ -235,11 +245,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            rack_group_id = self.get_rack_groups(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "rack group: {}".format(name)}) from None
-        return self.netbox_con.patch('/dcim/rack-groups/', rack_group_id, **kwargs)
+        return self.rack_groups.update(name, **kwargs)
 
     def update_rack_group_by_id(self, rack_group_id, **kwargs):
         """
@@ -248,11 +254,19 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/rack-groups/', rack_group_id, **kwargs)
+        return self.rack_groups.update_by_id(rack_group_id, **kwargs)
 
     def get_devices(self, **kwargs):
         """Get all devices"""
-        return self.netbox_con.get('/dcim/devices/', **kwargs)
+        return self.devices.list(**kwargs)
+
+    def count_devices(self, **kwargs):
+        """Returns the number of devices matching the filters, e.g. count_devices(site='site1')"""
+        return self.devices.count(**kwargs)
+
+    def device_exists(self, **kwargs):
+        """Check if a device matching the filters exists, e.g. device_exists(name='device1')"""
+        return self.devices.exists(**kwargs)
 
     def get_devices_per_rack(self, rack_name, **kwargs):
         """Get devices which belongs to the given rack
@@ -276,26 +290,27 @@ class Dcim(object):
         :param kwargs: Optional arguments
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"name": name}
-        try:
-            device_role_id = self.get_device_roles(name=device_role)[0]['id']
-            required_fields.update({"device_role": device_role_id})
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device-role {}".format(device_role)}) from None
+        return self.devices.create(name, device_role, site_name, device_type, **kwargs)
 
-        try:
-            site_id = self.get_sites(name=site_name)[0]['id']
-            required_fields.update({"site": site_id})
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "site: {}".format(site_name)}) from None
+    def upsert_device(self, name, site, **kwargs):
+        """Create a device or update it when a device with the name exists in the site
 
-        try:
-            device_type_id = self.get_device_types(model=device_type)[0]['id']
-            required_fields.update({"device_type": device_type_id})
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device-type: {}".format(device_type)}) from None
+        :param name: Name of the device
+        :param site: Site name or id
+        :param kwargs: Optional arguments, device_role and device_type are required for a new device
+        :return: netbox object
+        """
+        return self.upsert_devices([dict(kwargs, name=name, site=site)])[0]
 
-        return self.netbox_con.post('/dcim/devices/', required_fields, **kwargs)
+    def upsert_devices(self, devices):
+        """Create or update many devices, matched on name and site, with one lookup and bulk requests
+
+        References (site, device_role, device_type, ...) can be given as id or name.
+
+        :param devices: list of dicts with the device fields
+        :return: list of netbox objects
+        """
+        return Reconciler(self.netbox_con).upsert('devices', devices)
 
     def delete_device(self, device_name):
         """Delete device by device name
@@ -303,11 +318,7 @@ class Dcim(object):
         :param device_name: Device to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            device_id = self.get_devices(name=device_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device: {}".format(device_name)}) from None
-        return self.netbox_con.delete('/dcim/devices/', device_id)
+        return self.devices.delete(device_name)
 
     def delete_device_by_id(self, device_id):
         """Delete device
@@ -315,7 +326,7 @@ class Dcim(object):
         :param device_id: Device to delete
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.delete('/dcim/devices/', device_id)
+        return self.devices.delete_by_id(device_id)
 
     def update_device(self, device_name, **kwargs):
         """Update device by device name
@@ -324,8 +335,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        device_id = self.get_devices(name=device_name)[0]['id']
-        return self.netbox_con.patch('/dcim/devices/', device_id, **kwargs)
+        return self.devices.update(device_name, **kwargs)
 
     def update_device_by_id(self, device_id, **kwargs):
         """Update device by id
@@ -334,11 +344,11 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/dcim/devices/', device_id, **kwargs)
+        return self.devices.update_by_id(device_id, **kwargs)
 
     def get_device_types(self, **kwargs):
         """Get devices by device type"""
-        return self.netbox_con.get('/dcim/device-types/', **kwargs)
+        return self.device_types.list(**kwargs)
 
     def create_device_type(self, model, slug, manufacturer, **kwargs):
         """Create device type
@@ -349,8 +359,7 @@ class Dcim(object):
         :param kwargs: optional arguments
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"model": model, "slug": slug, "manufacturer": manufacturer}
-        return self.netbox_con.post('/dcim/device-types/', required_fields, **kwargs)
+        return self.device_types.create(model, slug, manufacturer, **kwargs)
 
     def update_device_type(self, device_type, **kwargs):
         """Update device type
@@ -359,11 +368,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            device_type_id = self.get_device_types(model=device_type)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device-type: {}".format(device_type)}) from None
-        return self.netbox_con.patch('/dcim/device-types/', device_type_id, **kwargs)
+        return self.device_types.update(device_type, **kwargs)
 
     def update_device_type_by_id(self, device_type_id, **kwargs):
         """Update device type
@@ -372,7 +377,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/dcim/device-types/', device_type_id, **kwargs)
+        return self.device_types.update_by_id(device_type_id, **kwargs)
 
     def delete_device_type(self, model_name):
         """Delete device type
@@ -380,11 +385,7 @@ class Dcim(object):
         :param model_name: Name of the model
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            device_type_id = self.get_device_types(model=model_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device-type: {}".format(model_name)}) from None
-        return self.netbox_con.delete('/dcim/device-types/', device_type_id)
+        return self.device_types.delete(model_name)
 
     def delete_device_type_by_id(self, device_type_id):
         """Delete device type
@@ -392,11 +393,11 @@ class Dcim(object):
         :param device_type_id: Id of the device-type to delete
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.delete('/dcim/device-types/', device_type_id)
+        return self.device_types.delete_by_id(device_type_id)
 
     def get_device_roles(self, **kwargs):
         """Return all the device roles"""
-        return self.netbox_con.get('/dcim/device-roles/', **kwargs)
+        return self.device_roles.list(**kwargs)
 
     def create_device_role(self, name, color, slug, **kwargs):
         """Create device role
@@ -407,8 +408,7 @@ class Dcim(object):
         :param kwargs: optional arguments
         :return: netbox object if successful otherwise CreateException
         """
-        required_fields = {"name": name, "color": color, "slug": slug}
-        return self.netbox_con.post('/dcim/device-roles/', required_fields, **kwargs)
+        return self.device_roles.create(name, color, slug, **kwargs)
 
     def update_device_role(self, device_role, **kwargs):
         """Update device role
@@ -417,11 +417,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            device_role_id = self.get_device_roles(name=device_role)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device-role: {}".format(device_role)}) from None
-        return self.netbox_con.patch('/dcim/device-roles/', device_role_id, **kwargs)
+        return self.device_roles.update(device_role, **kwargs)
 
     def update_device_role_by_id(self, device_role_id, **kwargs):
         """Update device role
@@ -430,7 +426,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/device-roles/', device_role_id, **kwargs)
+        return self.device_roles.update_by_id(device_role_id, **kwargs)
 
     def delete_device_role(self, device_role):
         """Delete device by device role
@@ -438,11 +434,7 @@ class Dcim(object):
         :param device_role: name of the role
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            device_role_id = self.get_device_roles(name=device_role)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device-role: {}".format(device_role)}) from None
-        return self.netbox_con.delete('/dcim/device-roles/', device_role_id)
+        return self.device_roles.delete(device_role)
 
     def delete_device_role_by_id(self, device_role_id):
         """Delete device role
@@ -450,11 +442,11 @@ class Dcim(object):
         :param device_role_id: device role to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/dcim/device-roles/', device_role_id)
+        return self.device_roles.delete_by_id(device_role_id)
 
     def get_manufacturers(self, **kwargs):
         """Return all manufactures"""
-        return self.netbox_con.get('/dcim/manufacturers/', **kwargs)
+        return self.manufacturers.list(**kwargs)
 
     def create_manufacturer(self, name, slug, **kwargs):
         """Create new manufacturer
@@ -464,8 +456,7 @@ class Dcim(object):
         :param kwargs: Optional arguments
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/dcim/manufacturers/', required_fields, **kwargs)
+        return self.manufacturers.create(name, slug, **kwargs)
 
     def update_manufacturer(self, manufacturer_name, **kwargs):
         """Update manufacturer
@@ -474,11 +465,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            manufacturer_id = self.get_manufacturers(name=manufacturer_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "manufacturer: {}".format(manufacturer_name)}) from None
-        return self.netbox_con.patch('/dcim/manufacturer/', manufacturer_id, **kwargs)
+        return self.manufacturers.update(manufacturer_name, **kwargs)
 
     def update_manufacturer_by_id(self, manufacturer_id, **kwargs):
         """Update manufacturer
@@ -487,7 +474,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/manufacturer/', manufacturer_id, **kwargs)
+        return self.manufacturers.update_by_id(manufacturer_id, **kwargs)
 
     def delete_manufacturer(self, manufacturer_name):
         """Delete manufacturer
@@ -495,11 +482,7 @@ class Dcim(object):
         :param manufacturer_name: Name of manufacturer to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            manufacturer_id = self.get_manufacturers(name=manufacturer_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "manufacturer: {}".format(manufacturer_name)}) from None
-        return self.netbox_con.delete('/dcim/manufacturers/', manufacturer_id)
+        return self.manufacturers.delete(manufacturer_name)
 
     def delete_manufacturer_id(self, manufacturer_id):
         """Delete manufacturer
@@ -507,11 +490,11 @@ class Dcim(object):
         :param manufacturer_id: manufacturer to delete
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.delete('/dcim/manufacturers/', manufacturer_id)
+        return self.manufacturers.delete_by_id(manufacturer_id)
 
     def get_platforms(self, **kwargs):
         """Return all platforms"""
-        return self.netbox_con.get('/dcim/platforms', **kwargs)
+        return self.platforms.list(**kwargs)
 
     def create_platform(self, name, slug, **kwargs):
         """Create new platform
@@ -521,8 +504,7 @@ class Dcim(object):
         :param kwargs: Optional arguments
         :return:
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/dcim/platforms/', required_fields, **kwargs)
+        return self.platforms.create(name, slug, **kwargs)
 
     def update_platform(self, platform_name, **kwargs):
         """Update platform
@@ -531,11 +513,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            platform_id = self.get_platforms(name=platform_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "platform: {}".format(platform_name)}) from None
-        return self.netbox_con.patch('/dcim/platforms/', platform_id, **kwargs)
+        return self.platforms.update(platform_name, **kwargs)
 
     def update_platform_by_id(self, platform_id, **kwargs):
         """Update platform
@@ -544,7 +522,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/platforms/', platform_id, **kwargs)
+        return self.platforms.update_by_id(platform_id, **kwargs)
 
     def delete_platform(self, platform_name):
         """Delete platform
@@ -552,11 +530,7 @@ class Dcim(object):
         :param platform_name: Name of platform to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            platform_id = self.get_platforms(name=platform_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "platform: {}".format(platform_name)}) from None
-        return self.netbox_con.delete('/dcim/platforms/', platform_id)
+        return self.platforms.delete(platform_name)
 
     def delete_platform_by_id(self, platform_id):
         """Delete platform
@@ -564,11 +538,15 @@ class Dcim(object):
         :param platform_id: platform to delete
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.delete('/dcim/platforms/', platform_id)
+        return self.platforms.delete_by_id(platform_id)
 
     def get_interfaces(self, **kwargs):
         """Return interfaces"""
-        return self.netbox_con.get('/dcim/interfaces', **kwargs)
+        return self.interfaces.list(**kwargs)
+
+    def count_interfaces(self, **kwargs):
+        """Returns the number of interfaces matching the filters"""
+        return self.interfaces.count(**kwargs)
 
     def create_interface(self, name, interface_type, device_id, **kwargs):
         """Create a new interface
@@ -579,8 +557,25 @@ class Dcim(object):
         :param device_id: ID of the device to associate interface with
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"name": name, "type": interface_type, "device": device_id}
-        return self.netbox_con.post('/dcim/interfaces/', required_fields, **kwargs)
+        return self.interfaces.create(name, interface_type, device_id, **kwargs)
+
+    def upsert_interface(self, device, name, **kwargs):
+        """Create an interface or update it when the device has an interface with the name
+
+        :param device: Device name or id
+        :param name: Name of the interface
+        :param kwargs: Optional arguments, type is required for a new interface
+        :return: netbox object
+        """
+        return self.upsert_interfaces([dict(kwargs, device=device, name=name)])[0]
+
+    def upsert_interfaces(self, interfaces):
+        """Create or update many interfaces, matched on device and name, with one lookup and bulk requests
+
+        :param interfaces: list of dicts with the interface fields
+        :return: list of netbox objects
+        """
+        return Reconciler(self.netbox_con).upsert('interfaces', interfaces)
 
     def update_interface(self, interface, device, **kwargs):
         """Update interface
@@ -594,7 +589,7 @@ class Dcim(object):
             interface_id = self.get_interfaces(name=interface, device=device)[0]['id']
         except IndexError:
             raise exceptions.NotFoundException({"detail": "interface: {}".format(interface)}) from None
-        return self.netbox_con.patch('/dcim/interfaces/', interface_id, **kwargs)
+        return self.interfaces.update_by_id(interface_id, **kwargs)
 
     def update_interface_by_id(self, interface_id, **kwargs):
         """Update interface
@@ -603,7 +598,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/interfaces/', interface_id, **kwargs)
+        return self.interfaces.update_by_id(interface_id, **kwargs)
 
     def delete_interface(self, interface_name, device):
         """Delete interface
@@ -616,7 +611,7 @@ class Dcim(object):
             interface_id = self.get_interfaces(name=interface_name, device=device)[0]['id']
         except IndexError:
             raise exceptions.NotFoundException({"detail": "interface: {}".format(interface_name)}) from None
-        return self.netbox_con.delete('/dcim/interfaces/', interface_id)
+        return self.interfaces.delete_by_id(interface_id)
 
     def delete_interface_by_id(self, interface_id):
         """Delete interface
@@ -624,7 +619,7 @@ class Dcim(object):
         :param interface_id: interface to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/dcim/interfaces/', interface_id)
+        return self.interfaces.delete_by_id(interface_id)
 
     def get_interface_connections(self, **kwargs):
         """Get interface connections
@@ -636,7 +631,7 @@ class Dcim(object):
 
     def get_interface_templates(self, **kwargs):
         """Return interface templates"""
-        return self.netbox_con.get('/dcim/interface-templates', **kwargs)
+        return self.interface_templates.list(**kwargs)
 
     def create_interface_template(self, name, device_type, **kwargs):
         """Create a new interface template
@@ -646,12 +641,7 @@ class Dcim(object):
         :param device_type: name of the device_type to associate template with
         :return: netbox object if successful otherwise raise CreateException
         """
-        try:
-            device_type_id = self.get_device_types(model=device_type)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device-type: {}".format(device_type)}) from None
-        required_fields = {"name": name, "device_type": device_type_id}
-        return self.netbox_con.post('/dcim/interface-templates/', required_fields, **kwargs)
+        return self.interface_templates.create(name, device_type, **kwargs)
 
     def update_interface_template(self, interface_template_name, **kwargs):
         """Update interface template
@@ -660,11 +650,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            interface_template_id = self.get_interface_templates(name=interface_template_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "interface: {}".format(interface_template_name)}) from None
-        return self.netbox_con.patch('/dcim/interface-templates/', interface_template_id, **kwargs)
+        return self.interface_templates.update(interface_template_name, **kwargs)
 
     def update_interface_template_by_id(self, interface_template_id, **kwargs):
         """Update interface template
@@ -673,7 +659,7 @@ class Dcim(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/interface-templates/', interface_template_id, **kwargs)
+        return self.interface_templates.update_by_id(interface_template_id, **kwargs)
 
     def delete_interface_template(self, interface_template_name):
         """Delete interface template
@@ -681,11 +667,7 @@ class Dcim(object):
         :param interface_template_name: Name of interface template to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            interface_template_id = self.get_interface_templates(name=interface_template_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "interface-template: {}".format(interface_template_name)}) from None
-        return self.netbox_con.delete('/dcim/interface-templates/', interface_template_id)
+        return self.interface_templates.delete(interface_template_name)
 
     def delete_interface_template_by_id(self, interface_template_id):
         """Delete interface template
@@ -693,11 +675,11 @@ class Dcim(object):
         :param interface_template_id: Name of interface template to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/dcim/interface-templates/', interface_template_id)
+        return self.interface_templates.delete_by_id(interface_template_id)
 
     def get_inventory_items(self, **kwargs):
         """Return inventory items"""
-        return self.netbox_con.get('/dcim/inventory-items/', **kwargs)
+        return self.inventory_items.list(**kwargs)
 
     def create_inventory_item(self, name, device_name, **kwargs):
         """Create inventory item
@@ -707,12 +689,7 @@ class Dcim(object):
         :param kwargs: Extra inventory parameters
         :return: netbox object if successful otherwise raise CreateException
         """
-        try:
-            device_id = self.get_devices(name=device_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "device: {}".format(device_name)}) from None
-        required_fields = {"name": name, "device": device_id}
-        return self.netbox_con.post('/dcim/inventory-items/', required_fields, **kwargs)
+        return self.inventory_items.create(name, device_name, **kwargs)
 
     def update_inventory_item(self, name, device_name, **kwargs):
         """Update inventory item
@@ -726,7 +703,7 @@ class Dcim(object):
             inventory_item_id = self.get_inventory_items(name=name, device=device_name)[0]['id']
         except IndexError:
             raise exceptions.NotFoundException({"detail": "inventory item: {}".format(name)}) from None
-        return self.netbox_con.patch('/dcim/inventory-items/', inventory_item_id, **kwargs)
+        return self.inventory_items.update_by_id(inventory_item_id, **kwargs)
 
     def update_inventory_item_by_id(self, inventory_item_id, **kwargs):
         """Update inventory item
@@ -735,7 +712,7 @@ class Dcim(object):
         :param kwargs: Extra inventory items to update
         :return bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/inventory-items/', inventory_item_id, **kwargs)
+        return self.inventory_items.update_by_id(inventory_item_id, **kwargs)
 
     def delete_inventory_item(self, name, device_name):
         """Delete inventory item
@@ -748,7 +725,7 @@ class Dcim(object):
             inventory_item_id = self.get_inventory_items(name=name, device=device_name)[0]['id']
         except IndexError:
             raise exceptions.NotFoundException({"detail": "inventory item: {}".format(name)}) from None
-        return self.netbox_con.delete('/dcim/inventory-items/', inventory_item_id)
+        return self.inventory_items.delete_by_id(inventory_item_id)
 
     def delete_inventory_item_by_id(self, inventory_item_id):
         """Delete inventory item
@@ -756,7 +733,7 @@ class Dcim(object):
         :param inventory_item_id: Name of inventory item to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/dcim/inventory-items/', inventory_item_id)
+        return self.inventory_items.delete_by_id(inventory_item_id)
 
     def get_power_outlets(self, **kwargs):
         """Get power outlets matching optional kwarg filters"""
@@ -779,16 +756,11 @@ class Dcim(object):
         :param kwargs: Extra location parameters
         :return: netbox object if successful otherwise raise CreateException
         """
-        try:
-            site_id = self.get_sites(name=site_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "site: {}".format(site_name)}) from None
-        required_fields = {"name": name, "slug": slug, "site": site_id}
-        return self.netbox_con.post('/dcim/locations/', required_fields, **kwargs)
+        return self.locations.create(name, slug, site_name, **kwargs)
     
     def get_locations(self, **kwargs):
         """Return locations"""
-        return self.netbox_con.get('/dcim/locations/', **kwargs)
+        return self.locations.list(**kwargs)
 
     def update_location(self, location_id, **kwargs):
         """Update location
@@ -797,7 +769,7 @@ class Dcim(object):
         :param kwargs: Extra location items to update
         :return bool True if successful otherwise raise Exception
         """
-        return self.netbox_con.patch('/dcim/locations/', location_id, **kwargs)
+        return self.locations.update_by_id(location_id, **kwargs)
 
     def delete_location(self, location_name):
         """Delete location
@@ -805,8 +777,4 @@ class Dcim(object):
         :param location_name: Name of location to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            location_id = self.get_locations(name=location_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "location: {}".format(location_name)}) from None
-        return self.netbox_con.delete('/dcim/locations/', location_id)
\ No newline at end of file
+        return self.locations.delete(location_name)
\ No newline at end of file
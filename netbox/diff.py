@@ -0,0 +1,56 @@
+def normalize(current, desired):
+    """Bring a value as returned by the API into the shape of a value as written to the API
+
+    Nested objects are reduced to their id, or to their name or slug when the desired value is
+    a string. Choice fields are reduced to their value and dicts (e.g. custom_fields) are reduced
+    to the keys present in the desired value.
+
+    :param current: Value as returned by the API
+    :param desired: Value as it would be sent to the API
+    :return: normalized current value
+    """
+    if isinstance(current, dict):
+        if isinstance(desired, dict):
+            if 'id' in desired and 'id' in current:
+                return {'id': current['id']}
+            return {key: normalize(current.get(key), val) for key, val in desired.items()}
+        if 'value' in current and 'label' in current:
+            return current['value']
+        if isinstance(desired, str):
+            for field in ('slug', 'name', 'model', 'address', 'prefix'):
+                if current.get(field) == desired:
+                    return desired
+            return current.get('name')
+        return current.get('id')
+
+    if isinstance(current, list) and isinstance(desired, (list, tuple)):
+        sample = desired[0] if desired else None
+        return [normalize(item, sample) for item in current]
+
+    return current
+
+
+def is_equal(current, desired):
+    """Check if a value returned by the API already matches the desired value"""
+    current = normalize(current, desired)
+
+    if isinstance(desired, (list, tuple)) and isinstance(current, list):
+        desired = list(desired)
+        if len(current) != len(desired):
+            return False
+        try:
+            return sorted(current, key=repr) == sorted(desired, key=repr)
+        except TypeError:
+            return current == desired
+
+    return current == desired
+
+
+def changed_fields(current, desired):
+    """Return the desired fields which differ from the current object
+
+    :param current: Object as returned by the API
+    :param desired: dict with the fields to write
+    :return: dict with only the fields that need to be written
+    """
+    return {key: val for key, val in desired.items() if key not in current or not is_equal(current[key], val)}
@@ -0,0 +1,139 @@
+import netbox.exceptions as exceptions
+from netbox import models
+from netbox.query import Query
+
+
+class Endpoint(object):
+    """Generic operations on the objects of one model, driven by the model declaration in models
+
+    Objects are addressed by id or by the value of the lookup field of the model, e.g. the name
+    of a site or the model of a device-type. Reference fields of created and updated objects can
+    be given as id or as string matched on the lookup field of the referenced model.
+
+    Example:
+
+        >>> sites = Endpoint(netbox.connection, 'sites')
+        >>> sites.create('site1', 'site1', region='europe')
+        >>> sites.update('site1', status='active')
+        >>> sites.count(region='europe')
+
+    :param netbox_con: NetboxConnection
+    :param model: Model, model name or API path, e.g. sites or dcim/sites
+    """
+
+    def __init__(self, netbox_con, model):
+        self.netbox_con = netbox_con
+        self.model = model if isinstance(model, models.Model) else models.get_model(model)
+
+    def __repr__(self):
+        return 'Endpoint({})'.format(self.model.path)
+
+    @property
+    def path(self):
+        return self.model.path
+
+    def list(self, **kwargs):
+        """Return all objects matching the filters"""
+        return self.netbox_con.get(self.model.path, **kwargs)
+
+    def iterate(self, limit=0, **kwargs):
+        """Iterate over all objects matching the filters page by page"""
+        return self.netbox_con.iterate(self.model.path, limit=limit, **kwargs)
+
+    def query(self, **kwargs):
+        """Read all objects matching the filters into a Query, which answers further filters in memory"""
+        return Query.load(self.netbox_con, self.model.path, **kwargs)
+
+    def count(self, **kwargs):
+        """Return the number of objects matching the filters"""
+        return self.netbox_con.count(self.model.path, **kwargs)
+
+    def exists(self, **kwargs):
+        """Check if any object matches the filters"""
+        return self.netbox_con.exists(self.model.path, **kwargs)
+
+    def get(self, value=None, **kwargs):
+        """Return one object by id, by lookup field value or by filters
+
+        :param value: Id or value of the lookup field, e.g. a site name
+        :param kwargs: Filter arguments
+        :return: netbox object, raises NotFoundException if there is no match
+        """
+        filters = dict(kwargs)
+        if isinstance(value, int):
+            filters['id'] = value
+        elif value is not None:
+            filters[self.model.lookup_field] = value
+
+        results = self.netbox_con.get(self.model.path, **filters)
+        if not results:
+            raise exceptions.NotFoundException({"detail": "{}: {}".format(
+                self.model.label, value if value is not None else kwargs)})
+        return results[0]
+
+    def get_id(self, value, by_id=False, **kwargs):
+        """Return the id for an id or lookup field value, ids (and pending batch objects) are returned as is
+
+        :param value: Id or value of the lookup field
+        :param by_id: The value is an id, also when given as string, and is never looked up
+        :param kwargs: Filter arguments of the lookup
+        """
+        if by_id or (not isinstance(value, str) and not kwargs):
+            return value
+        return self.get(value, **kwargs)['id']
+
+    def create(self, *args, **kwargs):
+        """Create an object
+
+        :param args: Values of the required fields of the model in their declared order
+        :param kwargs: Other fields, or required fields by name
+        :return: netbox object if successful otherwise raise CreateException
+        """
+        if len(args) > len(self.model.required):
+            raise TypeError('{} takes at most {} positional fields: {}'.format(
+                self.model.name, len(self.model.required), ', '.join(self.model.required)))
+
+        required_fields = dict(zip(self.model.required, args))
+        missing = [field for field in self.model.required if field not in required_fields and field not in kwargs]
+        if missing:
+            raise exceptions.CreateException({"detail": "{} without {}".format(self.model.label, ', '.join(missing))})
+
+        body = self._resolve(dict(required_fields, **kwargs))
+        return self.netbox_con.post(self.model.path, {field: body.pop(field) for field in required_fields}, **body)
+
+    def update(self, value, **kwargs):
+        """Update an object by id or lookup field value, only the given fields are changed"""
+        return self.netbox_con.patch(self.model.path, self.get_id(value), **self._resolve(kwargs))
+
+    def update_by_id(self, obj_id, **kwargs):
+        """Update an object by id, a string id is not taken as lookup field value"""
+        return self.netbox_con.patch(self.model.path, self.get_id(obj_id, by_id=True), **self._resolve(kwargs))
+
+    def delete(self, value):
+        """Delete an object by id or lookup field value"""
+        return self.netbox_con.delete(self.model.path, self.get_id(value))
+
+    def delete_by_id(self, obj_id):
+        """Delete an object by id, a string id is not taken as lookup field value"""
+        return self.netbox_con.delete(self.model.path, self.get_id(obj_id, by_id=True))
+
+    def bulk_create(self, objects):
+        """Create many objects with bulk requests, references are resolved in batch"""
+        objects = [dict(obj) for obj in objects]
+        models.resolve_references(self.netbox_con, self.model, objects)
+        return self.netbox_con.bulk_post(self.model.path, objects)
+
+    def bulk_update(self, objects):
+        """Update many objects with bulk requests, every object holds its id and the changed fields"""
+        objects = [dict(obj) for obj in objects]
+        models.resolve_references(self.netbox_con, self.model, objects)
+        return self.netbox_con.bulk_patch(self.model.path, objects)
+
+    def bulk_delete(self, ids):
+        """Delete many objects by id with bulk requests"""
+        return self.netbox_con.bulk_delete(self.model.path, list(ids))
+
+    def _resolve(self, fields):
+        """Replace string references with ids"""
+        models.resolve_references(self.netbox_con, self.model, [fields])
+        return fields
@@ -61,3 +61,17 @@ class ServerException(GeneralException):
     """HTTP 5xx status code"""
     def __init__(self, resp_data):
         super().__init__(resp_data)
+
+
+class GraphqlException(GeneralException):
+    """Raised when a GraphQL query returns errors"""
+    def __init__(self, resp_data):
+        super().__init__(resp_data)
+        if isinstance(resp_data, list):
+            self.err = ' '.join(error.get('message', '') for error in resp_data)
+
+
+class DeadlineExceededException(GeneralException):
+    """Raised when the time budget of a call runs out"""
+    def __init__(self, resp_data):
+        super().__init__(resp_data)
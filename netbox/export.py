@@ -0,0 +1,197 @@
+import json
+import netbox.exceptions as exceptions
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+def stable_columns(columns):
+    """Drop the columns which are also the prefix of a nested column, e.g. tenant next to tenant.id"""
+    columns = list(dict.fromkeys(columns))
+    prefixes = {column[:index] for column in columns for index, char in enumerate(column) if char == '.'}
+    return [column for column in columns if column not in prefixes]
+
+
+def flatten(obj, prefix='', columns=None):
+    """Flatten nested objects into dotted columns, e.g. site.id, site.name and device_type.model
+
+    Lists (e.g. tags) are stored as a json string, as are nested objects whose key is one of
+    the given columns, e.g. a tenant which was null in the rows the columns were taken from.
+
+    :param obj: Object as returned by the API
+    :param prefix: Column prefix for nested objects
+    :param columns: Optional set of the columns of the output
+    :return: dict with one level of keys
+    """
+    row = {}
+    for key, val in obj.items():
+        column = '{}{}'.format(prefix, key)
+        if isinstance(val, dict) and columns is not None and column in columns:
+            row[column] = json.dumps(val)
+        elif val == {}:
+            row[column] = None
+        elif isinstance(val, dict):
+            row.update(flatten(val, '{}.'.format(column), columns))
+        elif isinstance(val, list):
+            row[column] = json.dumps(val)
+        else:
+            row[column] = val
+    return row
+
+
+class Exporter(object):
+
+    def __init__(self, netbox_con):
+        self.netbox_con = netbox_con
+
+    def iter_batches(self, endpoint, batch_size=1000, **kwargs):
+        """Stream a list endpoint as batches of flattened rows
+
+        :param endpoint: API endpoint, e.g. dcim/devices
+        :param batch_size: Rows per batch, also used as page size
+        :param kwargs: Filter arguments
+        :return: generator of lists of flattened rows
+        """
+        batch = []
+        for obj in self.netbox_con.iterate(endpoint, limit=batch_size, **kwargs):
+            batch.append(flatten(obj))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def export(self, endpoint, path, file_format=None, batch_size=1000, columns=None, use_schema=None, **kwargs):
+        """Write all objects of a list endpoint to a columnar file without loading them all in memory
+
+        Parquet and Arrow IPC files require pyarrow, without it the flattened rows are written as
+        JSONL. Unless columns are given, the columns are taken from the first batch and, with
+        use_schema, from the OpenAPI schema of the server, so a nested reference (e.g. tenant) has
+        its columns also when it is null in the first batch. Without the schema, a nested object
+        which was null throughout the first batch is written as json in a single column. The types are
+        taken from the first batch, columns which are empty in the first batch are stored as
+        strings. A ValueError is raised instead of dropping data when a later batch has columns
+        which are not in the file.
+
+        Example:
+
+            >>> netbox.exporter.export('dcim/devices', 'devices.parquet', site='site1')
+
+        :param endpoint: API endpoint, e.g. dcim/devices or ipam/ip-addresses
+        :param path: Output file
+        :param file_format: parquet, arrow or jsonl, by default derived from the file extension
+        :param batch_size: Rows per batch, also used as page size
+        :param columns: Optional list of flattened columns to write, e.g. ['id', 'name', 'site.name']
+        :param use_schema: Take the columns also from the schema. None uses it when it is loaded already
+                           or validate_requests is on, True loads it (one large request, cached on disk)
+        :param kwargs: Filter arguments
+        :return: number of written rows
+        """
+        if file_format is None:
+            extension = path[path.rfind('.'):].lower() if '.' in path else ''
+            file_format = FORMATS.get(extension, 'parquet' if pyarrow is not None else 'jsonl')
+
+        if file_format == 'jsonl':
+            batches = self.iter_batches(endpoint, batch_size=batch_size, **kwargs)
+            if columns is not None:
+                batches = ([{column: row.get(column) for column in columns} for row in batch] for batch in batches)
+            return self._write_jsonl(batches, path)
+
+        if pyarrow is None:
+            raise ImportError('Writing {} files requires pyarrow'.format(file_format))
+        if use_schema is None:
+            use_schema = self.netbox_con.schema.loaded or self.netbox_con.validate_requests
+        batches = self._stable_batches(endpoint, batch_size, columns, use_schema, kwargs)
+        return self._write_arrow(batches, path, file_format)
+
+    def _stable_batches(self, endpoint, batch_size, columns, use_schema, filters):
+        """Stream batches of flattened rows which all have the same columns"""
+        fixed = None
+        batch = []
+        for obj in self.netbox_con.iterate(endpoint, limit=batch_size, **filters):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                fixed = fixed or self._columns(endpoint, columns, use_schema, batch)
+                yield self._rows(batch, fixed)
+                batch = []
+        if batch:
+            fixed = fixed or self._columns(endpoint, columns, use_schema, batch)
+            yield self._rows(batch, fixed)
+
+    def _columns(self, endpoint, columns, use_schema, objects):
+        if columns is not None:
+            return list(columns)
+        known = []
+        if use_schema:
+            try:
+                known = self.netbox_con.schema.columns(endpoint) or []
+            except exceptions.GeneralException:
+                pass
+        return stable_columns(known + [column for obj in objects for column in flatten(obj)])
+
+    @staticmethod
+    def _rows(objects, columns):
+        column_set = set(columns)
+        rows = []
+        for obj in objects:
+            row = flatten(obj, columns=column_set)
+            rows.append({column: row.get(column) for column in columns})
+            # Keep the values of columns which are not in the file, so the writer can report them
+            rows[-1].update((column, val) for column, val in row.items() if column not in column_set and val is not None)
+        return rows
+
+    @staticmethod
+    def _write_jsonl(batches, path):
+        rows = 0
+        with open(path, 'w', encoding='utf-8') as output:
+            for batch in batches:
+                output.writelines('{}\n'.format(json.dumps(row)) for row in batch)
+                rows += len(batch)
+        return rows
+
+    @staticmethod
+    def _write_arrow(batches, path, file_format):
+        rows = 0
+        schema = None
+        writer = None
+        string_columns = set()
+
+        try:
+            for batch in batches:
+                if schema is None:
+                    # from_pylist only looks at the keys of the first row, so collect the keys of all rows
+                    columns = list(dict.fromkeys(column for row in batch for column in row))
+                    schema = pyarrow.Table.from_pydict({column: [row.get(column) for row in batch]
+                                                        for column in columns}).schema
+                    string_columns = {field.name for field in schema if pyarrow.types.is_null(field.type)}
+                    schema = pyarrow.schema([pyarrow.field(field.name, pyarrow.string())
+                                             if field.name in string_columns else field for field in schema])
+                    if file_format == 'parquet':
+                        writer = pyarrow.parquet.ParquetWriter(path, schema)
+                    else:
+                        writer = pyarrow.ipc.new_file(path, schema)
+
+                new_columns = set().union(*batch) - set(schema.names)
+                if new_columns:
+                    raise ValueError('Columns {} are not in the first batch, pass the columns to export'.format(
+                        ', '.join(sorted(new_columns))))
+
+                for row in batch:
+                    for column in string_columns:
+                        if row.get(column) is not None:
+                            row[column] = str(row[column])
+
+                table = pyarrow.Table.from_pylist(batch, schema=schema)
+                writer.write_table(table)
+                rows += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return rows
@@ -1,10 +1,12 @@
 import netbox.exceptions as exceptions
+from netbox.endpoint import Endpoint
 
 
 class Extras(object):
 
     def __init__(self, netbox_con):
         self.netbox_con = netbox_con
+        self.tags = Endpoint(netbox_con, 'tags')
 
     def get_config_contexts(self, **kwargs):
         """Returns all config-contexts"""
@@ -66,7 +68,7 @@ class Extras(object):
 
     def get_tags(self, **kwargs):
         """Returns all tags"""
-        return self.netbox_con.get('/extras/tags/', **kwargs)
+        return self.tags.list(**kwargs)
 
     def create_tag(self, name, slug, **kwargs):
         """Create a tag
@@ -76,8 +78,7 @@ class Extras(object):
         :param kwargs: optional fields
         :return: netbox object if successful otherwise exception raised
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/extras/tags/', required_fields, **kwargs)
+        return self.tags.create(name, slug, **kwargs)
 
     def delete_tag(self, name):
         """Delete tag
@@ -85,11 +86,7 @@ class Extras(object):
         :param name: Name of the tag to delete
         :return: bool True if succesful otherwise delete exception
         """
-        try:
-            tag_id = self.get_tags(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "tag: {}".format(name)}) from None
-        return self.netbox_con.delete('/extras/tags/', tag_id)
+        return self.tags.delete(name)
 
     def delete_tag_by_id(self, tag_id):
         """Delete tag
@@ -97,7 +94,7 @@ class Extras(object):
         :param tag_id: tag to delete
         :return: bool True if succesful otherwise delete exception
         """
-        return self.netbox_con.delete('/extras/tags/', tag_id)
+        return self.tags.delete_by_id(tag_id)
 
     def update_tag(self, name, **kwargs):
         """Update tag
@@ -106,12 +103,7 @@ class Extras(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            tag_id = self.get_tags(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "tag: {}".format(name)}) from None
-
-        return self.netbox_con.patch('/extras/tags/', tag_id, **kwargs)
+        return self.tags.update(name, **kwargs)
 
     def update_tag_by_id(self, tag_id, **kwargs):
         """Update tag
@@ -120,7 +112,7 @@ class Extras(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/extras/tags/', tag_id, **kwargs)
+        return self.tags.update_by_id(tag_id, **kwargs)
 
     def get_object_changes(self, **kwargs):
         """Returns all object changes"""
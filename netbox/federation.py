@@ -0,0 +1,248 @@
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+import netbox.exceptions as exceptions
+from netbox.endpoint import Endpoint
+
+SECTIONS = ('ipam', 'dcim', 'circuits', 'virtualization', 'tenancy', 'extras', 'status')
+
+
+def is_read(method_name):
+    """Check if a helper only reads, e.g. get_devices, count_sites or device_exists"""
+    return method_name.startswith(('get_', 'count_')) or method_name.endswith('_exists')
+
+
+# Endpoint methods which read and are run on every instance, and which write and are routed
+ENDPOINT_READS = ('list', 'count', 'exists', 'get', 'iterate')
+ENDPOINT_WRITES = ('create', 'update', 'update_by_id', 'delete', 'delete_by_id', 'bulk_create', 'bulk_update',
+                   'bulk_delete')
+
+
+class FederatedNetBox(object):
+    """Several NetBox instances behind the API of a single NetBox object
+
+    Reads (get_*, count_* and *_exists helpers) run concurrently on every instance. Lists are
+    merged and every object is tagged with the name of its instance in source_field, counts are
+    summed, existence checks succeed if any instance has a match and other results are returned
+    as dict per instance. An instance which raises NotFoundException for a read, e.g. because it
+    has no rack of that name, adds nothing to the result, only when all instances raise it the
+    read fails. Writes go to the instance the route_key argument of the call maps to, e.g. the
+    site of create_device, or the site_name of update_site. The Endpoint attributes of the
+    sections (e.g. federation.dcim.devices) are federated the same way.
+
+    Example, one NetBox per region with sites routed on their name:
+
+        >>> federation = FederatedNetBox({'eu': NetBox('netbox-eu.example.com', auth_token='token'),
+        ...                               'us': NetBox('netbox-us.example.com', auth_token='token')},
+        ...                              route_key='site', routes={'ams1': 'eu', 'fra1': 'eu', 'nyc1': 'us'})
+        >>> federation.ipam.get_ip_addresses(q='10.0.0.')
+        >>> federation.dcim.create_device('device1', 'leaf', 'ams1', 'qfx5100')
+
+    :param instances: dict mapping an instance name to a NetBox object
+    :param route_key: Argument writes are routed on. Also matched as <route_key>_name, e.g. site_name
+    :param routes: dict mapping a value of the route key to an instance name, or a function
+                   returning the instance name for a value
+    :param default: Optional instance for writes without a route key or with an unknown value
+    :param source_field: Key the instance name is stored in on every object read
+    """
+
+    def __init__(self, instances, route_key='site', routes=None, default=None, source_field='_source'):
+        if not instances:
+            raise ValueError('A federation needs at least one NetBox instance')
+        if default is not None and default not in instances:
+            raise ValueError('Unknown default instance: {}'.format(default))
+
+        self.instances = dict(instances)
+        self.route_key = route_key
+        self.routes = routes or {}
+        self.default = default
+        self.source_field = source_field
+
+        for section in SECTIONS:
+            setattr(self, section, _FederatedSection(self, section))
+
+    def on(self, name):
+        """Return the NetBox object of an instance, e.g. for writes which can not be routed"""
+        try:
+            return self.instances[name]
+        except KeyError:
+            raise ValueError('Unknown NetBox instance: {}'.format(name)) from None
+
+    @contextmanager
+    def deadline(self, seconds):
+        """Bound all requests to all instances made in the block to a time budget, see NetboxConnection.deadline"""
+        with ExitStack() as stack:
+            for netbox in self.instances.values():
+                stack.enter_context(netbox.connection.deadline(seconds))
+            yield
+
+    def fan_out(self, section, method_name, args, kwargs, missing_ok=False):
+        """Call a helper on every instance concurrently
+
+        :param section: Section name, e.g. dcim, or dotted section and endpoint, e.g. dcim.devices
+        :param missing_ok: Leave out the instances which raise NotFoundException, it is only raised
+                           when all instances raise it
+        :return: dict mapping the instance name to the result, the first other exception is raised
+        """
+        calls = []
+        for name, netbox in self.instances.items():
+            target = netbox
+            for attribute in section.split('.'):
+                target = getattr(target, attribute)
+            calls.append((name, netbox.connection.with_deadline(getattr(target, method_name))))
+
+        if len(calls) < 2:
+            results = {name: self._call(method, args, kwargs) for name, method in calls}
+        else:
+            with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+                futures = [(name, executor.submit(self._call, method, args, kwargs)) for name, method in calls]
+                results = {name: future.result() for name, future in futures}
+
+        found = {name: result for name, result in results.items() if not isinstance(result, exceptions.NotFoundException)}
+        if len(found) < len(results) and (not missing_ok or not found):
+            raise next(result for result in results.values() if isinstance(result, exceptions.NotFoundException))
+        return found
+
+    @staticmethod
+    def _call(method, args, kwargs):
+        """Call a method and return a NotFoundException instead of raising it"""
+        try:
+            return method(*args, **kwargs)
+        except exceptions.NotFoundException as error:
+            return error
+
+    def merge(self, results):
+        """Combine the results of a read on every instance"""
+        values = list(results.values())
+
+        if all(isinstance(value, bool) for value in values):
+            return any(values)
+        if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+            return sum(values)
+        if all(isinstance(value, list) for value in values):
+            merged = []
+            for name, objects in results.items():
+                for obj in objects:
+                    if isinstance(obj, dict):
+                        obj[self.source_field] = name
+                    merged.append(obj)
+            return merged
+        return results
+
+    def route(self, method, args, kwargs):
+        """Return the name of the instance a write goes to"""
+        try:
+            arguments = inspect.signature(method).bind_partial(*args, **kwargs).arguments
+        except TypeError:
+            arguments = dict(kwargs)
+        arguments.update(arguments.pop('kwargs', {}))
+        return self.route_arguments(arguments, method.__name__)
+
+    def route_arguments(self, arguments, method_name):
+        """Return the name of the instance for the arguments of a write"""
+        for key in (self.route_key, '{}_name'.format(self.route_key)):
+            if arguments.get(key) is None:
+                continue
+            value = arguments[key]
+            name = self.routes(value) if callable(self.routes) else self.routes.get(value)
+            if name is None:
+                name = self.default
+            if name is None:
+                raise ValueError('No NetBox instance for {} {}'.format(self.route_key, value))
+            return name
+
+        if self.default is not None:
+            return self.default
+        raise ValueError('{}() has no {} argument to route on, use on(instance) to pick the NetBox instance'.format(
+            method_name, self.route_key))
+
+
+class _FederatedSection(object):
+    """Proxy of a helper section (dcim, ipam, ...) which fans out reads and routes writes"""
+
+    def __init__(self, federation, section):
+        self._federation = federation
+        self._section = section
+
+    def __getattr__(self, method_name):
+        federation = self._federation
+        template = getattr(getattr(next(iter(federation.instances.values())), self._section), method_name)
+        if isinstance(template, Endpoint):
+            return _FederatedEndpoint(federation, '{}.{}'.format(self._section, method_name), template)
+        if not callable(template):
+            return template
+
+        def call(*args, **kwargs):
+            if is_read(method_name):
+                return federation.merge(federation.fan_out(self._section, method_name, args, kwargs, missing_ok=True))
+
+            netbox = federation.on(federation.route(template, args, kwargs))
+            return getattr(getattr(netbox, self._section), method_name)(*args, **kwargs)
+
+        call.__name__ = method_name
+        call.__doc__ = template.__doc__
+        return call
+
+
+class _FederatedEndpoint(object):
+    """Proxy of an Endpoint which fans out reads and routes writes
+
+    Writes are routed on the route_key field, e.g. the site of a device, or go to the default
+    instance. Bulk creates and updates are split per instance.
+    """
+
+    def __init__(self, federation, section, template):
+        self._federation = federation
+        self._section = section
+        self._template = template
+
+    def __getattr__(self, method_name):
+        if method_name in ('path', 'model'):
+            return getattr(self._template, method_name)
+        if method_name not in ENDPOINT_READS + ENDPOINT_WRITES:
+            raise AttributeError('{} of a federated endpoint is not supported, use on(instance).{}.{}'.format(
+                method_name, self._section, method_name))
+
+        federation = self._federation
+
+        def call(*args, **kwargs):
+            if method_name in ('list', 'count', 'exists'):
+                return federation.merge(federation.fan_out(self._section, method_name, args, kwargs, missing_ok=True))
+            if method_name == 'get':
+                results = federation.fan_out(self._section, method_name, args, kwargs, missing_ok=True)
+                return federation.merge({name: [obj] for name, obj in results.items()})[0]
+            if method_name == 'iterate':
+                return self._iterate(args, kwargs)
+            if method_name in ('bulk_create', 'bulk_update'):
+                return self._bulk(method_name, args[0] if args else kwargs['objects'])
+
+            arguments = dict(kwargs)
+            if method_name == 'create':
+                arguments.update(zip(self._template.model.required, args))
+            return self._endpoint(federation.route_arguments(arguments, method_name))(method_name)(*args, **kwargs)
+
+        call.__name__ = method_name
+        call.__doc__ = getattr(self._template, method_name).__doc__
+        return call
+
+    def _endpoint(self, name):
+        """Return a function returning a method of the endpoint on an instance"""
+        target = self._federation.on(name)
+        for attribute in self._section.split('.'):
+            target = getattr(target, attribute)
+        return lambda method_name: getattr(target, method_name)
+
+    def _iterate(self, args, kwargs):
+        for name in self._federation.instances:
+            for obj in self._endpoint(name)('iterate')(*args, **kwargs):
+                obj[self._federation.source_field] = name
+                yield obj
+
+    def _bulk(self, method_name, objects):
+        groups = {}
+        for obj in objects:
+            groups.setdefault(self._federation.route_arguments(obj, method_name), []).append(obj)
+        results = []
+        for name, group in groups.items():
+            results.extend(self._endpoint(name)(method_name)(group))
+        return results
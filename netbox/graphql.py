@@ -0,0 +1,103 @@
+import json
+
+
+class Graphql(object):
+
+    def __init__(self, netbox_con):
+        self.netbox_con = netbox_con
+
+    def query(self, query, variables=None):
+        """Run a raw GraphQL query against the /graphql/ endpoint
+
+        :param query: GraphQL query document
+        :param variables: Optional dict with query variables
+        :return: dict with the query result
+        """
+        return self.netbox_con.graphql(query, variables)
+
+    def select(self, model, fields, **kwargs):
+        """Read a model and its related objects in one request
+
+        Example, a device with its interfaces, ip addresses and vlans:
+
+            >>> netbox.graphql.select('devices', ['id', 'name', {'site': ['name']},
+            ...                       {'interfaces': ['name', {'ip_addresses': ['address']},
+            ...                                       {'untagged_vlan': ['vid', 'name']}]}],
+            ...                       name='device1')
+
+        :param model: Model name as used by the REST API, e.g. devices, ip-addresses or /dcim/devices/
+        :param fields: List of field names, nested selections are dicts with a list of fields
+        :param kwargs: Filter arguments
+        :return: list of objects
+        """
+        field_name = '{}_list'.format(self.graphql_name(model))
+        query = '{{ {} }}'.format(self.build_selection(field_name, fields, **kwargs))
+        return self.query(query)[field_name]
+
+    def get(self, model, object_id, fields):
+        """Read a single object by id and its related objects in one request
+
+        :param model: Model name as used by the REST API, e.g. devices or /dcim/devices/
+        :param object_id: ID of the object
+        :param fields: List of field names, nested selections are dicts with a list of fields
+        :return: the object or None if it does not exist
+        """
+        field_name = self.graphql_name(model)
+        query = '{{ {} }}'.format(self.build_selection(field_name, fields, id=object_id))
+        return self.query(query)[field_name]
+
+    @staticmethod
+    def graphql_name(model):
+        """Convert a REST model name into the singular GraphQL field name
+
+        :param model: Model name, e.g. ip-addresses, prefixes, device-roles or /dcim/devices/
+        :return: GraphQL field name, e.g. ip_address, prefix, device_role or device
+        """
+        name = model.strip('/').split('/')[-1].split('.')[-1].replace('-', '_')
+
+        if name.endswith('ies'):
+            return name[:-3] + 'y'
+        if name.endswith(('sses', 'xes')):
+            return name[:-2]
+        if name.endswith('s'):
+            return name[:-1]
+        return name
+
+    @classmethod
+    def build_selection(cls, field_name, fields, **kwargs):
+        """Build a GraphQL selection set
+
+        :param field_name: Name of the selected field
+        :param fields: List of field names, nested selections are dicts with a list of fields
+        :param kwargs: Field arguments
+        :return: selection string
+        """
+        selection = field_name
+        if kwargs:
+            selection += '({})'.format(', '.join('{}: {}'.format(key, cls.literal(val)) for key, val in kwargs.items()))
+
+        if fields:
+            members = []
+            for field in fields:
+                if isinstance(field, dict):
+                    members.extend(cls.build_selection(name, sub_fields) for name, sub_fields in field.items())
+                else:
+                    members.append(field)
+            selection += ' {{ {} }}'.format(' '.join(members))
+
+        return selection
+
+    @classmethod
+    def literal(cls, value):
+        """Render a python value as GraphQL literal"""
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if value is None:
+            return 'null'
+        if isinstance(value, (list, tuple, set)):
+            return '[{}]'.format(', '.join(cls.literal(val) for val in value))
+        if isinstance(value, dict):
+            return '{{{}}}'.format(', '.join('{}: {}'.format(key, cls.literal(val)) for key, val in value.items()))
+        if isinstance(value, (int, float)):
+            return str(value)
+        return json.dumps(str(value))
@@ -0,0 +1,257 @@
+import csv
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import netbox.exceptions as exceptions
+from netbox import models
+
+# The create helper of a model and how record fields map onto its positional arguments.
+# Helper arguments ending with _id expect ids, string references are resolved in batch first.
+HELPERS = {
+    'devices': ('dcim', 'create_device', {'name': 'name', 'device_role': 'device_role', 'site': 'site_name',
+                                          'device_type': 'device_type'}),
+    'interfaces': ('dcim', 'create_interface', {'name': 'name', 'type': 'interface_type', 'device': 'device_id'}),
+    'ip-addresses': ('ipam', 'create_ip_address', {'address': 'address'}),
+    'vlans': ('ipam', 'create_vlan', {'vid': 'vid', 'name': 'vlan_name'}),
+    'virtual-machines': ('virtualization', 'create_virtual_machine', {'name': 'name', 'cluster': 'cluster_name'}),
+}
+
+
+def read_records(path, file_format=None):
+    """Stream records from a CSV or JSONL file
+
+    CSV columns with an empty value are left out of the record.
+
+    :param path: Path of the file
+    :param file_format: csv or jsonl, by default derived from the file extension
+    :return: generator of dicts
+    """
+    file_format = file_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+
+    with open(path, newline='' if file_format == 'csv' else None, encoding='utf-8') as source:
+        if file_format == 'csv':
+            for row in csv.DictReader(source):
+                yield {key: val for key, val in row.items() if val not in ('', None)}
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class Checkpoint(object):
+    """Progress of an import, stored as json and replaced atomically after every batch
+
+    Besides the number of leading imported records, the batches which finished after a batch
+    that is not done yet are stored, so a rerun skips them as well.
+
+    :param path: Path of the checkpoint file
+    :param source: Path of the imported file, a checkpoint of another import is refused
+    :param model: Name of the imported model
+    """
+
+    def __init__(self, path, source, model):
+        self.path = path
+        self.state = {'source': os.path.abspath(source), 'model': model, 'completed': 0, 'created': 0, 'done': []}
+
+        if path and os.path.exists(path):
+            with open(path) as checkpoint_file:
+                state = json.load(checkpoint_file)
+            if (state.get('source'), state.get('model')) != (self.state['source'], model):
+                raise ValueError('Checkpoint {} belongs to the import of {} into {}'.format(
+                    path, state.get('source'), state.get('model')))
+            self.state = state
+
+    @property
+    def completed(self):
+        """Number of leading records which are imported"""
+        return self.state['completed']
+
+    @property
+    def done(self):
+        """dict mapping the first record of every imported batch after completed to its number of records"""
+        return {start: count for start, count in self.state.get('done', [])}
+
+    def save(self, completed, created, done=None):
+        self.state['completed'] = completed
+        self.state['created'] = created
+        self.state['done'] = sorted([start, count] for start, count in (done or {}).items())
+
+        if self.path:
+            tmp_path = '{}.tmp'.format(self.path)
+            with open(tmp_path, 'w') as checkpoint_file:
+                json.dump(self.state, checkpoint_file)
+            os.replace(tmp_path, self.path)
+
+
+class Importer(object):
+
+    def __init__(self, netbox):
+        self.netbox = netbox
+        self.netbox_con = netbox.connection
+
+    def run(self, path, model, checkpoint=None, batch_size=None, workers=None, bulk=True, file_format=None):
+        """Import the records of a CSV or JSONL file
+
+        Records use the API field names of the model. References to other objects can be ids
+        (also as <field>_id column) or names, which are resolved in batch and cached for the run.
+        Batches are imported by a pool of workers, either as one bulk create per batch or row by
+        row through the create_* helper of the model. With a checkpoint file the imported batches
+        are saved after every batch (after every row with the helpers), also when the import
+        fails, and a rerun skips them.
+
+        Example:
+
+            >>> netbox.importer.run('devices.csv', 'devices', checkpoint='devices.checkpoint')
+
+        :param path: Path of the CSV or JSONL file
+        :param model: Model name, e.g. devices, interfaces, ip-addresses, vlans or virtual-machines
+        :param checkpoint: Optional path of the checkpoint file
+        :param batch_size: Records per batch, defaults to the bulk_size of the connection
+        :param workers: Number of concurrent batches, defaults to max_workers of the connection
+        :param bulk: Use bulk creates, otherwise call the create_* helper per record
+        :param file_format: csv or jsonl, by default derived from the file extension
+        :return: dict with the number of imported, created and skipped records
+        """
+        model = models.get_model(model)
+        if not bulk and model.name not in HELPERS:
+            raise ValueError('No create helper for {}, use bulk=True'.format(model.name))
+
+        batch_size = batch_size or self.netbox_con.bulk_size
+        workers = workers or self.netbox_con.max_workers
+        progress = Checkpoint(checkpoint, path, model.name)
+        done = progress.done
+        skipped = progress.completed + sum(done.values())
+        state = {'high_water': progress.completed, 'created': progress.state['created'], 'imported': 0}
+        references = {}
+        lock = threading.Lock()
+
+        def import_batch(start, records):
+            if bulk:
+                models.resolve_references(self.netbox_con, model, records, cache=references)
+                return start, len(records), len(self.netbox_con.bulk_post(model.path, records))
+
+            def created(index):
+                # Saved at once, a later row which fails must not lose the rows created before it
+                with lock:
+                    self._mark(done, state, start + index, 1, 1)
+                    progress.save(state['high_water'], state['created'], done)
+
+            self._create_with_helper(model, records, references, created)
+            return None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = set()
+
+            try:
+                batches = self._batches(read_records(path, file_format), model, batch_size,
+                                        progress.completed, dict(done))
+                for start, records in batches:
+                    if len(futures) >= workers * 2:
+                        finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        self._complete(finished, done, lock, progress, state)
+                    futures.add(executor.submit(self.netbox_con.with_deadline(import_batch), start, records))
+
+                finished, futures = wait(futures)
+                self._complete(finished, done, lock, progress, state)
+            except BaseException:
+                # Record the batches which were still running, so a rerun does not import them again
+                finished, futures = wait(futures)
+                self._complete(finished, done, lock, progress, state, raise_errors=False)
+                raise
+
+        return {'imported': state['imported'], 'created': state['created'], 'skipped': skipped}
+
+    @staticmethod
+    def _complete(finished, done, lock, progress, state, raise_errors=True):
+        """Record the finished batches and save the checkpoint, batches of the helpers are recorded per row"""
+        error = None
+        with lock:
+            for future in finished:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                elif future.result() is not None:
+                    Importer._mark(done, state, *future.result())
+
+            progress.save(state['high_water'], state['created'], done)
+
+        if error is not None and raise_errors:
+            raise error
+
+    @staticmethod
+    def _mark(done, state, start, count, created):
+        """Record imported records, merge adjacent ranges and advance the checkpoint over the records done without a gap"""
+        state['created'] += created
+        state['imported'] += count
+
+        if start + count in done:
+            count += done.pop(start + count)
+        previous = next((other for other, other_count in done.items() if other + other_count == start), None)
+        if previous is not None:
+            start, count = previous, done[previous] + count
+        done[start] = count
+
+        while state['high_water'] in done:
+            state['high_water'] += done.pop(state['high_water'])
+
+    @staticmethod
+    def _batches(records, model, batch_size, skip, done=None):
+        """Group records into batches of consecutive records, skipping the records imported before
+
+        :param skip: Number of leading records which are imported
+        :param done: dict mapping the first record of other imported batches to their number of records
+        """
+        imported = set()
+        for start, count in (done or {}).items():
+            imported.update(range(start, start + count))
+
+        batch = []
+        start = skip
+
+        for index, record in enumerate(records):
+            if index < skip:
+                continue
+            if index in imported:
+                if batch:
+                    yield start, batch
+                    batch = []
+                start = index + 1
+                continue
+            batch.append(Importer._convert_ids(model, record))
+            if len(batch) >= batch_size:
+                yield start, batch
+                start += len(batch)
+                batch = []
+
+        if batch:
+            yield start, batch
+
+    @staticmethod
+    def _convert_ids(model, record):
+        """Turn <field>_id columns of foreign keys into an id reference"""
+        for field in model.foreign_keys:
+            key = '{}_id'.format(field)
+            if key in record and field not in record:
+                record[field] = int(record.pop(key))
+        return record
+
+    def _create_with_helper(self, model, records, references, created):
+        """Create the records one by one with the create_* helper of the model
+
+        :param created: Function called with the index of every record right after it is created
+        """
+        module, helper, arguments = HELPERS[model.name]
+        create = getattr(getattr(self.netbox, module), helper)
+        id_fields = [field for field, argument in arguments.items() if argument.endswith('_id')]
+        models.resolve_references(self.netbox_con, model, records, fields=id_fields, cache=references)
+
+        for index, record in enumerate(records):
+            missing = [field for field in arguments if field not in record]
+            if missing:
+                raise exceptions.CreateException({"detail": "{} record without {}".format(model.name, ', '.join(missing))})
+
+            args = {argument: record[field] for field, argument in arguments.items()}
+            kwargs = {field: val for field, val in record.items() if field not in arguments}
+            create(**args, **kwargs)
+            created(index)
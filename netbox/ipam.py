@@ -1,5 +1,7 @@
 import ipaddress
 from netbox import exceptions
+from netbox.reconcile import Reconciler
+from netbox.endpoint import Endpoint
 
 
 class Ipam(object):
@@ -7,6 +9,14 @@ class Ipam(object):
     def __init__(self, netbox_con):
 
         self.netbox_con = netbox_con
+        self.rirs = Endpoint(netbox_con, 'rirs')
+        self.aggregates = Endpoint(netbox_con, 'aggregates')
+        self.roles = Endpoint(netbox_con, 'roles')
+        self.vrfs = Endpoint(netbox_con, 'vrfs')
+        self.vlan_groups = Endpoint(netbox_con, 'vlan-groups')
+        self.vlans = Endpoint(netbox_con, 'vlans')
+        self.prefixes = Endpoint(netbox_con, 'prefixes')
+        self.ip_addresses = Endpoint(netbox_con, 'ip-addresses')
 
     def get_choices(self, choice_id=None):
         """Return choices for all fields if choice_id is not defined
@@ -33,7 +43,20 @@ class Ipam(object):
 
     def get_ip_addresses(self, **kwargs):
         """Return all ip addresses"""
-        return self.netbox_con.get('/ipam/ip-addresses/', **kwargs)
+        return self.ip_addresses.list(**kwargs)
+
+    def count_ip_addresses(self, **kwargs):
+        """Returns the number of ip addresses matching the filters"""
+        return self.ip_addresses.count(**kwargs)
+
+    def ip_address_exists(self, address, **kwargs):
+        """Check if an ip address exists
+
+        :param address: IP address, with or without prefix length
+        :param kwargs: Optional filter arguments, e.g. vrf_id
+        :return: bool
+        """
+        return self.netbox_con.exists('/ipam/ip-addresses/', address=address, **kwargs)
 
     def get_ip_by_device(self, device_name):
         """Get IPs which are associated to a device
@@ -58,8 +81,25 @@ class Ipam(object):
         :param kwargs: Optional arguments
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"address": address}
-        return self.netbox_con.post('/ipam/ip-addresses/', required_fields, **kwargs)
+        return self.ip_addresses.create(address, **kwargs)
+
+    def upsert_ip_address(self, address, vrf=None, **kwargs):
+        """Create an ip address or update it when the address exists in the vrf
+
+        :param address: IP address with prefix length
+        :param vrf: Optional vrf name or id, None for the global table
+        :param kwargs: Optional arguments
+        :return: netbox object
+        """
+        return self.upsert_ip_addresses([dict(kwargs, address=address, vrf=vrf)])[0]
+
+    def upsert_ip_addresses(self, ip_addresses):
+        """Create or update many ip addresses, matched on address and vrf, with one lookup and bulk requests
+
+        :param ip_addresses: list of dicts with the ip address fields
+        :return: list of netbox objects
+        """
+        return Reconciler(self.netbox_con).upsert('ip-addresses', ip_addresses)
 
     def update_ip(self, ip_address, **kwargs):
         """Update ip address
@@ -68,11 +108,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            ip_id = self.get_ip_addresses(address=ip_address)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "ip: {}".format(ip_address)}) from None
-        return self.netbox_con.patch('/ipam/ip-addresses/', ip_id, **kwargs)
+        return self.ip_addresses.update(ip_address, **kwargs)
 
     def update_ip_by_id(self, ip_id, **kwargs):
         """Update ip address
@@ -81,7 +117,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/ipam/ip-addresses/', ip_id, **kwargs)
+        return self.ip_addresses.update_by_id(ip_id, **kwargs)
 
     def delete_ip_address(self, ip_address):
         """Delete IP address
@@ -89,11 +125,7 @@ class Ipam(object):
         :param ip_address: IP address to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            ip_id = self.get_ip_addresses(address=ip_address)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "ip: {}".format(ip_address)}) from None
-        return self.netbox_con.delete('/ipam/ip-addresses/', ip_id)
+        return self.ip_addresses.delete(ip_address)
 
     def delete_ip_by_id(self, ip_id):
         """Delete IP address
@@ -101,11 +133,15 @@ class Ipam(object):
         :param ip_id: ID of ip address to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/ipam/ip-addresses/', ip_id)
+        return self.ip_addresses.delete_by_id(ip_id)
 
     def get_ip_prefixes(self, **kwargs):
         """Return all ip prefixes"""
-        return self.netbox_con.get('/ipam/prefixes/', **kwargs)
+        return self.prefixes.list(**kwargs)
+
+    def count_ip_prefixes(self, **kwargs):
+        """Returns the number of ip prefixes matching the filters"""
+        return self.prefixes.count(**kwargs)
 
     def create_ip_prefix(self, prefix, **kwargs):
         """Create a new ip prefix
@@ -114,10 +150,8 @@ class Ipam(object):
         :param kwargs: Optional arguments
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"prefix": prefix}
-
         if ipaddress.ip_network(prefix, strict=True):
-            return self.netbox_con.post('/ipam/prefixes/', required_fields, **kwargs)
+            return self.prefixes.create(prefix, **kwargs)
 
     def delete_ip_prefix(self, **kwargs):
         """Delete IP prefix
@@ -129,7 +163,7 @@ class Ipam(object):
             ip_prefix_id = self.get_ip_prefixes(**kwargs)[0]['id']
         except IndexError:
             raise exceptions.NotFoundException({"detail": "ip-prefix"}) from None
-        return self.netbox_con.delete('/ipam/prefixes/', ip_prefix_id)
+        return self.prefixes.delete_by_id(ip_prefix_id)
 
     def delete_ip_prefix_by_id(self, ip_prefix_id):
         """Delete IP prefix
@@ -137,7 +171,7 @@ class Ipam(object):
         :param ip_prefix_id: Delete prefix based on id
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/ipam/prefixes/', ip_prefix_id)
+        return self.prefixes.delete_by_id(ip_prefix_id)
 
     def update_ip_prefix(self, ip_prefix, **kwargs):
         """Update ip address
@@ -146,11 +180,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            ip_prefix_id = self.get_ip_prefixes(prefix=ip_prefix)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "ip-prefix: {}".format(ip_prefix)}) from None
-        return self.netbox_con.patch('/ipam/prefixes/', ip_prefix_id, **kwargs)
+        return self.prefixes.update(ip_prefix, **kwargs)
 
     def update_ip_prefix_by_id(self, ip_prefix_id, **kwargs):
         """Update ip address
@@ -159,7 +189,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/ipam/prefixes/', ip_prefix_id, **kwargs)
+        return self.prefixes.update_by_id(ip_prefix_id, **kwargs)
 
     def get_next_available_ip(self, **kwargs):
         """Return next available ip in prefix
@@ -177,7 +207,7 @@ class Ipam(object):
 
     def get_vrfs(self, **kwargs):
         """Get all vrfs"""
-        return self.netbox_con.get('/ipam/vrfs/', **kwargs)
+        return self.vrfs.list(**kwargs)
 
     def create_vrf(self, name, rd, **kwargs):
         """Create a new vrf
@@ -187,8 +217,7 @@ class Ipam(object):
         :param kwargs: Optional arguments
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"name": name, "rd": rd}
-        return self.netbox_con.post('/ipam/vrfs/', required_fields, **kwargs)
+        return self.vrfs.create(name, rd=rd, **kwargs)
 
     def delete_vrf(self, vrf_name):
         """Delete vrf
@@ -196,11 +225,7 @@ class Ipam(object):
         :param vrf_name: Name of vrf to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            vrf_id = self.get_vrfs(name=vrf_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "vrf: {}".format(vrf_name)}) from None
-        return self.netbox_con.delete('/ipam/vrfs/', vrf_id)
+        return self.vrfs.delete(vrf_name)
 
     def delete_vrf_by_id(self, vrf_id):
         """Delete vrf
@@ -208,7 +233,7 @@ class Ipam(object):
         :param vrf_id: vrf to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/ipam/vrfs/', vrf_id)
+        return self.vrfs.delete_by_id(vrf_id)
 
     def update_vrf(self, vrf_name, **kwargs):
         """Update vrf
@@ -217,11 +242,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            vrf_id = self.get_vrfs(name=vrf_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "vrf: {}".format(vrf_name)}) from None
-        return self.netbox_con.patch('/ipam/vrfs/', vrf_id, **kwargs)
+        return self.vrfs.update(vrf_name, **kwargs)
 
     def update_vrf_by_id(self, vrf_id, **kwargs):
         """Update vrf
@@ -230,11 +251,11 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/ipam/vrfs/', vrf_id, **kwargs)
+        return self.vrfs.update_by_id(vrf_id, **kwargs)
 
     def get_aggregates(self, **kwargs):
         """Return all aggregates"""
-        return self.netbox_con.get('/ipam/aggregates/', **kwargs)
+        return self.aggregates.list(**kwargs)
 
     def create_aggregate(self, prefix, rir, **kwargs):
         """Creates a new aggregate
@@ -244,11 +265,8 @@ class Ipam(object):
         :param kwargs: Optional Arguments
         :return:
         """
-        rir_id = self.get_rirs(name=rir)[0]['id']
-        required_fields = {"prefix": prefix, "rir": rir_id}
-
         if ipaddress.ip_network(prefix, strict=True):
-            return self.netbox_con.post('/ipam/aggregates/', required_fields, **kwargs)
+            return self.aggregates.create(prefix, rir, **kwargs)
 
     def update_aggregate(self, prefix, **kwargs):
         """Update aggregate
@@ -257,11 +275,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            aggregate_id = self.get_aggregates(prefix=prefix)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "aggregate: {}".format(prefix)}) from None
-        return self.netbox_con.patch('/ipam/aggregates/', aggregate_id, **kwargs)
+        return self.aggregates.update(prefix, **kwargs)
 
     def update_aggregate_by_id(self, aggregate_id, **kwargs):
         """Update aggregate
@@ -270,11 +284,11 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/ipam/aggregates/', aggregate_id, **kwargs)
+        return self.aggregates.update_by_id(aggregate_id, **kwargs)
 
     def get_rirs(self, **kwargs):
         """Return all rirs"""
-        return self.netbox_con.get('/ipam/rirs/', **kwargs)
+        return self.rirs.list(**kwargs)
 
     def create_rir(self, name, slug):
         """Create new rir
@@ -283,8 +297,7 @@ class Ipam(object):
         :param slug: Name of the slug
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/ipam/rirs/', required_fields)
+        return self.rirs.create(name, slug)
 
     def delete_rir(self, rir_name):
         """Delete rir
@@ -292,11 +305,7 @@ class Ipam(object):
         :param rir_name: rir name to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            rir_id = self.get_rirs(name=rir_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "rir: {}".format(rir_name)}) from None
-        return self.netbox_con.delete('/ipam/rirs/', rir_id)
+        return self.rirs.delete(rir_name)
 
     def delete_rir_by_id(self, rir_id):
         """Delete rir
@@ -304,7 +313,7 @@ class Ipam(object):
         :param rir_id: rir to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/ipam/rirs/', rir_id)
+        return self.rirs.delete_by_id(rir_id)
 
     def update_rir(self, rir_name, **kwargs):
         """Update rir
@@ -313,11 +322,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            rir_id = self.get_rirs(name=rir_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "rir: {}".format(rir_name)}) from None
-        return self.netbox_con.patch('/ipam/rirs/', rir_id, **kwargs)
+        return self.rirs.update(rir_name, **kwargs)
 
     def update_rir_by_id(self, rir_id, **kwargs):
         """Update rir
@@ -326,11 +331,11 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/ipam/rirs/', rir_id, **kwargs)
+        return self.rirs.update_by_id(rir_id, **kwargs)
 
     def get_roles(self, **kwargs):
         """Return all roles"""
-        return self.netbox_con.get('/ipam/roles/', **kwargs)
+        return self.roles.list(**kwargs)
 
     def create_role(self, name, slug, **kwargs):
         """Create new prefix/vlan role
@@ -339,8 +344,7 @@ class Ipam(object):
         :param slug: Name of the slug
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/ipam/roles/', required_fields, **kwargs)
+        return self.roles.create(name, slug, **kwargs)
 
     def delete_role(self, role_name):
         """Delete prefix/vlan role
@@ -348,11 +352,7 @@ class Ipam(object):
         :param role_name: prefix/vlan role to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            role_id = self.get_roles(name=role_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "prefix/vlan role: {}".format(role_name)}) from None
-        return self.netbox_con.delete('/ipam/roles/', role_id)
+        return self.roles.delete(role_name)
 
     def delete_role_by_id(self, role_id):
         """Delete prefix/vlan role
@@ -360,7 +360,7 @@ class Ipam(object):
         :param role_id: prefix/vlan role to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/ipam/roles/', role_id)
+        return self.roles.delete_by_id(role_id)
 
     def update_role(self, role_name, **kwargs):
         """Update prefix role
@@ -369,11 +369,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            prefix_role_id = self.get_roles(name=role_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "prefix/vlan role: {}".format(role_name)}) from None
-        return self.netbox_con.patch('/ipam/roles/', prefix_role_id, **kwargs)
+        return self.roles.update(role_name, **kwargs)
 
     def update_role_by_id(self, role_id, **kwargs):
         """Update prefix role
@@ -382,11 +378,15 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/ipam/roles/', role_id, **kwargs)
+        return self.roles.update_by_id(role_id, **kwargs)
 
     def get_vlans(self, **kwargs):
         """Return all vlans"""
-        return self.netbox_con.get('/ipam/vlans/', **kwargs)
+        return self.vlans.list(**kwargs)
+
+    def count_vlans(self, **kwargs):
+        """Returns the number of vlans matching the filters"""
+        return self.vlans.count(**kwargs)
 
     def create_vlan(self, vid, vlan_name, **kwargs):
         """Create new vlan
@@ -396,8 +396,7 @@ class Ipam(object):
         :param kwargs: Optional Arguments
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"vid": vid, "name": vlan_name}
-        return self.netbox_con.post('/ipam/vlans/', required_fields, **kwargs)
+        return self.vlans.create(vid, vlan_name, **kwargs)
 
     def delete_vlan(self, vid):
         """Delete VLAN based on VLAN ID
@@ -409,7 +408,7 @@ class Ipam(object):
             vid_id = self.get_vlans(vid=vid)[0]['id']
         except IndexError:
             raise exceptions.NotFoundException({"detail": "vlan: {}".format(vid)}) from None
-        return self.netbox_con.delete('/ipam/vlans/', vid_id)
+        return self.vlans.delete_by_id(vid_id)
 
     def delete_vlan_by_id(self, vlan_id):
         """Delete VLAN based on VLAN ID
@@ -417,7 +416,7 @@ class Ipam(object):
         :param vlan_id: vlan id to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/ipam/vlans/', vlan_id)
+        return self.vlans.delete_by_id(vlan_id)
 
     def update_vlan(self, vlan_name, **kwargs):
         """Update vlan
@@ -426,11 +425,7 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            vlan_id = self.get_vlans(name=vlan_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "vlan: {}".format(vlan_name)}) from None
-        return self.netbox_con.patch('/ipam/vlans/', vlan_id, **kwargs)
+        return self.vlans.update(vlan_name, **kwargs)
 
     def update_vlan_by_id(self, vlan_id, **kwargs):
         """Update vlan
@@ -439,11 +434,11 @@ class Ipam(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/ipam/vlans/', vlan_id, **kwargs)
+        return self.vlans.update_by_id(vlan_id, **kwargs)
 
     def get_vlan_groups(self, **kwargs):
         """Return all vlan groups"""
-        return self.netbox_con.get('/ipam/vlan-groups/', **kwargs)
+        return self.vlan_groups.list(**kwargs)
 
     def create_vlan_group(self, name, slug, **kwargs):
         """Create new vlan-group
@@ -453,8 +448,7 @@ class Ipam(object):
         :param kwargs: Optional Arguments
         :return: netbox object if successful otherwise raise CreateException
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/ipam/vlan-groups/', required_fields, **kwargs)
+        return self.vlan_groups.create(name, slug, **kwargs)
 
     def delete_vlan_group(self, name):
         """Delete VLAN group
@@ -462,11 +456,7 @@ class Ipam(object):
         :param name: name of the vlan-group to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        try:
-            vgrp_id = self.get_vlan_groups(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "vlan: {}".format(name)}) from None
-        return self.netbox_con.delete('/ipam/vlan-groups/', vgrp_id)
+        return self.vlan_groups.delete(name)
 
     def delete_vlan_group_by_id(self, vlan_group_id):
         """Delete VLAN group
@@ -474,7 +464,7 @@ class Ipam(object):
         :param vlan_group_id: vlan-group to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/ipam/vlan-groups/', vlan_group_id)
+        return self.vlan_groups.delete_by_id(vlan_group_id)
 
     def update_vlan_group(self, name, **kwargs):
         """Update vlan-group
@@ -483,11 +473,7 @@ class Ipam(object):
         :param kwargs: arguments
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            vgrp_ip = self.get_vlan_groups(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "name: {}".format(name)}) from None
-        return self.netbox_con.patch('/ipam/vlan-groups/', vgrp_ip, **kwargs)
+        return self.vlan_groups.update(name, **kwargs)
 
     def update_vlan_group_by_id(self, vlan_group_id, **kwargs):
         """Update vlan-group
@@ -496,4 +482,4 @@ class Ipam(object):
         :param kwargs: arguments
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/ipam/vlan-groups/', vlan_group_id, **kwargs)
+        return self.vlan_groups.update_by_id(vlan_group_id, **kwargs)
@@ -0,0 +1,60 @@
+from netbox import models
+
+
+class Loader(object):
+
+    def __init__(self, netbox_con):
+        self.netbox_con = netbox_con
+
+    def load(self, objects):
+        """Create objects of many models, level by level with concurrent bulk creates
+
+        The models are grouped into dependency levels, e.g. regions and manufacturers, then sites
+        and device-types, then racks and so on. All models of a level and all chunks of bulk_size
+        objects are created concurrently, with up to max_workers requests in flight. References
+        are given as id, as dict with an id or as string matched on the lookup field of the
+        referenced model, which includes the objects created by earlier levels of the same load.
+        Names which are only unique within a parent (e.g. devices within a site, see the natural
+        key of the model) are looked up on the server, and one which matches more than one object
+        raises ClientException, give the id then.
+
+        When a level fails, the levels before it stay created and the first exception is raised.
+
+        Example:
+
+            >>> netbox.loader.load({'sites': [{'name': 'ams1', 'slug': 'ams1'}],
+            ...                     'racks': [{'name': 'rack{}'.format(index), 'site': 'ams1'} for index in range(40)],
+            ...                     'devices': [{'name': 'leaf1', 'site': 'ams1', 'rack': 'rack1',
+            ...                                  'device_role': 'leaf', 'device_type': 'qfx5100'}]})
+
+        :param objects: dict mapping a model name (e.g. sites, devices, interfaces) to a list of objects
+        :return: dict mapping the model name to the list of created objects
+        """
+        objects = {models.get_model(name).name: [dict(obj) for obj in values] for name, values in objects.items()}
+        references = {}
+        created = {}
+
+        for level in models.dependency_levels(objects):
+            self.netbox_con.run_parallel([(models.resolve_references,
+                                           (self.netbox_con, models.get_model(name), objects[name]),
+                                           {'cache': references}) for name in level])
+
+            calls = []
+            for name in level:
+                values = objects[name]
+                for index in range(0, len(values), self.netbox_con.bulk_size):
+                    calls.append((name, values[index:index + self.netbox_con.bulk_size]))
+
+            results = self.netbox_con.run_parallel([(self.netbox_con.bulk_post, (models.get_model(name).path, chunk), {})
+                                                    for name, chunk in calls])
+
+            for (name, chunk), result in zip(calls, results):
+                model = models.get_model(name)
+                created.setdefault(name, []).extend(result)
+                if not models.unique_lookup(model):
+                    continue
+                for obj in result:
+                    if isinstance(obj.get(model.lookup_field), str):
+                        references[(name, obj[model.lookup_field])] = obj['id']
+
+        return created
@@ -0,0 +1,244 @@
+import netbox.exceptions as exceptions
+
+
+class Model(object):
+    """Description of a NetBox model for the generic helpers
+
+    :param name: Model name as used in the API path, e.g. ip-addresses
+    :param path: API endpoint of the model
+    :param natural_key: Fields which identify an object without its id
+    :param lookup_field: Field a plain string reference to this model is matched on
+    :param foreign_keys: dict mapping a field to the name of the model it refers to
+    :param required: Fields which are required to create an object
+    :param label: Singular name used in error messages, e.g. ip-address
+    """
+
+    def __init__(self, name, path, natural_key, lookup_field='name', foreign_keys=None, required=(), label=None):
+        self.name = name
+        self.path = path
+        self.natural_key = natural_key
+        self.lookup_field = lookup_field
+        self.foreign_keys = foreign_keys or {}
+        self.required = required
+        self.label = label or (name[:-2] if name.endswith(('sses', 'xes')) else name[:-1])
+
+    def __repr__(self):
+        return 'Model({})'.format(self.name)
+
+
+class PendingReference(object):
+    """Reference to an object which does not exist yet but is created in the same run"""
+
+    def __init__(self, model, value):
+        self.model = model
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, PendingReference) and (self.model, self.value) == (other.model, other.value)
+
+    def __hash__(self):
+        return hash((self.model, self.value))
+
+    def __repr__(self):
+        return 'PendingReference({}: {})'.format(self.model, self.value)
+
+
+# Value of a resolve cache entry whose lookup field value matches more than one object
+AMBIGUOUS = object()
+
+
+def unique_lookup(model):
+    """Check if the lookup field identifies an object on its own, e.g. not a device name, which is unique per site"""
+    return len(model.natural_key) == 1
+
+
+# Models are listed in dependency order, every model only refers to models above it
+_models = [
+    Model('tags', '/extras/tags/', ('slug',), required=('name', 'slug')),
+    Model('regions', '/dcim/regions/', ('slug',), required=('name', 'slug')),
+    Model('tenant-groups', '/tenancy/tenant-groups/', ('slug',), required=('name', 'slug')),
+    Model('tenants', '/tenancy/tenants/', ('slug',), foreign_keys={'group': 'tenant-groups'},
+          required=('name', 'slug')),
+    Model('sites', '/dcim/sites/', ('slug',), foreign_keys={'region': 'regions', 'tenant': 'tenants'},
+          required=('name', 'slug')),
+    Model('locations', '/dcim/locations/', ('site', 'slug'), foreign_keys={'site': 'sites'},
+          required=('name', 'slug', 'site')),
+    Model('rack-groups', '/dcim/rack-groups/', ('site', 'slug'), foreign_keys={'site': 'sites'},
+          required=('name', 'slug', 'site')),
+    Model('racks', '/dcim/racks/', ('site', 'name'),
+          foreign_keys={'site': 'sites', 'location': 'locations', 'group': 'rack-groups', 'tenant': 'tenants'},
+          required=('name', 'site')),
+    Model('manufacturers', '/dcim/manufacturers/', ('slug',), required=('name', 'slug')),
+    Model('device-types', '/dcim/device-types/', ('manufacturer', 'model'), lookup_field='model',
+          foreign_keys={'manufacturer': 'manufacturers'}, required=('model', 'slug', 'manufacturer')),
+    Model('interface-templates', '/dcim/interface-templates/', ('device_type', 'name'),
+          foreign_keys={'device_type': 'device-types'}, required=('name', 'device_type')),
+    Model('device-roles', '/dcim/device-roles/', ('slug',), required=('name', 'color', 'slug')),
+    Model('platforms', '/dcim/platforms/', ('slug',), foreign_keys={'manufacturer': 'manufacturers'},
+          required=('name', 'slug')),
+    Model('cluster-types', '/virtualization/cluster-types/', ('slug',), required=('name', 'slug')),
+    Model('clusters', '/virtualization/clusters/', ('name',),
+          foreign_keys={'type': 'cluster-types', 'site': 'sites', 'tenant': 'tenants'}, required=('name', 'type')),
+    Model('devices', '/dcim/devices/', ('name', 'site'),
+          foreign_keys={'site': 'sites', 'rack': 'racks', 'location': 'locations', 'device_role': 'device-roles',
+                        'device_type': 'device-types', 'platform': 'platforms', 'tenant': 'tenants',
+                        'cluster': 'clusters'},
+          required=('name', 'device_role', 'site', 'device_type')),
+    Model('interfaces', '/dcim/interfaces/', ('device', 'name'), foreign_keys={'device': 'devices'},
+          required=('name', 'type', 'device')),
+    Model('inventory-items', '/dcim/inventory-items/', ('device', 'name'), foreign_keys={'device': 'devices'},
+          required=('name', 'device')),
+    Model('rear-ports', '/dcim/rear-ports/', ('device', 'name'), foreign_keys={'device': 'devices'},
+          required=('name', 'type', 'device')),
+    Model('front-ports', '/dcim/front-ports/', ('device', 'name'),
+          foreign_keys={'device': 'devices', 'rear_port': 'rear-ports'}, required=('name', 'type', 'device', 'rear_port')),
+    Model('cables', '/dcim/cables/', ('label',), lookup_field='label'),
+    Model('power-panels', '/dcim/power-panels/', ('site', 'name'),
+          foreign_keys={'site': 'sites', 'location': 'locations'}, required=('name', 'site')),
+    Model('power-feeds', '/dcim/power-feeds/', ('power_panel', 'name'),
+          foreign_keys={'power_panel': 'power-panels', 'rack': 'racks', 'tenant': 'tenants'},
+          required=('name', 'power_panel')),
+    Model('virtual-machines', '/virtualization/virtual-machines/', ('name', 'cluster'),
+          foreign_keys={'cluster': 'clusters', 'site': 'sites', 'platform': 'platforms', 'tenant': 'tenants'},
+          required=('name', 'cluster')),
+    Model('vm-interfaces', '/virtualization/interfaces/', ('virtual_machine', 'name'),
+          foreign_keys={'virtual_machine': 'virtual-machines'}, required=('name', 'virtual_machine'),
+          label='vm-interface'),
+    Model('providers', '/circuits/providers/', ('slug',), required=('name', 'slug')),
+    Model('circuit-types', '/circuits/circuit-types/', ('slug',), required=('name', 'slug')),
+    Model('circuits', '/circuits/circuits/', ('provider', 'cid'), lookup_field='cid',
+          foreign_keys={'provider': 'providers', 'type': 'circuit-types', 'tenant': 'tenants'},
+          required=('cid', 'provider', 'type')),
+    Model('rirs', '/ipam/rirs/', ('slug',), required=('name', 'slug')),
+    Model('aggregates', '/ipam/aggregates/', ('prefix',), lookup_field='prefix', foreign_keys={'rir': 'rirs'},
+          required=('prefix', 'rir')),
+    Model('roles', '/ipam/roles/', ('slug',), required=('name', 'slug')),
+    Model('vrfs', '/ipam/vrfs/', ('name',), foreign_keys={'tenant': 'tenants'}, required=('name',)),
+    Model('vlan-groups', '/ipam/vlan-groups/', ('slug',), required=('name', 'slug')),
+    Model('vlans', '/ipam/vlans/', ('vid', 'group', 'site'),
+          foreign_keys={'site': 'sites', 'group': 'vlan-groups', 'tenant': 'tenants', 'role': 'roles'},
+          required=('vid', 'name')),
+    Model('prefixes', '/ipam/prefixes/', ('prefix', 'vrf'), lookup_field='prefix',
+          foreign_keys={'site': 'sites', 'vrf': 'vrfs', 'vlan': 'vlans', 'tenant': 'tenants', 'role': 'roles'},
+          required=('prefix',)),
+    Model('ip-addresses', '/ipam/ip-addresses/', ('address', 'vrf'), lookup_field='address',
+          foreign_keys={'vrf': 'vrfs', 'tenant': 'tenants'}, required=('address',)),
+]
+
+MODELS = {model.name: model for model in _models}
+
+
+def get_model(name):
+    """Return the model for a model name or API path
+
+    :param name: Model name or path, e.g. devices, dcim/devices or /dcim/devices/
+    :return: Model
+    """
+    if name in MODELS:
+        return MODELS[name]
+
+    path = '/{}/'.format(name.strip('/'))
+    for model in _models:
+        if model.path == path:
+            return model
+
+    raise KeyError('Unknown model: {}'.format(name))
+
+
+def dependency_index(name):
+    """Position of a model name or API path in the dependency order, unknown endpoints come last"""
+    try:
+        return _models.index(get_model(name))
+    except KeyError:
+        return len(_models)
+
+
+def dependency_order(names):
+    """Sort model names so that referenced models come first"""
+    order = [model.name for model in _models]
+    return sorted(names, key=lambda name: order.index(get_model(name).name))
+
+
+def dependency_levels(names):
+    """Group model names into levels, every model only refers to models of earlier levels
+
+    Models of the same level do not depend on each other and can be created concurrently.
+
+    :param names: Model names or API paths
+    :return: list of lists of model names
+    """
+    present = {get_model(name).name for name in names}
+    levels = {}
+    for model in _models:
+        if model.name in present:
+            refs = [levels[ref] for ref in model.foreign_keys.values() if ref in levels and ref != model.name]
+            levels[model.name] = max(refs) + 1 if refs else 0
+
+    grouped = [[] for _ in range(max(levels.values()) + 1)] if levels else []
+    for name, level in levels.items():
+        grouped[level].append(name)
+    return grouped
+
+
+def resolve_references(netbox_con, model, objects, fields=None, cache=None, pending=None):
+    """Replace string references in objects with ids, using one batched lookup per referenced model
+
+    References given as dict with an id are reduced to the id. Strings are matched on the lookup
+    field of the referenced model, the lookups of different models run concurrently. A string
+    which matches more than one object, e.g. a device name used in two sites, raises
+    ClientException instead of picking one of them.
+
+    :param netbox_con: NetboxConnection
+    :param model: Model of the objects
+    :param objects: list of dicts, updated in place
+    :param fields: Optional list of foreign key fields to resolve, defaults to all foreign keys
+    :param cache: Optional dict (model name, value) -> id or AMBIGUOUS, reused and filled across calls
+    :param pending: Optional dict model name -> set of values which are created in the same run,
+                    these are replaced with a PendingReference instead of raising NotFoundException
+    """
+    cache = {} if cache is None else cache
+    pending = pending or {}
+    foreign_keys = {field: ref_name for field, ref_name in model.foreign_keys.items()
+                    if fields is None or field in fields}
+
+    unknown = {}
+    for field, ref_name in foreign_keys.items():
+        for obj in objects:
+            if isinstance(obj.get(field), dict) and 'id' in obj[field]:
+                obj[field] = obj[field]['id']
+            if isinstance(obj.get(field), str) and (ref_name, obj[field]) not in cache:
+                unknown.setdefault(ref_name, set()).add(obj[field])
+
+    ref_names = list(unknown)
+    results = netbox_con.run_parallel([(lookup_ids, (netbox_con, get_model(ref_name), sorted(unknown[ref_name])), {})
+                                       for ref_name in ref_names])
+    for ref_name, ids in zip(ref_names, results):
+        cache.update({(ref_name, name): obj_id for name, obj_id in ids.items()})
+
+    for field, ref_name in foreign_keys.items():
+        for obj in objects:
+            value = obj.get(field)
+            if not isinstance(value, str):
+                continue
+            if cache.get((ref_name, value)) is AMBIGUOUS:
+                raise exceptions.ClientException({"detail": "{}: {} matches more than one object, use the id".format(
+                    ref_name, value)})
+            if (ref_name, value) in cache:
+                obj[field] = cache[(ref_name, value)]
+            elif value in pending.get(ref_name, ()):
+                obj[field] = PendingReference(ref_name, value)
+            else:
+                raise exceptions.NotFoundException({"detail": "{}: {}".format(ref_name, value)})
+
+
+def lookup_ids(netbox_con, model, values):
+    """Return a dict mapping the found lookup field values to their id, or to AMBIGUOUS for several objects"""
+    if unique_lookup(model):
+        return netbox_con.resolve_ids(model.path, values, field=model.lookup_field)
+
+    # Not cached by name in the id cache, the same name may be used by another object at any time
+    ids = {}
+    for obj in netbox_con.get_batched(model.path, model.lookup_field, values):
+        value = obj[model.lookup_field]
+        ids[value] = AMBIGUOUS if value in ids else obj['id']
+    return ids
@@ -7,6 +7,13 @@ import netbox.tenancy as tenancy
 import netbox.extras as extras
 import netbox.circuits as circuits
 import netbox.status as status
+import netbox.graphql as graphql
+import netbox.reconcile as reconcile
+import netbox.importer as importer
+import netbox.export as export
+import netbox.loader as loader
+import netbox.snapshot as snapshot
+import netbox.warmstart as warmstart
 
 
 class NetBox(object):
@@ -19,4 +26,16 @@ class NetBox(object):
         self.tenancy = tenancy.Tenancy(self.connection)
         self.extras = extras.Extras(self.connection)
         self.status = status.Status(self.connection)
+        self.graphql = graphql.Graphql(self.connection)
+        self.reconcile = reconcile.Reconciler(self.connection)
+        self.importer = importer.Importer(self)
+        self.exporter = export.Exporter(self.connection)
+        self.loader = loader.Loader(self.connection)
+        self.snapshot = snapshot.Snapshot(self.connection)
+        self.warm_start = warmstart.WarmStart(self.connection)
+        self.schema = self.connection.schema
         self.exceptions = exceptions
+
+    def batch(self):
+        """Queue writes and send them as bulk requests at the end of the block, see NetboxConnection.batch"""
+        return self.connection.batch()
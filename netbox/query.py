@@ -0,0 +1,351 @@
+import bisect
+import threading
+import weakref
+import netbox.exceptions as exceptions
+from netbox.cache import cache_path
+
+# Lookup expressions of the NetBox filters, e.g. name__ic=leaf
+LOOKUPS = ('n', 'ic', 'nic', 'ie', 'nie', 'isw', 'nisw', 'iew', 'niew', 'gt', 'gte', 'lt', 'lte')
+
+# Query arguments which are not filters
+PAGINATION = ('limit', 'offset', 'ordering', 'brief', 'export')
+
+# Fields of a nested object a filter value is matched on, e.g. site=ams1 matches the slug or name
+IDENTIFIERS = ('slug', 'name', 'value', 'model', 'cid', 'address', 'prefix')
+
+# Fields searched by q=
+SEARCH_FIELDS = ('name', 'description', 'serial', 'asset_tag', 'dns_name', 'address', 'prefix', 'cid', 'label',
+                 'model', 'slug', 'comments')
+
+# Filters named after a field the API returns under another name, e.g. tag=core matches the tags list
+FIELD_ALIASES = {
+    'tag': 'tags',
+    'role': 'device_role',
+    'device_role': 'role',
+}
+
+
+def filter_keys(obj, field):
+    """Return the values of a field as strings, the way a filter value of that field is written
+
+    Nested objects give their slug, name or choice value and, for <field>_id filters, their id.
+    Lists give the keys of all their items and an empty value gives null.
+    """
+    if field in obj:
+        value = obj[field]
+    elif field.endswith('_id') and field[:-3] in obj:
+        value = obj[field[:-3]]
+        if isinstance(value, list):
+            return {str(item['id']) for item in value if isinstance(item, dict) and 'id' in item} or {'null'}
+        return {str(value['id'])} if isinstance(value, dict) and 'id' in value else {'null'}
+    elif field in FIELD_ALIASES and FIELD_ALIASES[field] in obj:
+        value = obj[FIELD_ALIASES[field]]
+    else:
+        return {'null'}
+
+    if isinstance(value, list):
+        keys = set()
+        for item in value:
+            keys |= value_keys(item)
+        return keys or {'null'}
+    return value_keys(value)
+
+
+def has_field(obj, field):
+    """Check if filter_keys() can answer a filter of a field from the object itself"""
+    if field in obj or (field in FIELD_ALIASES and FIELD_ALIASES[field] in obj):
+        return True
+    return field.endswith('_id') and field[:-3] in obj
+
+
+def value_keys(value):
+    """Return the strings a single value is matched on"""
+    if value is None:
+        return {'null'}
+    if isinstance(value, dict):
+        return {str(value[field]) for field in IDENTIFIERS if value.get(field) is not None}
+    return {filter_value(value)}
+
+
+def filter_value(value):
+    """Write a filter value the way it is sent in a query string"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value is None:
+        return 'null'
+    return str(value)
+
+
+class Query(object):
+    """In-memory objects which answer the filter arguments of the get_* helpers without requests
+
+    Filters are combined like NetBox does: different filters must all match, the values of a
+    filter given as list match any. Equality filters (site=ams1, status=active, tag=core,
+    site_id=1) are answered from a hash index and range filters (vid__gt=100) from a sorted
+    index, both built on first use per field. The lookups n, ic, ie, isw, iew (and their
+    negations) are matched against the distinct values of the hash index, q= searches the
+    SEARCH_FIELDS.
+
+    Example:
+
+        >>> devices = netbox.dcim.devices.query(site='ams1')
+        >>> devices.filter(role='leaf', status='active')
+        >>> devices.filter(tag=['core', 'edge'], q='leaf')
+        >>> devices.count(platform='junos')
+
+    :param objects: Objects as returned by the API
+    :param param: Optional API endpoint the objects were read from, needed to follow writes
+    :param filters: Filter arguments the objects were read with, created objects which do not match are not added.
+                    Filters which can not be checked on the objects (e.g. region or cf_*) are checked
+                    by the server for the written objects, which needs an attached connection
+    """
+
+    def __init__(self, objects=(), param=None, filters=None):
+        self.param = cache_path(param) if param else None
+        self.filters = dict(filters or {})
+        self._objects = {}
+        self._by_id = {}
+        self._next = 0
+        self._hash_indexes = {}
+        self._sorted_indexes = {}
+        self._lock = threading.RLock()
+        self.netbox_con = None
+        self.add(objects)
+
+    @classmethod
+    def load(cls, netbox_con, param, **kwargs):
+        """Read all objects of an endpoint matching the filters and keep them updated on writes
+
+        :param netbox_con: NetboxConnection
+        :param param: API endpoint, e.g. /dcim/devices/
+        :param kwargs: Filter arguments sent to the server
+        :return: Query
+        """
+        query = cls(netbox_con.iterate(param, **kwargs), param=param, filters=kwargs)
+        query.attach(netbox_con)
+        return query
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._objects.values()))
+
+    def filter(self, **kwargs):
+        """Return the objects matching the filters, in the order they were added"""
+        with self._lock:
+            return [self._objects[seq] for seq in sorted(self._match(kwargs))]
+
+    def count(self, **kwargs):
+        """Return the number of objects matching the filters"""
+        with self._lock:
+            return len(self._match(kwargs))
+
+    def get(self, **kwargs):
+        """Return the first object matching the filters, raises NotFoundException if there is no match"""
+        results = self.filter(**kwargs)
+        if not results:
+            raise exceptions.NotFoundException({"detail": "{}: {}".format(self.param or 'object', kwargs)})
+        return results[0]
+
+    def add(self, objects):
+        """Add objects or replace the objects with the same id"""
+        with self._lock:
+            for obj in objects:
+                seq = self._by_id.get(obj.get('id'))
+                if seq is None:
+                    seq = self._next
+                    self._next += 1
+                    if obj.get('id') is not None:
+                        self._by_id[obj['id']] = seq
+                else:
+                    self._unindex(seq)
+                self._objects[seq] = obj
+                self._index(seq)
+
+    def remove(self, ids):
+        """Remove objects by id"""
+        with self._lock:
+            for obj_id in ids:
+                seq = self._by_id.pop(obj_id, None)
+                if seq is not None:
+                    self._unindex(seq)
+                    del self._objects[seq]
+
+    def attach(self, netbox_con):
+        """Follow the writes made through a connection, see NetboxConnection.write_listeners
+
+        The connection only holds a weak reference, a Query which is no longer used is freed
+        and its listener is dropped on the next write or attach.
+        """
+        # Drop the listeners of freed queries, also when no writes are made
+        netbox_con.write_listeners[:] = [item for item in netbox_con.write_listeners
+                                         if not (isinstance(item, weakref.WeakMethod) and item() is None)]
+        listener = weakref.WeakMethod(self.listener)
+        if listener not in netbox_con.write_listeners:
+            netbox_con.write_listeners.append(listener)
+        self.netbox_con = netbox_con
+
+    def detach(self, netbox_con):
+        """Stop following the writes made through a connection"""
+        listener = weakref.WeakMethod(self.listener)
+        if listener in netbox_con.write_listeners:
+            netbox_con.write_listeners.remove(listener)
+        if self.netbox_con is netbox_con:
+            self.netbox_con = None
+
+    def listener(self, method, param, objects):
+        """Apply a write to the objects of the same endpoint"""
+        if self.param is None or cache_path(param) != self.param:
+            return
+
+        with self._lock:
+            if method == 'DELETE':
+                self.remove(objects)
+                return
+
+            matching = self._written_matches(objects)
+            for seq, obj in enumerate(objects):
+                if matching is None or seq in matching:
+                    self.add([obj])
+                elif method == 'PATCH':
+                    # The object no longer matches the filters it was read with
+                    self.remove([obj.get('id')])
+
+    def _written_matches(self, objects):
+        """Return the positions of the written objects which match the filters, None without filters"""
+        filters = {key: value for key, value in self.filters.items() if key not in PAGINATION}
+        if not filters:
+            return None
+
+        checkable = {key: value for key, value in filters.items() if self._checkable(key, objects)}
+        if len(checkable) == len(filters) or self.netbox_con is None:
+            return Query(objects)._match(checkable)
+
+        # Some filters are only known to the server, ask it which of the written objects still match
+        ids = [obj.get('id') for obj in objects]
+        found = {obj['id'] for obj in self.netbox_con.get_batched(
+            self.param, 'id', [obj_id for obj_id in ids if obj_id is not None], **filters)}
+        return {seq for seq, obj_id in enumerate(ids) if obj_id in found}
+
+    @staticmethod
+    def _checkable(key, objects):
+        """Check if a filter can be matched on the objects, the server searches more fields with q="""
+        field = key.rsplit('__', 1)[0] if '__' in key and key.rsplit('__', 1)[1] in LOOKUPS else key
+        return field != 'q' and all(has_field(obj, field) for obj in objects)
+
+    def _match(self, kwargs):
+        """Return the sequence numbers of the objects matching all filters"""
+        result = None
+        for key, value in kwargs.items():
+            if key in PAGINATION:
+                continue
+            values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+            field, lookup = key, None
+            if '__' in key and key.rsplit('__', 1)[1] in LOOKUPS:
+                field, lookup = key.rsplit('__', 1)
+
+            if field == 'q':
+                matches = self._search(values)
+            elif lookup in ('gt', 'gte', 'lt', 'lte'):
+                matches = self._range(field, lookup, values)
+            elif lookup is None or lookup == 'n':
+                index = self._hash_index(field)
+                matches = set()
+                for item in values:
+                    matches |= index.get(filter_value(item), set())
+            else:
+                matches = self._text(field, lookup.lstrip('n'), values)
+
+            if lookup is not None and lookup.startswith('n'):
+                matches = set(self._objects) - matches
+
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+
+        return set(self._objects) if result is None else result
+
+    def _text(self, field, lookup, values):
+        """Match the distinct values of a field case-insensitively: ic contains, ie equals, isw/iew starts/ends with"""
+        values = [filter_value(item).lower() for item in values]
+        predicate = {'ic': lambda key, item: item in key,
+                     'ie': lambda key, item: key == item,
+                     'isw': lambda key, item: key.startswith(item),
+                     'iew': lambda key, item: key.endswith(item)}[lookup]
+
+        matches = set()
+        for key, seqs in self._hash_index(field).items():
+            if key != 'null' and any(predicate(key.lower(), item) for item in values):
+                matches |= seqs
+        return matches
+
+    def _search(self, values):
+        matches = set()
+        for field in SEARCH_FIELDS:
+            matches |= self._text(field, 'ic', values)
+        return matches
+
+    def _range(self, field, lookup, values):
+        keys, seqs = self._sorted_index(field)
+        if not keys:
+            return set()
+
+        matches = set()
+        for item in values:
+            try:
+                bound = float(item) if isinstance(keys[0], (int, float)) else str(item)
+            except ValueError:
+                raise exceptions.ClientException({"detail": "{}__{}: {} is not a number".format(
+                    field, lookup, item)}) from None
+            if lookup == 'gt':
+                matches |= set(seqs[bisect.bisect_right(keys, bound):])
+            elif lookup == 'gte':
+                matches |= set(seqs[bisect.bisect_left(keys, bound):])
+            elif lookup == 'lt':
+                matches |= set(seqs[:bisect.bisect_left(keys, bound)])
+            else:
+                matches |= set(seqs[:bisect.bisect_right(keys, bound)])
+        return matches
+
+    def _hash_index(self, field):
+        """Return the index mapping the filter keys of a field to sequence numbers, built on first use"""
+        index = self._hash_indexes.get(field)
+        if index is None:
+            index = self._hash_indexes[field] = {}
+            for seq, obj in self._objects.items():
+                for key in filter_keys(obj, field):
+                    index.setdefault(key, set()).add(seq)
+        return index
+
+    def _sorted_index(self, field):
+        """Return the scalar values of a field in sorted order and their sequence numbers, built on first use"""
+        index = self._sorted_indexes.get(field)
+        if index is None:
+            entries = [(obj[field], seq) for seq, obj in self._objects.items()
+                       if isinstance(obj.get(field), (int, float, str)) and not isinstance(obj.get(field), bool)]
+            if any(isinstance(value, str) for value, _ in entries):
+                entries = [(str(value), seq) for value, seq in entries]
+            entries.sort()
+            index = self._sorted_indexes[field] = ([value for value, _ in entries], [seq for _, seq in entries])
+        return index
+
+    def _index(self, seq):
+        """Add an object to the built hash indexes, sorted indexes are rebuilt on next use"""
+        obj = self._objects[seq]
+        for field, index in self._hash_indexes.items():
+            for key in filter_keys(obj, field):
+                index.setdefault(key, set()).add(seq)
+        self._sorted_indexes = {}
+
+    def _unindex(self, seq):
+        obj = self._objects[seq]
+        for field, index in self._hash_indexes.items():
+            for key in filter_keys(obj, field):
+                seqs = index.get(key)
+                if seqs is not None:
+                    seqs.discard(seq)
+                    if not seqs:
+                        del index[key]
+        self._sorted_indexes = {}
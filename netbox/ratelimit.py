@@ -0,0 +1,247 @@
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+import netbox.exceptions as exceptions
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class TokenBucket(object):
+    """Token bucket which allows rate requests per second with bursts of up to burst requests
+
+    With a path the bucket state lives in a file protected by an exclusive file lock, so all
+    threads and processes using the same path share one bucket.
+
+    :param rate: Requests per second
+    :param burst: Bucket size, defaults to max(1, rate)
+    :param path: Optional state file to share the bucket across processes
+    """
+
+    def __init__(self, rate, burst=None, path=None):
+        if path is not None and fcntl is None:
+            raise NotImplementedError('Sharing a rate limit across processes requires fcntl')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self.path = path
+        self._tokens = self.burst
+        self._stamp = time.time()
+        self._lock = threading.Lock()
+
+    def reset_after_fork(self):
+        """Replace the lock in a forked child, it may have been held by another thread of the parent"""
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Take one token, sleep until one is available
+
+        :param timeout: Maximum seconds to wait, raises TimeoutError at once when no token comes free in time
+        """
+        expires = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+            if expires is not None and time.monotonic() + wait > expires:
+                raise TimeoutError('No request token within {:.3f} seconds'.format(timeout))
+            time.sleep(wait)
+
+    def _take(self):
+        with self._lock:
+            if self.path is None:
+                self._tokens, self._stamp, wait = self._refill(self._tokens, self._stamp)
+                return wait
+
+            with open(self.path, 'a+') as state_file:
+                fcntl.flock(state_file, fcntl.LOCK_EX)
+                state_file.seek(0)
+                try:
+                    tokens, stamp = (float(val) for val in state_file.read().split())
+                except ValueError:
+                    tokens, stamp = self.burst, time.time()
+
+                tokens, stamp, wait = self._refill(tokens, stamp)
+
+                state_file.seek(0)
+                state_file.truncate()
+                state_file.write('{} {}'.format(tokens, stamp))
+                return wait
+
+    def _refill(self, tokens, stamp):
+        now = time.time()
+        tokens = min(self.burst, tokens + max(0.0, now - stamp) * self.rate)
+        if tokens >= 1:
+            return tokens - 1, now, 0
+        return tokens, now, (1 - tokens) / self.rate
+
+
+class InFlightLimit(object):
+    """Limit the number of concurrent requests
+
+    With a path every slot is an exclusive lock on a separate file, so the limit is shared by all
+    threads and processes using the same path. Locks are released by the OS if a process dies.
+
+    :param size: Maximum number of requests in flight
+    :param path: Optional path prefix of the slot files to share the limit across processes
+    """
+
+    poll_interval = 0.01
+
+    def __init__(self, size, path=None):
+        if path is not None and fcntl is None:
+            raise NotImplementedError('Sharing a concurrency limit across processes requires fcntl')
+        self.size = size
+        self.path = path
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    def reset_after_fork(self):
+        """Free the slots in a forked child, requests in flight in the parent do not run in the child
+
+        Slots in the shared slot files stay with the parent, which releases them.
+        """
+        self._semaphore = threading.BoundedSemaphore(self.size)
+
+    def acquire(self, timeout=None):
+        """Take a slot, block until one is free. Returns a token for release()
+
+        :param timeout: Maximum seconds to wait, raises TimeoutError when no slot comes free in time
+        """
+        if self.path is None:
+            if not self._semaphore.acquire(timeout=timeout):
+                raise TimeoutError('No request slot within {:.3f} seconds'.format(timeout))
+            return None
+
+        expires = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for slot in range(self.size):
+                fd = os.open('{}.{}'.format(self.path, slot), os.O_CREAT | os.O_RDWR, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+            if expires is not None:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError('No request slot within {:.3f} seconds'.format(timeout))
+                time.sleep(min(self.poll_interval, remaining))
+            else:
+                time.sleep(self.poll_interval)
+
+    def release(self, token):
+        """Free the slot taken by acquire()"""
+        if self.path is None:
+            self._semaphore.release()
+            return
+
+        fcntl.flock(token, fcntl.LOCK_UN)
+        os.close(token)
+
+
+class Rule(object):
+    """Rate and concurrency limit for the requests matching a method and endpoint prefix
+
+    :param method: HTTP method, e.g. GET or POST. None matches every method
+    :param prefix: Endpoint prefix relative to the API root, e.g. /dcim/. None matches every endpoint
+    :param rate: Requests per second, None for no rate limit
+    :param burst: Token bucket size, defaults to max(1, rate)
+    :param max_in_flight: Maximum number of concurrent requests, None for no limit
+    """
+
+    def __init__(self, method=None, prefix=None, rate=None, burst=None, max_in_flight=None):
+        self.method = method.upper() if method else None
+        self.prefix = prefix
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.bucket = None
+        self.in_flight = None
+
+    @property
+    def name(self):
+        """Name of the rule, used for the shared state files"""
+        prefix = re.sub(r'[^A-Za-z0-9]+', '_', (self.prefix or '').strip('/')) or 'all'
+        return '{}-{}'.format(self.method or 'ANY', prefix)
+
+    def matches(self, method, path):
+        """Check if the rule applies to a request"""
+        if self.method is not None and self.method != method.upper():
+            return False
+        return self.prefix is None or path.startswith(self.prefix)
+
+
+class RateLimiter(object):
+    """Client side rate limiter and concurrency governor
+
+    Every rule matching a request applies, so a global rule can be combined with stricter rules
+    for single methods or endpoints. A single RateLimiter can be shared by several connections.
+
+    Example, at most 20 requests per second and 8 in flight, writes to /dcim/ at 5 per second:
+
+        >>> limiter = RateLimiter([Rule(rate=20, max_in_flight=8),
+        ...                        Rule(method='POST', prefix='/dcim/', rate=5)],
+        ...                       lock_dir='/var/lock/netbox')
+
+    :param rules: list of Rule objects or dicts with the Rule arguments
+    :param lock_dir: Optional directory for the state files to share the limits across processes
+    """
+
+    def __init__(self, rules, lock_dir=None):
+        self.rules = [rule if isinstance(rule, Rule) else Rule(**rule) for rule in rules]
+        self.lock_dir = lock_dir
+
+        for rule in self.rules:
+            path = os.path.join(lock_dir, 'netbox-{}'.format(rule.name)) if lock_dir else None
+            if rule.rate is not None:
+                rule.bucket = TokenBucket(rule.rate, rule.burst, path=path + '.bucket' if path else None)
+            if rule.max_in_flight is not None:
+                rule.in_flight = InFlightLimit(rule.max_in_flight, path=path + '.slot' if path else None)
+
+    def reset_after_fork(self):
+        """Reset the in-process locks and slots of all rules, called by the connection in a forked child
+
+        Without a lock_dir the child continues with a copy of the token buckets of the parent, use
+        a lock_dir to share the limits between the processes.
+        """
+        for rule in self.rules:
+            if rule.bucket is not None:
+                rule.bucket.reset_after_fork()
+            if rule.in_flight is not None:
+                rule.in_flight.reset_after_fork()
+
+    @contextmanager
+    def limit(self, method, path, timeout=None):
+        """Wait for every matching rule and hold the concurrency slots while the request runs
+
+        :param method: HTTP method
+        :param path: Endpoint path relative to the API root, e.g. /dcim/devices/
+        :param timeout: Maximum seconds to wait for all rules, e.g. the remaining deadline budget.
+                        Raises DeadlineExceededException as soon as the limits can not be met in time
+        """
+        rules = [rule for rule in self.rules if rule.matches(method, path)]
+        expires = None if timeout is None else time.monotonic() + timeout
+        held = []
+        try:
+            try:
+                # Slots are taken in rule order, which is the same for every request and avoids deadlocks
+                for rule in rules:
+                    if rule.in_flight is not None:
+                        held.append((rule.in_flight, rule.in_flight.acquire(self._remaining(expires))))
+                for rule in rules:
+                    if rule.bucket is not None:
+                        rule.bucket.acquire(self._remaining(expires))
+            except TimeoutError as e:
+                raise exceptions.DeadlineExceededException(
+                    {'detail': 'Deadline exceeded waiting for the rate limit of {} {}: {}'.format(method, path, e)}) from None
+            yield
+        finally:
+            for in_flight, token in reversed(held):
+                in_flight.release(token)
+
+    @staticmethod
+    def _remaining(expires):
+        return None if expires is None else max(0.0, expires - time.monotonic())
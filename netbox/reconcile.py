@@ -0,0 +1,196 @@
+import netbox.exceptions as exceptions
+from netbox import models
+from netbox.models import PendingReference
+from netbox.diff import changed_fields
+
+
+class Plan(object):
+    """The bulk operations needed to bring NetBox into the desired state"""
+
+    def __init__(self):
+        self.creates = {}
+        self.updates = {}
+        self.deletes = {}
+        self.unchanged = {}
+        # Current objects which already are in the desired state, per model
+        self.existing = {}
+
+    def __len__(self):
+        return sum(len(ops) for changes in (self.creates, self.updates, self.deletes) for ops in changes.values())
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return 'Plan({})'.format(self.summary())
+
+    def summary(self):
+        """Return the number of creates, updates, deletes and unchanged objects per model"""
+        names = set(self.creates) | set(self.updates) | set(self.deletes) | set(self.unchanged)
+        return {name: {'create': len(self.creates.get(name, [])),
+                       'update': len(self.updates.get(name, [])),
+                       'delete': len(self.deletes.get(name, [])),
+                       'unchanged': self.unchanged.get(name, 0)} for name in models.dependency_order(names)}
+
+
+class Reconciler(object):
+
+    def __init__(self, netbox_con):
+        self.netbox_con = netbox_con
+
+    def plan(self, desired, scope=None):
+        """Compare the desired state with NetBox and return the minimal set of changes
+
+        Objects are matched on the natural key of their model (e.g. slug for sites, name and site
+        for devices) and only the fields which differ are patched. References to other objects can
+        be given as id, as dict with an id, or as string matched on the lookup field of the
+        referenced model (name, or model for device-types), including objects created by the
+        same plan.
+
+        Example:
+
+            >>> plan = netbox.reconcile.plan({'sites': [{'name': 'site1', 'slug': 'site1'}],
+            ...                               'devices': [{'name': 'device1', 'site': 'site1', 'device_role': 'leaf',
+            ...                                            'device_type': 'qfx5100', 'status': 'active'}]},
+            ...                              scope={'devices': {'site': 'site1'}})
+            >>> netbox.reconcile.apply(plan)
+
+        :param desired: dict mapping a model name (e.g. sites, devices, ip-addresses) to a list of objects
+        :param scope: Optional dict mapping a model name to filter arguments. Objects of these models
+                      which match the filters but are not in the desired state are deleted.
+        :return: Plan
+        """
+        desired = {models.get_model(name).name: [dict(obj) for obj in objects] for name, objects in desired.items()}
+        scope = {models.get_model(name).name: filters for name, filters in (scope or {}).items()}
+        plan = Plan()
+        pending = {name: {obj.get(models.get_model(name).lookup_field) for obj in objects}
+                   for name, objects in desired.items()}
+
+        for name in models.dependency_order(set(desired) | set(scope)):
+            model = models.get_model(name)
+            objects = desired.get(name, [])
+            models.resolve_references(self.netbox_con, model, objects, pending=pending)
+
+            if name in scope:
+                current = list(self.netbox_con.iterate(model.path, **scope[name]))
+            else:
+                current = self._fetch_by_natural_key(model, objects)
+
+            current_by_key = {}
+            for obj in current:
+                current_by_key.setdefault(self.natural_key(model, obj), obj)
+
+            desired_keys = set()
+            for obj in objects:
+                key = self.natural_key(model, obj)
+                desired_keys.add(key)
+
+                if key not in current_by_key:
+                    plan.creates.setdefault(name, []).append(obj)
+                    continue
+
+                changes = changed_fields(current_by_key[key], obj)
+                if changes:
+                    changes['id'] = current_by_key[key]['id']
+                    plan.updates.setdefault(name, []).append(changes)
+                else:
+                    plan.unchanged[name] = plan.unchanged.get(name, 0) + 1
+                    plan.existing.setdefault(name, []).append(current_by_key[key])
+
+            if name in scope:
+                deletes = [obj['id'] for key, obj in current_by_key.items() if key not in desired_keys]
+                if deletes:
+                    plan.deletes[name] = deletes
+
+        return plan
+
+    def apply(self, plan):
+        """Execute a plan with bulk requests
+
+        Creates and updates run in dependency order, deletes in reverse dependency order.
+
+        :param plan: Plan returned by plan()
+        :return: dict with the created and updated objects and the deleted ids per model
+        """
+        resolved = {}
+        result = {'created': {}, 'updated': {}, 'deleted': {}}
+
+        for name in models.dependency_order(plan.creates):
+            model = models.get_model(name)
+            objects = [self._substitute(obj, resolved) for obj in plan.creates[name]]
+            result['created'][name] = self.netbox_con.bulk_post(model.path, objects)
+
+            for obj in result['created'][name]:
+                resolved[PendingReference(name, obj.get(model.lookup_field))] = obj['id']
+
+        for name in models.dependency_order(plan.updates):
+            objects = [self._substitute(obj, resolved) for obj in plan.updates[name]]
+            result['updated'][name] = self.netbox_con.bulk_patch(models.get_model(name).path, objects)
+
+        for name in reversed(models.dependency_order(plan.deletes)):
+            self.netbox_con.bulk_delete(models.get_model(name).path, plan.deletes[name])
+            result['deleted'][name] = plan.deletes[name]
+
+        return result
+
+    def upsert(self, model, objects):
+        """Create the objects which do not exist and update the fields which differ, never delete
+
+        Objects are matched on the natural key of the model with one batched lookup, followed by at
+        most one bulk create and one bulk update (split in bulk_size chunks).
+
+        Example:
+
+            >>> netbox.reconcile.upsert('interfaces', [{'device': 'device1', 'name': 'xe-0/0/0', 'type': '10gbase-x-sfpp'}])
+
+        :param model: Model name or API path, e.g. sites, devices, interfaces or ip-addresses
+        :param objects: list of dicts, references as in plan()
+        :return: list of the created, updated or unchanged netbox objects in the order of objects
+        """
+        model = models.get_model(model)
+        desired = [dict(obj) for obj in objects]
+        models.resolve_references(self.netbox_con, model, desired)
+        plan = self.plan({model.name: desired})
+        result = self.apply(plan)
+
+        by_key = {}
+        for obj in (plan.existing.get(model.name, []) + result['created'].get(model.name, []) +
+                    result['updated'].get(model.name, [])):
+            by_key[self.natural_key(model, obj)] = obj
+
+        return [by_key.get(self.natural_key(model, obj)) for obj in desired]
+
+    @staticmethod
+    def natural_key(model, obj):
+        """Return the natural key of an object, references are reduced to their id"""
+        key = []
+        for field in model.natural_key:
+            value = obj.get(field)
+            if isinstance(value, dict):
+                value = value.get('id', value.get('value'))
+            key.append(value)
+        return tuple(key)
+
+    def _fetch_by_natural_key(self, model, objects):
+        """Fetch the current objects matching the first natural key field of the desired objects"""
+        field = model.natural_key[0]
+        values = {self.natural_key(model, obj)[0] for obj in objects}
+        values = [value for value in values if value is not None and not isinstance(value, PendingReference)]
+
+        if not values:
+            return []
+
+        filter_field = '{}_id'.format(field) if field in model.foreign_keys else field
+        return self.netbox_con.get_batched(model.path, filter_field, values)
+
+    @staticmethod
+    def _substitute(obj, resolved):
+        """Replace pending references with the ids of the objects created before"""
+        result = {}
+        for field, value in obj.items():
+            if isinstance(value, PendingReference):
+                if value not in resolved:
+                    raise exceptions.NotFoundException({"detail": "{}: {}".format(value.model, value.value)})
+                value = resolved[value]
+            result[field] = value
+        return result
@@ -0,0 +1,50 @@
+import threading
+import time
+
+
+class ReplicaSet(object):
+    """Round robin over read replicas which skips replicas that failed recently
+
+    A failed replica gets no requests for retry_interval seconds, after that it is tried again.
+
+    :param urls: API root urls of the replicas, e.g. https://netbox-ro1.example.com/api
+    :param retry_interval: Seconds a failed replica is skipped
+    """
+
+    def __init__(self, urls, retry_interval=30):
+        self.urls = list(urls)
+        self.retry_interval = retry_interval
+        self._down = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def choose(self):
+        """Return the url of the next healthy replica, None when all replicas are down"""
+        with self._lock:
+            now = time.monotonic()
+            for _ in range(len(self.urls)):
+                url = self.urls[self._next % len(self.urls)]
+                self._next += 1
+                if self._down.get(url, 0) <= now:
+                    return url
+        return None
+
+    def mark_down(self, url):
+        """Skip a replica for retry_interval seconds"""
+        with self._lock:
+            self._down[url] = time.monotonic() + self.retry_interval
+
+    def mark_up(self, url):
+        """Use a replica again"""
+        with self._lock:
+            self._down.pop(url, None)
+
+    def healthy(self):
+        """Return the urls of the replicas which are not skipped"""
+        now = time.monotonic()
+        with self._lock:
+            return [url for url in self.urls if self._down.get(url, 0) <= now]
+
+    def reset_after_fork(self):
+        """Replace the lock in a forked child, it may have been held by another thread of the parent"""
+        self._lock = threading.Lock()
@@ -0,0 +1,307 @@
+import json
+import os
+import re
+import threading
+import urllib.parse
+import netbox.exceptions as exceptions
+from netbox import models
+from netbox.endpoint import Endpoint
+from netbox.status import Status
+
+# Query parameters every list endpoint accepts, they are not all listed in the schema
+COMMON_PARAMETERS = {'limit', 'offset', 'ordering', 'q', 'brief', 'export', 'fields', 'format'}
+
+# Fields a plain string reference is matched on, in order of preference
+LOOKUP_FIELDS = ('name', 'model', 'cid', 'address', 'prefix', 'label')
+
+
+def default_cache_dir():
+    """Directory the schemas are cached in, $XDG_CACHE_HOME/python-netbox or ~/.cache/python-netbox"""
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                        'python-netbox')
+
+
+class Schema(object):
+    """OpenAPI schema of a NetBox instance, loaded on first use and cached on disk per NetBox version
+
+    The schema is read from /api/schema/ (NetBox 3.x and later) or /api/docs/?format=openapi
+    (NetBox 2.x). The file is cached in cache_dir under the host and the netbox-version of
+    /api/status/, so an upgrade of the server loads the new schema and every other start
+    only requests the status.
+
+    :param netbox_con: NetboxConnection
+    :param cache_dir: Directory of the cached schemas, None uses default_cache_dir(), False disables the disk cache
+    """
+
+    def __init__(self, netbox_con, cache_dir=None):
+        self.netbox_con = netbox_con
+        self.cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+        self.version = None
+        self._document = None
+        self._paths = None
+        self._lock = threading.Lock()
+
+    @property
+    def document(self):
+        """The OpenAPI document as dict"""
+        self.load()
+        return self._document
+
+    @property
+    def loaded(self):
+        """True when the schema was loaded, reading it does not cost a request"""
+        return self._document is not None
+
+    def load(self, refresh=False):
+        """Load the schema from the disk cache or from the server
+
+        :param refresh: Ignore the disk cache and request the schema from the server
+        :return: Schema
+        """
+        with self._lock:
+            if self._document is not None and not refresh:
+                return self
+
+            self.version = str(Status(self.netbox_con).get_status().get('netbox-version', 'unknown'))
+            cache_file = self.cache_file()
+            document = None
+            if cache_file and not refresh:
+                try:
+                    with open(cache_file) as f:
+                        document = json.load(f)
+                except (OSError, ValueError):
+                    document = None
+
+            if document is None:
+                try:
+                    document = self.netbox_con.get_document('/schema/', format='json')
+                except exceptions.NotFoundException:
+                    document = self.netbox_con.get_document('/docs/', format='openapi')
+                if cache_file:
+                    self._store(cache_file, document)
+
+            self._document = document
+            self._paths = self._index(document)
+        return self
+
+    def cache_file(self):
+        """Path of the cached schema of this host and version, None without disk cache"""
+        if not self.cache_dir:
+            return None
+        key = re.sub(r'[^\w.-]', '_', '{}-{}-{}'.format(self.netbox_con.host, self.netbox_con.port or '',
+                                                        self.version))
+        return os.path.join(self.cache_dir, 'schema-{}.json'.format(key))
+
+    @staticmethod
+    def _store(cache_file, document):
+        """Write the schema through a temporary file, so concurrent processes never read half a file"""
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+            with open(tmp_file, 'w') as f:
+                json.dump(document, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+    def _index(self, document):
+        """Map the API paths (e.g. /dcim/sites/) to their operations, without the api prefix"""
+        prefixes = [urllib.parse.urlsplit(self.netbox_con.base_url).path.rstrip('/'),
+                    document.get('basePath', '').rstrip('/')]
+        paths = {}
+        for path, operations in document.get('paths', {}).items():
+            for prefix in prefixes:
+                if prefix and path.startswith(prefix + '/'):
+                    path = path[len(prefix):]
+                    break
+            paths[path] = operations
+        return paths
+
+    def _resolve(self, schema):
+        """Follow a $ref, e.g. #/components/schemas/WritableSiteRequest"""
+        while isinstance(schema, dict) and '$ref' in schema:
+            target = self._document
+            for part in schema_ref_parts(schema):
+                target = target[part]
+            schema = target
+        return schema or {}
+
+    def endpoints(self):
+        """Return the list endpoints of the API, e.g. /dcim/cables/"""
+        self.load()
+        return sorted(path for path, operations in self._paths.items() if '{' not in path and 'get' in operations)
+
+    def filters(self, param):
+        """Return the filters of a list endpoint, None if the schema does not describe it"""
+        operation = self._operation(param, 'get')
+        if operation is None:
+            return None
+        return {parameter['name'] for parameter in self._parameters(operation) if parameter.get('in') == 'query'}
+
+    def fields(self, param):
+        """Return the writable fields and the required fields of an endpoint
+
+        :return: tuple (set of fields, list of required fields), None if the schema does not describe it
+        """
+        operation = self._operation(param, 'post')
+        if operation is None:
+            return None
+
+        if 'requestBody' in operation:
+            content = self._resolve(operation['requestBody']).get('content', {})
+            body = next(iter(content.values()), {}).get('schema', {})
+        else:
+            body = next((parameter.get('schema', {}) for parameter in self._parameters(operation)
+                         if parameter.get('in') == 'body'), {})
+        return self._properties(body)
+
+    def columns(self, param, depth=3):
+        """Return the flattened columns of the objects of a list endpoint, e.g. id, site.id, site.name
+
+        Nested objects are expanded into dotted columns up to depth levels, the columns of a
+        nested object are listed even when it is null. Lists and objects without declared
+        properties (e.g. custom_fields) are single columns.
+
+        :return: list of columns, None if the schema does not describe the response of the endpoint
+        """
+        operation = self._operation(param, 'get')
+        if operation is None:
+            return None
+
+        response = self._resolve(operation.get('responses', {}).get('200', {}))
+        if 'content' in response:
+            body = next(iter(response['content'].values()), {}).get('schema', {})
+        else:
+            body = response.get('schema', {})
+
+        properties = self._object_properties(body)
+        if 'results' in properties:
+            properties = self._object_properties(self._resolve(properties['results']).get('items', {}))
+        if not properties:
+            return None
+        return self._flat_columns(properties, '', depth)
+
+    def _flat_columns(self, properties, prefix, depth):
+        columns = []
+        for name, prop in properties.items():
+            column = '{}{}'.format(prefix, name)
+            nested = self._object_properties(prop) if depth > 1 else {}
+            if nested:
+                columns.extend(self._flat_columns(nested, '{}.'.format(column), depth - 1))
+            else:
+                columns.append(column)
+        return columns
+
+    def _object_properties(self, schema):
+        """Return the properties of an object schema, merged over allOf/oneOf/anyOf (used for nullable references)"""
+        schema = self._resolve(schema)
+        if schema.get('type') == 'array' or 'items' in schema:
+            return {}
+        properties = dict(schema.get('properties', {}))
+        for key in ('allOf', 'oneOf', 'anyOf'):
+            for sub_schema in schema.get(key, []):
+                properties.update(self._object_properties(sub_schema))
+        return properties
+
+    def _operation(self, param, method):
+        self.load()
+        operations = self._paths.get('/{}/'.format(param.strip('/')))
+        if not operations:
+            return None
+        return operations.get(method)
+
+    def _parameters(self, operation):
+        return [self._resolve(parameter) for parameter in operation.get('parameters', [])]
+
+    def _properties(self, schema):
+        """Collect the properties of an object schema, following references, arrays and combinations"""
+        schema = self._resolve(schema)
+        if 'items' in schema:
+            return self._properties(schema['items'])
+
+        fields = {name for name, prop in schema.get('properties', {}).items()
+                  if not self._resolve(prop).get('readOnly')}
+        required = [name for name in schema.get('required', []) if name in fields]
+        for key in ('allOf', 'oneOf', 'anyOf'):
+            for sub_schema in schema.get(key, []):
+                sub_fields, sub_required = self._properties(sub_schema)
+                fields |= sub_fields
+                if key == 'allOf':
+                    required.extend(sub_required)
+        return fields, required
+
+    def validate_filters(self, param, filters):
+        """Raise ClientException for a filter the endpoint does not accept, instead of a 400 from the server
+
+        Endpoints the schema does not describe and custom field filters (cf_*) are not checked.
+        """
+        if not filters:
+            return
+        known = self.filters(param)
+        if not known:
+            return
+
+        unknown = sorted(key for key in filters if key not in known and key not in COMMON_PARAMETERS
+                         and not key.startswith('cf_'))
+        if unknown:
+            raise exceptions.ClientException({"detail": "Unknown filter for {}: {}".format(param, ', '.join(unknown))})
+
+    def validate_fields(self, param, objects, partial=False):
+        """Raise ClientException for an unknown field or, unless partial, a missing required field
+
+        :param param: API endpoint
+        :param objects: list of request bodies
+        :param partial: True for updates, which only hold the changed fields and the id
+        """
+        fields = self.fields(param)
+        if fields is None or not fields[0]:
+            return
+
+        known, required = fields
+        for obj in objects:
+            unknown = sorted(key for key in obj if key not in known and not (partial and key == 'id'))
+            if unknown:
+                raise exceptions.ClientException({"detail": "Unknown field for {}: {}".format(
+                    param, ', '.join(unknown))})
+            missing = [] if partial else [field for field in required if field not in obj]
+            if missing:
+                raise exceptions.ClientException({"detail": "Missing field for {}: {}".format(
+                    param, ', '.join(missing))})
+
+    def endpoint(self, param):
+        """Return an Endpoint for any list endpoint of the API, also those without a helper
+
+        Models known to the models registry keep their declaration, others are declared from
+        the schema, with their lookup field taken from LOOKUP_FIELDS and the required fields of
+        the schema.
+
+        Example:
+
+            >>> netbox.schema.endpoint('dcim/console-ports').list(device='leaf1')
+
+        :param param: API endpoint, e.g. dcim/console-ports or /dcim/console-ports/
+        :return: Endpoint
+        """
+        try:
+            return Endpoint(self.netbox_con, models.get_model(param))
+        except KeyError:
+            pass
+
+        path = '/{}/'.format(param.strip('/'))
+        if path not in self.endpoints():
+            raise exceptions.NotFoundException({"detail": "Unknown endpoint: {}".format(path)})
+
+        known, required = self.fields(path) or (set(), [])
+        lookup_field = next((field for field in LOOKUP_FIELDS if field in known), 'id')
+        return Endpoint(self.netbox_con, models.Model(path.strip('/').split('/')[-1], path, (lookup_field,),
+                                                      lookup_field=lookup_field, required=tuple(required)))
+
+    def reset_after_fork(self):
+        """Replace the lock in a forked child, it may have been held by another thread of the parent"""
+        self._lock = threading.Lock()
+
+
+def schema_ref_parts(ref):
+    """Split a reference like {'$ref': '#/components/schemas/Site'} into its keys"""
+    return [urllib.parse.unquote(part).replace('~1', '/').replace('~0', '~')
+            for part in ref['$ref'].lstrip('#').strip('/').split('/')]
@@ -0,0 +1,130 @@
+import netbox.exceptions as exceptions
+from netbox import models
+
+CHANGELOG = '/extras/object-changes/'
+
+
+def content_type(param):
+    """Return the content type the change log uses for an endpoint, e.g. /ipam/ip-addresses/ -> ipam.ipaddress"""
+    path = '/{}/'.format(param.strip('/'))
+    try:
+        label = models.get_model(path).label
+    except KeyError:
+        name = path.strip('/').split('/')[-1]
+        label = name[:-2] if name.endswith(('sses', 'xes')) else name[:-1]
+    return '{}.{}'.format(path.strip('/').split('/')[0], label.replace('-', ''))
+
+
+def latest_change_id(netbox_con):
+    """Return the id of the newest entry of the change log, 0 when it is empty"""
+    latest = next(netbox_con.iterate(CHANGELOG, limit=1, ordering='-id'), None)
+    return latest['id'] if latest is not None else 0
+
+
+def changes_since(netbox_con, change_id):
+    """Return the change log entries newer than change_id, oldest first"""
+    return sorted(netbox_con.iterate(CHANGELOG, id__gt=change_id), key=lambda change: change['id'])
+
+
+def changed_ids(changes, params):
+    """Map every endpoint to the ids of its objects which appear in the changes
+
+    :param changes: Change log entries
+    :param params: API endpoints
+    :return: dict mapping the endpoint to a set of object ids
+    """
+    endpoints = {}
+    for param in params:
+        path = '/{}/'.format(param.strip('/'))
+        endpoints[content_type(path)] = path
+        endpoints[path] = path
+
+    ids = {}
+    for change in changes:
+        path = endpoints.get(change.get('changed_object_type'))
+        if path is not None:
+            ids.setdefault(path, set()).add(change['changed_object_id'])
+    return ids
+
+
+class SnapshotData(dict):
+    """Objects of a snapshot per endpoint, change_id is the newest change log entry they include"""
+
+    def __init__(self, objects, change_id):
+        super().__init__(objects)
+        self.change_id = change_id
+
+
+class Snapshot(object):
+
+    def __init__(self, netbox_con):
+        self.netbox_con = netbox_con
+
+    def take(self, endpoints, max_rounds=3):
+        """Read several endpoints concurrently and repair the rows changed while reading
+
+        The newest change log entry is noted before the reads start. After all endpoints are
+        read, the change log is checked for changes to objects of these endpoints made during
+        the reads. Those objects are read again, and deleted objects and objects which no longer
+        match the filters are dropped, so the result shows every endpoint as it was at the same
+        moment. This repeats until a check finds no new changes, at most max_rounds times.
+
+        Example:
+
+            >>> data = netbox.snapshot.take({'devices': {'site': 'ams1'}, 'interfaces': {'site': 'ams1'},
+            ...                              'ip-addresses': {}, 'cables': {}, 'vlans': {}})
+            >>> data['interfaces']
+
+        :param endpoints: list of model names or API endpoints, or dict mapping them to filter arguments
+        :param max_rounds: Maximum number of re-reads, raises GetException when changes keep coming in
+        :return: SnapshotData, a dict mapping every given endpoint to its list of objects
+        """
+        if not isinstance(endpoints, dict):
+            endpoints = {name: {} for name in endpoints}
+        paths = {name: self._path(name) for name in endpoints}
+
+        change_id = latest_change_id(self.netbox_con)
+        results = self.netbox_con.run_parallel([(self._read, (paths[name], filters), {})
+                                                for name, filters in endpoints.items()])
+        objects = dict(zip(endpoints, results))
+
+        for rounds in range(max_rounds + 1):
+            changes = changes_since(self.netbox_con, change_id)
+            if changes:
+                change_id = changes[-1]['id']
+            changed = changed_ids(changes, paths.values())
+            if not changed:
+                return SnapshotData(objects, change_id)
+            if rounds == max_rounds:
+                break
+
+            names = [name for name in endpoints if paths[name] in changed]
+            results = self.netbox_con.run_parallel([(self.netbox_con.get_batched,
+                                                     (paths[name], 'id', sorted(changed[paths[name]])),
+                                                     endpoints[name]) for name in names])
+            for name, current in zip(names, results):
+                objects[name] = self._replace(objects[name], changed[paths[name]], current)
+
+        raise exceptions.GetException({"detail": "Objects kept changing during {} snapshot rounds".format(max_rounds)})
+
+    @staticmethod
+    def _path(name):
+        try:
+            return models.get_model(name).path
+        except KeyError:
+            return '/{}/'.format(name.strip('/'))
+
+    @staticmethod
+    def _replace(objects, stale, current):
+        """Swap the stale objects for their current version, keeping the order of the first read
+
+        Stale objects which were not read again are deleted or no longer match the filters,
+        objects which were created during the reads are appended.
+        """
+        current = {obj['id']: obj for obj in current}
+        replaced = [current.pop(obj['id']) if obj['id'] in current else obj for obj in objects
+                    if obj['id'] not in stale or obj['id'] in current]
+        return replaced + list(current.values())
+
+    def _read(self, path, filters):
+        return list(self.netbox_con.iterate(path, **filters))
@@ -1,10 +1,12 @@
-import netbox.exceptions as exceptions
+from netbox.endpoint import Endpoint
 
 
 class Tenancy(object):
 
     def __init__(self, netbox_con):
         self.netbox_con = netbox_con
+        self.tenant_groups = Endpoint(netbox_con, 'tenant-groups')
+        self.tenants = Endpoint(netbox_con, 'tenants')
 
     def get_choices(self, choice_id=None):
         """Return choices for all fields if choice_id is not defined
@@ -15,7 +17,11 @@ class Tenancy(object):
 
     def get_tenants(self, **kwargs):
         """Returns the tenants"""
-        return self.netbox_con.get('/tenancy/tenants/', **kwargs)
+        return self.tenants.list(**kwargs)
+
+    def count_tenants(self, **kwargs):
+        """Returns the number of tenants matching the filters"""
+        return self.tenants.count(**kwargs)
     
     def get_contacts(self, **kwargs):
         """Returns the contacts"""
@@ -37,8 +43,7 @@ class Tenancy(object):
         :param kwargs: optional fields
         :return: netbox object if successful otherwise exception raised
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/tenancy/tenants/', required_fields, **kwargs)
+        return self.tenants.create(name, slug, **kwargs)
     
     def create_contact(self, name: str, **kwargs):
         """Create a new contact
@@ -72,11 +77,7 @@ class Tenancy(object):
         :param tenant_name: Tenant to delete
         :return: bool True if succesful otherwise delete exception
         """
-        try:
-            tenant_id = self.get_tenants(name=tenant_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "tenant: {}".format(tenant_name)}) from None
-        return self.netbox_con.delete('/tenancy/tenants/', tenant_id)
+        return self.tenants.delete(tenant_name)
 
     def delete_tenant_by_id(self, tenant_id):
         """Delete tenant
@@ -84,7 +85,7 @@ class Tenancy(object):
         :param tenant_id: Tenant to delete
         :return: bool True if succesful otherwise delete exception
         """
-        return self.netbox_con.delete('/tenancy/tenants/', tenant_id)
+        return self.tenants.delete_by_id(tenant_id)
 
     def update_tenant(self, tenant_name, **kwargs):
         """Update tenant
@@ -93,11 +94,7 @@ class Tenancy(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            tenant_id = self.get_tenants(name=tenant_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "tenant: {}".format(tenant_name)}) from None
-        return self.netbox_con.patch('/tenancy/tenants/', tenant_id, **kwargs)
+        return self.tenants.update(tenant_name, **kwargs)
 
     def update_tenant_by_id(self, tenant_id, **kwargs):
         """Update tenant
@@ -106,11 +103,11 @@ class Tenancy(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/tenancy/tenants/', tenant_id, **kwargs)
+        return self.tenants.update_by_id(tenant_id, **kwargs)
 
     def get_tenant_groups(self, **kwargs):
         """Returns the tenant groups"""
-        return self.netbox_con.get('/tenancy/tenant-groups/', **kwargs)
+        return self.tenant_groups.list(**kwargs)
 
     def create_tenant_group(self, name, slug, **kwargs):
         """Create a new tenant-group
@@ -120,8 +117,7 @@ class Tenancy(object):
         :param kwargs: optional fields
         :return: netbox object if successful otherwise exception raised
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/tenancy/tenant-groups/', required_fields, **kwargs)
+        return self.tenant_groups.create(name, slug, **kwargs)
 
     def delete_tenant_group(self, tenant_group_name):
         """Delete tenant
@@ -129,11 +125,7 @@ class Tenancy(object):
         :param tenant_group_name: Tenant group to delete
         :return: bool True if succesful otherwise delete exception
         """
-        try:
-            tenant_group_id = self.get_tenant_groups(name=tenant_group_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "tenant: {}".format(tenant_group_name)}) from None
-        return self.netbox_con.delete('/tenancy/tenant-groups/', tenant_group_id)
+        return self.tenant_groups.delete(tenant_group_name)
 
     def delete_tenant_group_id(self, tenant_group_id):
         """Delete tenant
@@ -141,7 +133,7 @@ class Tenancy(object):
         :param tenant_group_id: Tenant group to delete
         :return: bool True if succesful otherwise delete exception
         """
-        return self.netbox_con.delete('/tenancy/tenant-groups/', tenant_group_id)
+        return self.tenant_groups.delete_by_id(tenant_group_id)
 
     def update_tenant_group(self, tenant_group_name, **kwargs):
         """Update tenant group
@@ -150,11 +142,7 @@ class Tenancy(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            tenant_group_id = self.get_tenant_groups(name=tenant_group_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail:": "tenant-group: {}".format(tenant_group_name)}) from None
-        return self.netbox_con.patch('/tenancy/tenant-groups/', tenant_group_id, **kwargs)
+        return self.tenant_groups.update(tenant_group_name, **kwargs)
 
     def update_tenant_group_by_id(self, tenant_group_id, **kwargs):
         """Update tenant group
@@ -163,4 +151,4 @@ class Tenancy(object):
         :param kwargs: requests body dict
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/tenancy/tenant-groups/', tenant_group_id, **kwargs)
+        return self.tenant_groups.update_by_id(tenant_group_id, **kwargs)
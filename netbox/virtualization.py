@@ -1,10 +1,15 @@
 import netbox.exceptions as exceptions
+from netbox.endpoint import Endpoint
 
 
 class Virtualization(object):
 
     def __init__(self, netbox_con):
         self.netbox_con = netbox_con
+        self.cluster_types = Endpoint(netbox_con, 'cluster-types')
+        self.clusters = Endpoint(netbox_con, 'clusters')
+        self.virtual_machines = Endpoint(netbox_con, 'virtual-machines')
+        self.interfaces = Endpoint(netbox_con, 'vm-interfaces')
 
     def get_choices(self, choice_id=None):
         """Return choices for all fields if choice_id is not defined
@@ -15,7 +20,7 @@ class Virtualization(object):
 
     def get_clusters(self, **kwargs):
         """Return all clusters"""
-        return self.netbox_con.get('/virtualization/clusters/', **kwargs)
+        return self.clusters.list(**kwargs)
 
     def create_cluster(self, name, type, **kwargs):
         """Create a new cluster
@@ -25,13 +30,7 @@ class Virtualization(object):
         :param kwargs: optional arguments
         :return: netbox object if successful otherwise exception raised
         """
-        try:
-            cluster_type_id = self.get_cluster_types(name=type)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "cluster-type: {}".format(name)}) from None
-
-        required_fields = {"name": name, "type": cluster_type_id}
-        return self.netbox_con.post('/virtualization/clusters/', required_fields, **kwargs)
+        return self.clusters.create(name, type, **kwargs)
 
     def delete_cluster(self, name):
         """Delete a cluster
@@ -39,11 +38,7 @@ class Virtualization(object):
         :param name: name of the cluster to delete
         :return: netbox object if succesful otherwise delete exception
         """
-        try:
-            cluster_id = self.get_clusters(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "cluster {}".format(name)}) from None
-        return self.netbox_con.delete('/virtualization/clusters/', cluster_id)
+        return self.clusters.delete(name)
 
     def delete_cluster_by_id(self, cluster_id):
         """Delete a cluster
@@ -51,7 +46,7 @@ class Virtualization(object):
         :param cluster_id: cluster to delete
         :return: netbox object if succesful otherwise delete exception
         """
-        return self.netbox_con.delete('/virtualization/clusters/', cluster_id)
+        return self.clusters.delete_by_id(cluster_id)
 
     def update_cluster(self, name, **kwargs):
         """Update cluster
@@ -60,11 +55,7 @@ class Virtualization(object):
         :param name: cluster name to update
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            cluster_id = self.get_clusters(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "cluster: {}".format(name)}) from None
-        return self.netbox_con.patch('/virtualization/clusters/', cluster_id, **kwargs)
+        return self.clusters.update(name, **kwargs)
 
     def update_cluster_by_id(self, cluster_id, **kwargs):
         """Update cluster
@@ -73,11 +64,11 @@ class Virtualization(object):
         :param cluster_id: cluster to update
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/virtualization/clusters/', cluster_id, **kwargs)
+        return self.clusters.update_by_id(cluster_id, **kwargs)
 
     def get_cluster_types(self, **kwargs):
         """Return all cluster types"""
-        return self.netbox_con.get('/virtualization/cluster-types/', **kwargs)
+        return self.cluster_types.list(**kwargs)
 
     def create_cluster_type(self, name, slug):
         """Create a new cluster type
@@ -86,8 +77,7 @@ class Virtualization(object):
         :param slug: slug name
         :return:  netbox object if successful otherwise create exception
         """
-        required_fields = {"name": name, "slug": slug}
-        return self.netbox_con.post('/virtualization/cluster-types/', required_fields)
+        return self.cluster_types.create(name, slug)
 
     def update_cluster_type(self, name, **kwargs):
         """Update cluster type
@@ -96,11 +86,7 @@ class Virtualization(object):
         :param kwargs: fields to update
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            type_id = self.get_cluster_types(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "cluster-type: {}".format(name)}) from None
-        return self.netbox_con.patch('/virtualization/cluster-types/', type_id, **kwargs)
+        return self.cluster_types.update(name, **kwargs)
 
     def update_cluster_type_by_id(self, cluster_type_id, **kwargs):
         """Update cluster type
@@ -109,7 +95,7 @@ class Virtualization(object):
         :param kwargs: fields to update
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/virtualization/cluster-types/', cluster_type_id, **kwargs)
+        return self.cluster_types.update_by_id(cluster_type_id, **kwargs)
 
     def delete_cluster_type(self, name):
         """Delete a cluster type
@@ -117,11 +103,7 @@ class Virtualization(object):
         :param name: name of the cluster type to delete
         :return: bool True if succesful otherwise delete exception
         """
-        try:
-            cluster_type_id = self.get_cluster_types(name=name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "cluster-type: {}".format(name)}) from None
-        return self.netbox_con.delete('/virtualization/cluster-types/', cluster_type_id)
+        return self.cluster_types.delete(name)
 
     def delete_cluster_type_by_id(self, cluster_type_id):
         """Delete a cluster type
@@ -129,15 +111,15 @@ class Virtualization(object):
         :param cluster_type_id: cluster type to delete
         :return: bool True if succesful otherwise delete exception
         """
-        return self.netbox_con.delete('/virtualization/cluster-types/', cluster_type_id)
+        return self.cluster_types.delete_by_id(cluster_type_id)
 
     def get_interfaces(self, **kwargs):
         """Return all interfaces"""
-        return self.netbox_con.get('/virtualization/interfaces/', **kwargs)
+        return self.interfaces.list(**kwargs)
 
     def get_interface(self, **kwargs):
         """Return interface by filter"""
-        return self.netbox_con.get('/virtualization/interfaces/', **kwargs)
+        return self.interfaces.list(**kwargs)
 
     def create_interface(self, name, virtual_machine, **kwargs):
         """Create an interface for a virtual machine
@@ -146,12 +128,7 @@ class Virtualization(object):
         :param virtual_machine: name of virtual machine to attach interface
         :return: netbox object if successful otherwise raise CreateException
         """
-        try:
-            virtual_machine_id = self.get_virtual_machine(name=virtual_machine)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "virtual-machine: {}".format(virtual_machine)}) from None
-        required_fields = {"name": name, "virtual_machine": virtual_machine_id}
-        return self.netbox_con.post('/virtualization/interfaces/', required_fields, **kwargs)
+        return self.interfaces.create(name, virtual_machine, **kwargs)
 
     def update_interface(self, name, virtual_machine, **kwargs):
         """Update virtual_machine interface
@@ -166,7 +143,7 @@ class Virtualization(object):
         except IndexError:
             raise exceptions.NotFoundException({"detail": "interface: {} or virtual_machine: {}"
                                                .format(name, virtual_machine)}) from None
-        return self.netbox_con.patch('/virtualization/interfaces/', interface_id, **kwargs)
+        return self.interfaces.update_by_id(interface_id, **kwargs)
 
     def update_interface_by_id(self, interface_id, **kwargs):
         """Update virtual_machine interface
@@ -175,7 +152,7 @@ class Virtualization(object):
         :param kwargs: update data
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/virtualization/interfaces/', interface_id, **kwargs)
+        return self.interfaces.update_by_id(interface_id, **kwargs)
 
     def delete_interface(self, name, virtual_machine):
         """Delete interface from virtual_machine
@@ -190,7 +167,7 @@ class Virtualization(object):
             raise exceptions.NotFoundException({"detail": "interface: {} or virtual_machine {}"
                                                .format(name, virtual_machine)}) from None
 
-        return self.netbox_con.delete('/virtualization/interfaces/', interface_id)
+        return self.interfaces.delete_by_id(interface_id)
 
     def delete_interface_by_id(self, interface_id):
         """Delete interface from virtual_machine
@@ -198,15 +175,19 @@ class Virtualization(object):
         :param interface_id: interface to delete
         :return: bool True if successful otherwise raise DeleteException
         """
-        return self.netbox_con.delete('/virtualization/interfaces/', interface_id)
+        return self.interfaces.delete_by_id(interface_id)
 
     def get_virtual_machines(self, **kwargs):
         """Return all virtual-machines"""
-        return self.netbox_con.get('/virtualization/virtual-machines/', **kwargs)
+        return self.virtual_machines.list(**kwargs)
+
+    def count_virtual_machines(self, **kwargs):
+        """Returns the number of virtual-machines matching the filters"""
+        return self.virtual_machines.count(**kwargs)
 
     def get_virtual_machine(self, **kwargs):
         """Return virtual-machine based on filter"""
-        return self.netbox_con.get('/virtualization/virtual-machines/', **kwargs)
+        return self.virtual_machines.list(**kwargs)
 
     def create_virtual_machine(self, name, cluster_name, **kwargs):
         """Create a virtual machine
@@ -215,13 +196,7 @@ class Virtualization(object):
         :param cluster_name: Name of existing cluster
         :return: netbox object if successful otherwise raise CreateException
         """
-        try:
-            cluster_id = self.get_clusters(name=cluster_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "cluster-name: {}".format(cluster_name)}) from None
-
-        required_fields = {"name": name, "cluster": cluster_id}
-        return self.netbox_con.post('/virtualization/virtual-machines/', required_fields, **kwargs)
+        return self.virtual_machines.create(name, cluster_name, **kwargs)
 
     def delete_virtual_machine(self, virtual_machine_name):
         """Delete virtual machine
@@ -229,11 +204,7 @@ class Virtualization(object):
         :param virtual_machine_name: name of the virtual machine to delete
         :return: bool True if successful otherwise raise exception
         """
-        try:
-            virtual_machine_id = self.get_virtual_machines(name=virtual_machine_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "virtual-machine: {}".format(virtual_machine_name)}) from None
-        return self.netbox_con.delete('/virtualization/virtual-machines/', virtual_machine_id)
+        return self.virtual_machines.delete(virtual_machine_name)
 
     def delete_virtual_machine_by_id(self, virtual_machine_id):
         """Delete virtual machine
@@ -241,7 +212,7 @@ class Virtualization(object):
         :param virtual_machine_id: virtual machine to delete
         :return: bool True if successful otherwise raise exception
         """
-        return self.netbox_con.delete('/virtualization/virtual-machines/', virtual_machine_id)
+        return self.virtual_machines.delete_by_id(virtual_machine_id)
 
     def update_virtual_machine(self, virtual_machine_name, **kwargs):
         """Update virtual-machine
@@ -250,12 +221,7 @@ class Virtualization(object):
         :param kwargs: update data
         :return: bool True if successful otherwise raise UpdateException
         """
-        try:
-            virtual_machine_id = self.get_virtual_machines(name=virtual_machine_name)[0]['id']
-        except IndexError:
-            raise exceptions.NotFoundException({"detail": "virtual-machine: {}"
-                                               .format(virtual_machine_name)}) from None
-        return self.netbox_con.patch('/virtualization/virtual-machines/', virtual_machine_id, **kwargs)
+        return self.virtual_machines.update(virtual_machine_name, **kwargs)
 
     def update_virtual_machine_by_id(self, virtual_machine_id, **kwargs):
         """Update virtual-machine
@@ -264,4 +230,4 @@ class Virtualization(object):
         :param kwargs: update data
         :return: bool True if successful otherwise raise UpdateException
         """
-        return self.netbox_con.patch('/virtualization/virtual-machines/', virtual_machine_id, **kwargs)
+        return self.virtual_machines.update_by_id(virtual_machine_id, **kwargs)
@@ -0,0 +1,127 @@
+import gzip
+import json
+import os
+import time
+from netbox.query import Query
+from netbox.snapshot import changed_ids, changes_since, latest_change_id
+from netbox.status import Status
+
+# First bytes of a cache file, the number is raised when the format changes
+MAGIC = b'NBWARM1\n'
+
+
+class WarmStart(object):
+    """Save the caches of a connection to a file and load them on the next start
+
+    The id cache (name to id lookups), the response cache (get() results, e.g. choices and
+    tags) and optionally Query datasets are written as gzip compressed json. On load the file
+    is only used when it is younger than max_age and was written for the same server and
+    NetBox version. Objects changed since the file was written, according to the change log
+    (/extras/object-changes/), are dropped from the caches and read again for the datasets.
+    The caches need cache_max_age on the connection.
+
+    Example, in a job which runs every few minutes:
+
+        >>> netbox = NetBox(host='127.0.0.1', auth_token='token', cache_max_age=600)
+        >>> datasets = netbox.warm_start.load('/var/cache/netbox-job.cache') or {}
+        >>> devices = datasets.get('devices') or netbox.dcim.devices.query(site='ams1')
+        >>> ...
+        >>> netbox.warm_start.save('/var/cache/netbox-job.cache', datasets={'devices': devices})
+
+    :param netbox_con: NetboxConnection
+    """
+
+    def __init__(self, netbox_con):
+        self.netbox_con = netbox_con
+        self.change_id = None
+
+    def save(self, filename, datasets=None):
+        """Write the caches and datasets to a file
+
+        The caches are recorded as current up to the change log entry seen by load(), so call
+        load() at the start of every run, also when there is no file yet. Without it the newest
+        change log entry at save time is used, and changes made during the run by others are
+        not noticed on the next load.
+
+        :param filename: Path of the cache file, replaced atomically
+        :param datasets: Optional dict mapping a name to a Query, e.g. from Endpoint.query()
+        """
+        change_id = self.change_id if self.change_id is not None else latest_change_id(self.netbox_con)
+        data = {
+            'base_url': self.netbox_con.base_url,
+            'version': self._version(),
+            'saved': time.time(),
+            'change_id': change_id,
+            'ids': self.netbox_con.id_cache.dump() if self.netbox_con.id_cache is not None else [],
+            'responses': self.netbox_con.response_cache.dump() if self.netbox_con.response_cache is not None else [],
+            'datasets': {name: {'param': query.param, 'filters': query.filters, 'objects': list(query)}
+                         for name, query in (datasets or {}).items()},
+        }
+
+        tmp_file = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(tmp_file, 'wb') as f:
+            f.write(MAGIC)
+            f.write(gzip.compress(json.dumps(data, separators=(',', ':')).encode('utf-8')))
+        os.replace(tmp_file, filename)
+
+    def load(self, filename, max_age=86400):
+        """Fill the caches from a file written by save(), if it is still valid
+
+        :param filename: Path of the cache file
+        :param max_age: Seconds after which a file is not used, keep it below the change log retention
+        :return: dict mapping the dataset names to a Query attached to the connection, None when the
+                 file is missing, too old or from another server or NetBox version
+        """
+        self.change_id = latest_change_id(self.netbox_con)
+        data = self._read(filename)
+        if data is None or data.get('base_url') != self.netbox_con.base_url:
+            return None
+        if time.time() - data['saved'] > max_age or data['version'] != self._version():
+            return None
+        if data['change_id'] > self.change_id:
+            # The change log is older than the file, e.g. the database was restored
+            return None
+
+        changes = changes_since(self.netbox_con, data['change_id']) if self.change_id > data['change_id'] else []
+        if changes:
+            self.change_id = changes[-1]['id']
+
+        paths = {entry[1] for entry in data['responses']} | {entry[0] for entry in data['ids']}
+        paths |= {dataset['param'] for dataset in data['datasets'].values()}
+        changed = changed_ids(changes, paths)
+
+        if self.netbox_con.id_cache is not None:
+            self.netbox_con.id_cache.restore(data['ids'])
+            for path, ids in changed.items():
+                for obj_id in ids:
+                    self.netbox_con.id_cache.evict(path, obj_id)
+
+        if self.netbox_con.response_cache is not None:
+            self.netbox_con.response_cache.restore(data['responses'])
+            for path in changed:
+                self.netbox_con.response_cache.invalidate(path)
+
+        datasets = {}
+        for name, dataset in data['datasets'].items():
+            query = Query(dataset['objects'], param=dataset['param'], filters=dataset['filters'])
+            ids = changed.get(query.param)
+            if ids:
+                query.remove(ids)
+                query.add(self.netbox_con.get_batched(query.param, 'id', sorted(ids), **query.filters))
+            query.attach(self.netbox_con)
+            datasets[name] = query
+        return datasets
+
+    @staticmethod
+    def _read(filename):
+        """Return the decoded cache file, None when it is missing or not a cache file"""
+        try:
+            with open(filename, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                return json.loads(gzip.decompress(f.read()).decode('utf-8'))
+        except (OSError, EOFError, ValueError):
+            return None
+
+    def _version(self):
+        return str(Status(self.netbox_con).get_status().get('netbox-version'))